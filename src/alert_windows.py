@@ -0,0 +1,191 @@
+"""
+Ventanas de alerta FTRT e índice de intervalos
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Convierte una serie de FTRT clasificada por niveles de alerta en
+ventanas contiguas (codificación por longitud de rachas) y las guarda
+en un índice ordenado por nivel. Las consultas "ventanas CRÍTICO que
+se solapan con 2030-2040" o "siguiente ventana EXTREMO tras la fecha X"
+se resuelven con búsqueda binaria, en tiempo logarítmico.
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+if __package__:
+    from .utils import ALERT_LEVELS, ALERT_THRESHOLDS, classify_alert_levels
+else:
+    from utils import ALERT_LEVELS, ALERT_THRESHOLDS, classify_alert_levels
+
+
+WINDOW_DTYPE = np.dtype([
+    ('start', 'datetime64[s]'),   # Primera época de la ventana
+    ('end', 'datetime64[s]'),     # Última época de la ventana (inclusive)
+    ('level', 'u1'),
+    ('peak_ftrt', 'f8'),
+])
+
+
+def _level_code(level: Union[str, int]) -> int:
+    if isinstance(level, str):
+        return ALERT_LEVELS.index(level)
+    return int(level)
+
+
+def run_length_windows(dates, codes, ftrt=None) -> np.ndarray:
+    """
+    Agrupa épocas consecutivas con el mismo código en ventanas.
+
+    Args:
+        dates: Array de fechas ordenadas
+        codes: Array de códigos de nivel (misma longitud)
+        ftrt: Array opcional de FTRT para registrar el pico de cada ventana
+
+    Returns:
+        Array estructurado (WINDOW_DTYPE), una fila por racha
+    """
+    dates = np.asarray(dates, dtype='datetime64[s]').ravel()
+    codes = np.asarray(codes).ravel()
+    if len(dates) == 0:
+        return np.empty(0, dtype=WINDOW_DTYPE)
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+
+    windows = np.empty(len(starts), dtype=WINDOW_DTYPE)
+    windows['start'] = dates[starts]
+    windows['end'] = dates[ends]
+    windows['level'] = codes[starts]
+    if ftrt is None:
+        windows['peak_ftrt'] = np.nan
+    else:
+        windows['peak_ftrt'] = np.maximum.reduceat(np.asarray(ftrt, dtype=float).ravel(), starts)
+    return windows
+
+
+class AlertWindowIndex:
+    """
+    Índice de ventanas de alerta por nivel, ordenado por fecha
+    """
+
+    def __init__(self, windows: np.ndarray):
+        """
+        Args:
+            windows: Array estructurado WINDOW_DTYPE (ej. de run_length_windows)
+        """
+        self.windows = np.sort(np.asarray(windows, dtype=WINDOW_DTYPE), order='start')
+
+        # Por nivel, las ventanas no se solapan: inicio y fin quedan ordenados
+        self._by_level = {}
+        for code in range(len(ALERT_LEVELS)):
+            self._by_level[(code, False)] = self.windows[self.windows['level'] == code]
+            self._by_level[(code, True)] = self._merge_at_least(code)
+
+    @classmethod
+    def from_series(cls, dates, ftrt, thresholds=ALERT_THRESHOLDS) -> 'AlertWindowIndex':
+        """
+        Clasifica una serie de FTRT y construye el índice.
+
+        Args:
+            dates: Array de fechas ordenadas
+            ftrt: Array de FTRT
+            thresholds: Umbrales crecientes (default: ALERT_THRESHOLDS)
+        """
+        codes = classify_alert_levels(ftrt, thresholds)
+        return cls(run_length_windows(dates, codes, ftrt))
+
+    def _merge_at_least(self, code: int) -> np.ndarray:
+        """
+        Ventanas de nivel >= code, uniendo las que son consecutivas en la
+        serie (ej. ELEVADO seguido de CRÍTICO forma una sola ventana
+        "ELEVADO o superior").
+        """
+        idx = np.flatnonzero(self.windows['level'] >= code)
+        if len(idx) == 0:
+            return np.empty(0, dtype=WINDOW_DTYPE)
+
+        group_starts = np.flatnonzero(np.r_[True, np.diff(idx) != 1])
+        group_ends = np.r_[group_starts[1:], len(idx)] - 1
+
+        merged = np.empty(len(group_starts), dtype=WINDOW_DTYPE)
+        merged['start'] = self.windows['start'][idx[group_starts]]
+        merged['end'] = self.windows['end'][idx[group_ends]]
+        merged['level'] = code
+        merged['peak_ftrt'] = np.maximum.reduceat(self.windows['peak_ftrt'][idx], group_starts)
+        return merged
+
+    def _select(self, level, at_least: bool) -> np.ndarray:
+        return self._by_level[(_level_code(level), at_least)]
+
+    def overlapping(self, level, start, end, at_least: bool = False) -> np.ndarray:
+        """
+        Ventanas de un nivel que se solapan con [start, end].
+
+        Args:
+            level: Nombre ('CRÍTICO') o código del nivel
+            start: Inicio del intervalo de consulta
+            end: Fin del intervalo de consulta (inclusive)
+            at_least: Si True, incluye también los niveles superiores
+
+        Returns:
+            Array estructurado WINDOW_DTYPE
+        """
+        windows = self._select(level, at_least)
+        start = np.datetime64(start, 's')
+        end = np.datetime64(end, 's')
+        first = np.searchsorted(windows['end'], start, side='left')
+        last = np.searchsorted(windows['start'], end, side='right')
+        return windows[first:max(first, last)]
+
+    def next_window(self, level, after, at_least: bool = False) -> Optional[np.void]:
+        """
+        Primera ventana de un nivel que empieza después de 'after'.
+
+        Returns:
+            Registro WINDOW_DTYPE o None si no hay ninguna
+        """
+        windows = self._select(level, at_least)
+        i = np.searchsorted(windows['start'], np.datetime64(after, 's'), side='right')
+        return windows[i] if i < len(windows) else None
+
+    def window_at(self, date) -> Optional[np.void]:
+        """Ventana (de cualquier nivel) que contiene la fecha, o None."""
+        date = np.datetime64(date, 's')
+        i = np.searchsorted(self.windows['start'], date, side='right') - 1
+        if i >= 0 and self.windows['end'][i] >= date:
+            return self.windows[i]
+        return None
+
+    def summary(self) -> Dict[str, Dict]:
+        """Número de ventanas y días abarcados (inicio a fin) por nivel."""
+        result = {}
+        for code, name in enumerate(ALERT_LEVELS):
+            windows = self._by_level[(code, False)]
+            span = (windows['end'] - windows['start']).astype('timedelta64[s]').astype(np.int64)
+            result[name] = {'windows': len(windows), 'span_days': float(span.sum()) / 86400.0}
+        return result
+
+    def to_records(self) -> List[Dict]:
+        """Ventanas como lista de dicts (para JSON o dashboards)."""
+        return [
+            {
+                'start': str(w['start']),
+                'end': str(w['end']),
+                'alert_level': ALERT_LEVELS[w['level']],
+                'peak_ftrt': float(w['peak_ftrt'])
+            }
+            for w in self.windows
+        ]
+
+    def save(self, path: str):
+        """Guarda las ventanas en un archivo .npy."""
+        np.save(path, self.windows)
+
+    @classmethod
+    def load(cls, path: str) -> 'AlertWindowIndex':
+        """Carga un índice guardado con save()."""
+        return cls(np.load(path))
+
+    def __len__(self) -> int:
+        return len(self.windows)
@@ -0,0 +1,114 @@
+"""
+Baricentro del sistema solar para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Calcula el desplazamiento del baricentro respecto al centro del Sol a
+partir de los vectores de posición heliocéntricos de los planetas,
+vectorizado sobre series de épocas, junto con su velocidad y aceleración.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+if __package__:
+    from .utils import AU_TO_KM, PLANET_MASSES, SUN_RADIUS_KM
+else:
+    from utils import AU_TO_KM, PLANET_MASSES, SUN_RADIUS_KM
+
+
+# Masa del Sol en masas de Júpiter (GM_sol / GM_júpiter)
+SUN_MASS_JUPITER = 1047.3486
+
+# 1 AU en radios solares
+AU_TO_RSUN = AU_TO_KM / SUN_RADIUS_KM
+
+
+def barycenter_offset(positions: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    """
+    Vector del centro del Sol al baricentro para cada época.
+
+    r_b = Σ m_i r_i / (M_sol + Σ m_i), con r_i heliocéntricos.
+
+    Args:
+        positions: Posiciones heliocéntricas (planetas × épocas × 3) en AU
+        masses: Masas planetarias (planetas,) en masas de Júpiter
+
+    Returns:
+        Array (épocas × 3) en radios solares
+    """
+    positions = np.asarray(positions, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    weighted = np.einsum('p,pnk->nk', masses, positions)
+    return weighted / (SUN_MASS_JUPITER + masses.sum()) * AU_TO_RSUN
+
+
+def barycenter_kinematics(positions: np.ndarray, masses: np.ndarray,
+                          jd: Optional[np.ndarray] = None) -> Dict:
+    """
+    Posición, velocidad y aceleración del baricentro respecto al Sol.
+
+    La velocidad y la aceleración se obtienen por diferencias finitas de
+    segundo orden sobre la serie de épocas (requiere al menos 3 épocas;
+    si no, se devuelven NaN).
+
+    Args:
+        positions: Posiciones heliocéntricas (planetas × épocas × 3) en AU
+        masses: Masas planetarias (planetas,) en masas de Júpiter
+        jd: Días julianos de cada época (necesario para velocidad/aceleración)
+
+    Returns:
+        Dict con 'offset_rsun' (épocas × 3), 'distance_rsun',
+        'velocity_rsun_per_day', 'speed_rsun_per_day' y
+        'acceleration_rsun_per_day2'
+    """
+    offset = barycenter_offset(positions, masses)
+    n = len(offset)
+
+    if jd is not None and n >= 3:
+        jd = np.asarray(jd, dtype=float)
+        velocity = np.gradient(offset, jd, axis=0, edge_order=2)
+        acceleration = np.gradient(velocity, jd, axis=0, edge_order=2)
+    else:
+        velocity = np.full_like(offset, np.nan)
+        acceleration = np.full_like(offset, np.nan)
+
+    return {
+        'offset_rsun': offset,
+        'distance_rsun': np.linalg.norm(offset, axis=-1),
+        'velocity_rsun_per_day': velocity,
+        'speed_rsun_per_day': np.linalg.norm(velocity, axis=-1),
+        'acceleration_rsun_per_day2': acceleration
+    }
+
+
+def calculate_barycenter_series(dates, ephemeris=None,
+                                planets: Optional[List[str]] = None) -> Dict:
+    """
+    Calcula el baricentro para una serie de fechas con una efeméride.
+
+    Args:
+        dates: Array de fechas
+        ephemeris: Proveedor con método positions(planets, dates)
+            (default: KeplerEphemeris)
+        planets: Planetas a incluir (default: los ocho)
+
+    Returns:
+        Dict de barycenter_kinematics más 'dates' y 'planets'
+    """
+    if __package__:
+        from .kepler_ephemeris import KeplerEphemeris, dates_to_jd
+    else:
+        from kepler_ephemeris import KeplerEphemeris, dates_to_jd
+
+    if ephemeris is None:
+        ephemeris = KeplerEphemeris()
+    if planets is None:
+        planets = list(PLANET_MASSES)
+
+    dates = np.atleast_1d(np.asarray(dates, dtype='datetime64[s]'))
+    positions = ephemeris.positions(planets, dates)
+    masses = np.array([PLANET_MASSES[p] for p in planets])
+
+    result = barycenter_kinematics(positions, masses, dates_to_jd(dates))
+    return {'dates': dates, 'planets': list(planets), **result}
@@ -0,0 +1,114 @@
+"""
+Benchmark del camino online del Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Mide el rendimiento de extremo a extremo consulta → parseo → FTRT
+contra el servidor local HorizonsStubServer, sin acceso a la red.
+"""
+
+import contextlib
+import io
+import time
+from typing import Dict
+
+import numpy as np
+
+if __package__:
+    from .ftrt_calculator import FTRTCalculator
+    from .horizons_client import HorizonsClient
+    from .horizons_stub_server import HorizonsStubServer
+else:
+    from ftrt_calculator import FTRTCalculator
+    from horizons_client import HorizonsClient
+    from horizons_stub_server import HorizonsStubServer
+
+
+def run_benchmark(mode: str = 'range', n_dates: int = 365, start: str = '2000-01-01',
+                  max_workers: int = 4, latency: float = 0.0, error_rate: float = 0.0,
+                  payload_padding: int = 0, seed: int = 0) -> Dict:
+    """
+    Ejecuta un benchmark del camino online contra el servidor local.
+
+    Args:
+        mode: 'single' (calculate_ftrt por fecha) o 'range'
+            (calculate_ftrt_series con una consulta por planeta)
+        n_dates: Número de fechas diarias a calcular
+        start: Fecha inicial
+        max_workers: Concurrencia del HorizonsClient
+        latency: Latencia simulada por petición (segundos)
+        error_rate: Fracción de peticiones que fallan con HTTP 503
+        payload_padding: Bytes de relleno por respuesta
+        seed: Semilla del servidor y del jitter de reintentos
+
+    Returns:
+        Dict con tiempo total, fechas/s, peticiones y estadísticas de latencia
+    """
+    if mode not in ('single', 'range'):
+        raise ValueError(f"Modo desconocido: {mode}")
+
+    dates = np.datetime64(start, 'D') + np.arange(n_dates)
+
+    with HorizonsStubServer(latency=latency, error_rate=error_rate,
+                            payload_padding=payload_padding, seed=seed) as server:
+        client = HorizonsClient(url=server.url, max_workers=max_workers,
+                                backoff_base=0.01, backoff_max=0.1, seed=seed)
+        calculator = FTRTCalculator(client=client)
+
+        t0 = time.perf_counter()
+
+        if mode == 'single':
+            ftrt = []
+            # Silenciar la salida por consola de calculate_ftrt
+            with contextlib.redirect_stdout(io.StringIO()):
+                for date in dates:
+                    ftrt.append(calculator.calculate_ftrt(str(date))['ftrt_total'])
+            ftrt = np.array(ftrt)
+        else:
+            ftrt = calculator.calculate_ftrt_series(dates=dates, use_offline=False)['ftrt_total']
+
+        elapsed = time.perf_counter() - t0
+        latency_stats = client.latency_stats()
+        client.close()
+
+        requests_served = server.requests_served
+        errors_served = server.errors_served
+
+    return {
+        'mode': mode,
+        'n_dates': n_dates,
+        'elapsed_s': elapsed,
+        'dates_per_s': n_dates / elapsed if elapsed > 0 else float('inf'),
+        'requests_served': requests_served,
+        'errors_served': errors_served,
+        'ftrt_mean': float(np.mean(ftrt)) if len(ftrt) else None,
+        'latency': latency_stats
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark consulta → parseo → FTRT')
+    parser.add_argument('--mode', choices=['single', 'range'], default='range')
+    parser.add_argument('--dates', type=int, default=365)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--padding', type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(mode=args.mode, n_dates=args.dates, max_workers=args.workers,
+                           latency=args.latency, error_rate=args.error_rate,
+                           payload_padding=args.padding)
+
+    print("\n" + "="*60)
+    print(f"BENCHMARK FTRT ONLINE ({result['mode']})")
+    print("="*60)
+    print(f"Fechas: {result['n_dates']}")
+    print(f"Tiempo total: {result['elapsed_s']:.3f} s")
+    print(f"Rendimiento: {result['dates_per_s']:.1f} fechas/s")
+    print(f"Peticiones servidas: {result['requests_served']} ({result['errors_served']} con error)")
+    if result['latency']['mean'] is not None:
+        print(f"Latencia media: {result['latency']['mean'] * 1000:.2f} ms "
+              f"(p95: {result['latency']['p95'] * 1000:.2f} ms)")
+    print("="*60 + "\n")
@@ -0,0 +1,251 @@
+"""
+Búsqueda de conjunciones planetarias para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Localiza los intervalos en los que un subconjunto de planetas queda
+dentro de una tolerancia angular en longitud heliocéntrica. La
+dispersión de longitudes se evalúa primero con un barrido grueso
+vectorizado; los cruces de la tolerancia se refinan después por
+bisección, todos los intervalos a la vez.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+if __package__:
+    from .utils import PLANET_PERIODS
+else:
+    from utils import PLANET_PERIODS
+
+
+CONJUNCTION_DTYPE = np.dtype([
+    ('start', 'datetime64[s]'),
+    ('end', 'datetime64[s]'),
+    ('duration_days', 'f8'),
+    ('min_spread_deg', 'f8'),     # Estrechez: menor arco que contiene a todos
+    ('peak', 'datetime64[s]'),    # Época de máxima estrechez
+])
+
+# Épocas por bloque en el barrido grueso
+SWEEP_CHUNK = 65536
+
+
+def longitude_spread(longitudes_deg: np.ndarray) -> np.ndarray:
+    """
+    Menor arco (grados) que contiene todas las longitudes de cada época.
+
+    Es 360° menos el mayor hueco entre longitudes consecutivas ordenadas.
+
+    Args:
+        longitudes_deg: Array (planetas × épocas) de longitudes
+
+    Returns:
+        Array (épocas,) de dispersión en [0, 360)
+    """
+    ordered = np.sort(np.asarray(longitudes_deg, dtype=float) % 360.0, axis=0)
+    gaps = np.diff(ordered, axis=0)
+    wrap = ordered[0] + 360.0 - ordered[-1]
+    largest = np.maximum(gaps.max(axis=0, initial=0.0), wrap)
+    return 360.0 - largest
+
+
+def _jd_to_datetime(jd: np.ndarray) -> np.ndarray:
+    if __package__:
+        from .kepler_ephemeris import UNIX_EPOCH_JD
+    else:
+        from kepler_ephemeris import UNIX_EPOCH_JD
+    seconds = np.round((np.asarray(jd, dtype=float) - UNIX_EPOCH_JD) * 86400.0)
+    return seconds.astype(np.int64).astype('datetime64[s]')
+
+
+class ConjunctionSearch:
+    """
+    Buscador de conjunciones en longitud heliocéntrica
+    """
+
+    def __init__(self, ephemeris=None):
+        """
+        Args:
+            ephemeris: Proveedor con método positions(planets, dates)
+                (default: KeplerEphemeris)
+        """
+        if ephemeris is None:
+            if __package__:
+                from .kepler_ephemeris import KeplerEphemeris
+            else:
+                from kepler_ephemeris import KeplerEphemeris
+            ephemeris = KeplerEphemeris()
+        self.ephemeris = ephemeris
+
+    def spread(self, planets: List[str], jd: np.ndarray) -> np.ndarray:
+        """Dispersión de longitudes heliocéntricas (grados) en los días julianos dados."""
+        xyz = self.ephemeris.positions(planets, _jd_to_datetime(jd))
+        longitudes = np.degrees(np.arctan2(xyz[..., 1], xyz[..., 0]))
+        return longitude_spread(longitudes)
+
+    @staticmethod
+    def default_step(planets: List[str], tolerance_deg: float) -> float:
+        """
+        Paso del barrido (días): media tolerancia recorrida al mayor
+        movimiento medio relativo del subconjunto, acotado a 30 días.
+        """
+        rates = np.array([360.0 / (PLANET_PERIODS[p] * 365.25) for p in planets])
+        relative = rates.max() - rates.min() if len(rates) > 1 else rates.max()
+        return float(min(30.0, max(0.01, 0.5 * tolerance_deg / relative)))
+
+    def find(self, planets: List[str], start, stop, tolerance_deg: float = 10.0,
+             step_days: Optional[float] = None, tol_days: float = 1e-3) -> np.ndarray:
+        """
+        Intervalos en los que los planetas están dentro de la tolerancia.
+
+        Args:
+            planets: Subconjunto de planetas (al menos dos)
+            start: Fecha inicial
+            stop: Fecha final
+            tolerance_deg: Arco máximo que debe contener a todos los planetas
+            step_days: Paso del barrido grueso (default: default_step)
+            tol_days: Precisión de los bordes refinados
+
+        Returns:
+            Array estructurado CONJUNCTION_DTYPE ordenado por fecha
+        """
+        if __package__:
+            from .kepler_ephemeris import dates_to_jd
+        else:
+            from kepler_ephemeris import dates_to_jd
+
+        if len(planets) < 2:
+            raise ValueError("Se requieren al menos dos planetas")
+        if step_days is None:
+            step_days = self.default_step(planets, tolerance_deg)
+
+        jd_start, jd_stop = dates_to_jd([start, stop])
+        n = int(np.floor((jd_stop - jd_start) / step_days)) + 1
+        jd = jd_start + step_days * np.arange(n)
+        # El último paso suele quedar incompleto: se muestrea también
+        # jd_stop para no perder conjunciones al final del rango
+        if jd_stop - jd[-1] > tol_days:
+            jd = np.r_[jd, jd_stop]
+            n += 1
+
+        # Barrido grueso por bloques
+        spread = np.empty(n)
+        for i in range(0, n, SWEEP_CHUNK):
+            spread[i:i + SWEEP_CHUNK] = self.spread(planets, jd[i:i + SWEEP_CHUNK])
+
+        inside = spread <= tolerance_deg
+        if not inside.any():
+            return np.empty(0, dtype=CONJUNCTION_DTYPE)
+
+        change = np.flatnonzero(inside[1:] != inside[:-1])
+        enter = change[~inside[change]]       # fuera -> dentro entre k y k+1
+        leave = change[inside[change]]        # dentro -> fuera entre k y k+1
+
+        enter_jd = self._refine(planets, jd[enter], jd[enter + 1], tolerance_deg, tol_days)
+        leave_jd = self._refine(planets, jd[leave + 1], jd[leave], tolerance_deg, tol_days)
+
+        # Intervalos abiertos en los extremos del rango buscado
+        if inside[0]:
+            enter_jd = np.r_[jd[0], enter_jd]
+        if inside[-1]:
+            leave_jd = np.r_[leave_jd, jd[-1]]
+
+        # Cada intervalo corresponde a una racha de muestras dentro de la
+        # tolerancia; su estrechez es el mínimo del barrido en la racha
+        idx = np.flatnonzero(inside)
+        run = np.cumsum(np.r_[True, np.diff(idx) != 1]) - 1
+        order = np.lexsort((spread[idx], run))
+        run_first = np.flatnonzero(np.r_[True, np.diff(run[order]) != 0])
+        peak_idx = idx[order[run_first]]
+
+        lower = np.maximum(jd[peak_idx] - step_days, enter_jd)
+        upper = np.minimum(jd[peak_idx] + step_days, leave_jd)
+        peak_jd, min_spread = self._refine_minimum(planets, lower, upper, tol_days)
+
+        # Si el refinamiento no mejora el barrido, se conserva la muestra
+        improved = min_spread <= spread[peak_idx]
+
+        result = np.empty(len(enter_jd), dtype=CONJUNCTION_DTYPE)
+        result['start'] = _jd_to_datetime(enter_jd)
+        result['end'] = _jd_to_datetime(leave_jd)
+        result['duration_days'] = leave_jd - enter_jd
+        result['min_spread_deg'] = np.where(improved, min_spread, spread[peak_idx])
+        result['peak'] = _jd_to_datetime(np.where(improved, peak_jd, jd[peak_idx]))
+        return result
+
+    def _refine(self, planets: List[str], jd_out: np.ndarray, jd_in: np.ndarray,
+                tolerance_deg: float, tol_days: float) -> np.ndarray:
+        """
+        Bisección vectorizada del cruce de la tolerancia entre una época
+        fuera (spread > tol) y otra dentro, para todos los cruces a la vez.
+        """
+        jd_out = np.asarray(jd_out, dtype=float).copy()
+        jd_in = np.asarray(jd_in, dtype=float).copy()
+        if len(jd_out) == 0:
+            return jd_in
+
+        while np.max(np.abs(jd_in - jd_out)) > tol_days:
+            mid = 0.5 * (jd_out + jd_in)
+            is_inside = self.spread(planets, mid) <= tolerance_deg
+            jd_in = np.where(is_inside, mid, jd_in)
+            jd_out = np.where(is_inside, jd_out, mid)
+
+        return jd_in
+
+    def _refine_minimum(self, planets: List[str], lower: np.ndarray, upper: np.ndarray,
+                        tol_days: float):
+        """
+        Búsqueda por sección áurea del mínimo de dispersión en cada
+        intervalo [lower, upper], vectorizada sobre todos los intervalos.
+        """
+        ratio = (np.sqrt(5.0) - 1.0) / 2.0
+        a, b = np.array(lower, dtype=float), np.array(upper, dtype=float)
+        if len(a) == 0:
+            return a, a
+
+        c = b - ratio * (b - a)
+        d = a + ratio * (b - a)
+        fc, fd = self.spread(planets, c), self.spread(planets, d)
+
+        while np.max(b - a) > tol_days:
+            left = fc < fd
+            # Mínimo en [a, d]: d pasa a ser b y c el nuevo d (y al revés)
+            a, b = np.where(left, a, c), np.where(left, d, b)
+            probe = np.where(left, b - ratio * (b - a), a + ratio * (b - a))
+            f_probe = self.spread(planets, probe)
+            c, d = np.where(left, probe, d), np.where(left, c, probe)
+            fc, fd = np.where(left, f_probe, fd), np.where(left, fc, f_probe)
+
+        best = 0.5 * (a + b)
+        return best, self.spread(planets, best)
+
+
+def find_conjunctions(planets: List[str], start, stop, tolerance_deg: float = 10.0,
+                      step_days: Optional[float] = None, ephemeris=None) -> List[Dict]:
+    """
+    Busca conjunciones y las devuelve como lista de dicts.
+
+    Args:
+        planets: Subconjunto de planetas
+        start: Fecha inicial
+        stop: Fecha final
+        tolerance_deg: Arco máximo en longitud heliocéntrica
+        step_days: Paso del barrido grueso (default: automático)
+        ephemeris: Proveedor de posiciones (default: KeplerEphemeris)
+
+    Returns:
+        Lista de dicts con 'start', 'end', 'duration_days',
+        'min_spread_deg' y 'peak'
+    """
+    found = ConjunctionSearch(ephemeris).find(planets, start, stop, tolerance_deg, step_days)
+    return [
+        {
+            'start': str(c['start']),
+            'end': str(c['end']),
+            'duration_days': float(c['duration_days']),
+            'min_spread_deg': float(c['min_spread_deg']),
+            'peak': str(c['peak'])
+        }
+        for c in found
+    ]
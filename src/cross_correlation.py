@@ -0,0 +1,140 @@
+"""
+Correlación cruzada con desfase vía FFT para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Calcula la correlación entre dos series alineadas y equiespaciadas
+(FTRT y un índice de actividad solar) para todos los desfases a la vez,
+en O(n log n). Las sumas por desfase (pares, medias, varianzas y
+producto cruzado) se obtienen con correlaciones FFT de la serie y de su
+máscara de validez, de modo que los huecos (NaN) se tratan exactamente.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def _correlate(a: np.ndarray, b: np.ndarray, n_fft: int, max_lag: int) -> np.ndarray:
+    """
+    Σ_t a[t] · b[t + k] para k = -max_lag..max_lag, por FFT.
+    """
+    from scipy import fft
+
+    spectrum = np.conj(fft.rfft(a, n_fft)) * fft.rfft(b, n_fft)
+    full = fft.irfft(spectrum, n_fft)
+    # Desfases positivos al principio, negativos al final (circular)
+    return np.r_[full[n_fft - max_lag:], full[:max_lag + 1]]
+
+
+def autocorrelation(x, max_lag: int) -> np.ndarray:
+    """
+    Autocorrelación muestral (sesgada) para desfases 0..max_lag, por FFT.
+
+    Args:
+        x: Serie (NaN se tratan como ceros tras centrar)
+        max_lag: Desfase máximo en muestras
+
+    Returns:
+        Array (max_lag + 1,) con ρ(0) = 1
+    """
+    from scipy import fft
+
+    x = np.asarray(x, dtype=float)
+    x = np.where(np.isfinite(x), x - np.nanmean(x), 0.0)
+    n_fft = fft.next_fast_len(2 * len(x) - 1, real=True)
+    spectrum = fft.rfft(x, n_fft)
+    acov = fft.irfft(spectrum * np.conj(spectrum), n_fft)[:max_lag + 1]
+    return acov / acov[0] if acov[0] > 0 else np.full(max_lag + 1, np.nan)
+
+
+def cross_correlation(x, y, max_lag: Optional[int] = None, normalize: str = 'pearson',
+                      band: str = 'white', confidence: float = 0.95,
+                      step_days: Optional[float] = None) -> Dict:
+    """
+    Correlación cruzada r(k) = corr(x[t], y[t + k]) para todos los desfases.
+
+    Con k > 0 la serie x (ej. FTRT) adelanta a y (ej. actividad solar).
+
+    Args:
+        x: Primera serie (equiespaciada, misma longitud que y)
+        y: Segunda serie
+        max_lag: Desfase máximo en muestras (default: n - 1)
+        normalize: 'pearson' (media y varianza de los pares solapados en
+            cada desfase), 'biased' (estimador clásico, divide por n) o
+            'unbiased' (divide por el número de pares)
+        band: Banda de confianza bajo independencia: 'white' (±z/√n_k) o
+            'bartlett' (corrige por la autocorrelación de ambas series)
+        confidence: Nivel de confianza de la banda
+        step_days: Paso de muestreo en días, para expresar los desfases en días
+
+    Returns:
+        Dict con 'lags' (muestras), 'lag_days', 'r', 'n_pairs', 'band',
+        'significant' (|r| > banda), 'best_lag' y 'best_r'
+    """
+    from scipy import fft, stats
+
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if len(x) != len(y):
+        raise ValueError("Las series deben estar alineadas (misma longitud)")
+    n = len(x)
+    if max_lag is None:
+        max_lag = n - 1
+    max_lag = int(min(max_lag, n - 1))
+
+    mx = np.isfinite(x).astype(float)
+    my = np.isfinite(y).astype(float)
+    # Centrar con la media global reduce la cancelación numérica
+    xc = np.where(mx > 0, x - np.nanmean(x), 0.0)
+    yc = np.where(my > 0, y - np.nanmean(y), 0.0)
+
+    n_fft = fft.next_fast_len(n + max_lag, real=True)
+    pairs = np.rint(_correlate(mx, my, n_fft, max_lag))
+    sxy = _correlate(xc, yc, n_fft, max_lag)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if normalize == 'pearson':
+            sx = _correlate(xc, my, n_fft, max_lag)
+            sy = _correlate(mx, yc, n_fft, max_lag)
+            sxx = _correlate(xc ** 2, my, n_fft, max_lag)
+            syy = _correlate(mx, yc ** 2, n_fft, max_lag)
+            cov = sxy - sx * sy / pairs
+            var_x = np.maximum(sxx - sx ** 2 / pairs, 0.0)
+            var_y = np.maximum(syy - sy ** 2 / pairs, 0.0)
+            r = cov / np.sqrt(var_x * var_y)
+        elif normalize in ('biased', 'unbiased'):
+            scale = np.sqrt(np.sum(xc ** 2) * np.sum(yc ** 2))
+            r = sxy / scale
+            if normalize == 'unbiased':
+                r = r * mx.sum() / pairs
+        else:
+            raise ValueError(f"Normalización desconocida: {normalize}")
+        r = np.where(pairs >= 3, r, np.nan)
+
+    z = stats.norm.ppf(0.5 + confidence / 2.0)
+    if band == 'white':
+        with np.errstate(divide='ignore'):
+            half_width = z / np.sqrt(pairs)
+    elif band == 'bartlett':
+        # Var[r(k)] ≈ (1/n_k) Σ_j ρx(j) ρy(j)
+        rho_x = autocorrelation(x, max_lag)
+        rho_y = autocorrelation(y, max_lag)
+        factor = max(1.0 + 2.0 * np.nansum(rho_x[1:] * rho_y[1:]), 1.0)
+        with np.errstate(divide='ignore'):
+            half_width = z * np.sqrt(factor / pairs)
+    else:
+        raise ValueError(f"Banda desconocida: {band}")
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    best = int(np.nanargmax(np.abs(r))) if np.isfinite(r).any() else None
+
+    return {
+        'lags': lags,
+        'lag_days': lags * step_days if step_days is not None else None,
+        'r': r,
+        'n_pairs': pairs.astype(np.int64),
+        'band': half_width,
+        'significant': np.abs(r) > half_width,
+        'best_lag': int(lags[best]) if best is not None else None,
+        'best_r': float(r[best]) if best is not None else None
+    }
@@ -0,0 +1,265 @@
+"""
+Caché persistente de efemérides para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Guarda en disco (SQLite) las distancias obtenidas de JPL Horizons,
+indexadas por (código NAIF, época), para no repetir consultas de red
+en ejecuciones sucesivas. Las épocas se guardan con resolución diaria
+(00:00 UT), la de las filas de rango de Horizons.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'ephemeris_cache.sqlite'
+)
+
+
+def to_epoch_seconds(dates) -> np.ndarray:
+    """
+    Convierte fechas ('YYYY-MM-DD', datetime o datetime64) a segundos Unix.
+
+    Args:
+        dates: Fecha o array de fechas
+
+    Returns:
+        Array int64 de segundos desde 1970-01-01 (negativo antes de 1970)
+    """
+    return np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+
+
+def to_cache_key(dates) -> np.ndarray:
+    """
+    Normaliza fechas a la clave de la caché (segundos Unix del día, 00:00 UT).
+
+    Args:
+        dates: Fecha o array de fechas (con o sin hora)
+
+    Returns:
+        Array int64 de segundos desde 1970-01-01
+    """
+    return to_epoch_seconds(np.asarray(dates, dtype='datetime64[s]').astype('datetime64[D]'))
+
+
+class EphemerisCache:
+    """
+    Caché en disco de distancias planetarias indexada por (NAIF, época)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 max_entries: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        """
+        Args:
+            path: Ruta del archivo SQLite (':memory:' para caché en RAM)
+            max_entries: Número máximo de filas (None = sin límite)
+            max_age_days: Antigüedad máxima de una fila en días (None = sin límite)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ephemeris (
+                naif_code TEXT NOT NULL,
+                epoch INTEGER NOT NULL,
+                distance_au REAL NOT NULL,
+                raw_row TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (naif_code, epoch)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_fetched_at ON ephemeris (fetched_at)"
+        )
+        self._conn.commit()
+
+    def _min_fetched_at(self) -> float:
+        if self.max_age_days is None:
+            return float('-inf')
+        return time.time() - self.max_age_days * 86400.0
+
+    def get(self, naif_code: str, date) -> Optional[Dict]:
+        """
+        Busca una entrada en la caché.
+
+        Args:
+            naif_code: Código NAIF del planeta
+            date: Época ('YYYY-MM-DD', datetime o datetime64)
+
+        Returns:
+            Dict con 'distance_au' y 'raw_row', o None si no está (o expiró)
+        """
+        epoch = int(to_cache_key(date))
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT distance_au, raw_row FROM ephemeris "
+                "WHERE naif_code = ? AND epoch = ? AND fetched_at >= ?",
+                (naif_code, epoch, self._min_fetched_at())
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        return {'distance_au': row[0], 'raw_row': row[1]}
+
+    def get_many(self, naif_code: str, dates) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca un conjunto de épocas de un planeta con una sola consulta.
+
+        Solo una consulta servida por completo cuenta como aciertos: si
+        falta alguna época el llamador vuelve a pedir el rango, así que
+        todas cuentan como fallos.
+
+        Args:
+            naif_code: Código NAIF del planeta
+            dates: Array de fechas
+
+        Returns:
+            Tupla (distancias en AU con NaN donde falta, máscara de encontradas)
+        """
+        epochs = to_cache_key(dates).ravel()
+        distances = np.full(len(epochs), np.nan)
+        found = np.zeros(len(epochs), dtype=bool)
+
+        if len(epochs) == 0:
+            return distances, found
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT epoch, distance_au FROM ephemeris "
+                "WHERE naif_code = ? AND epoch BETWEEN ? AND ? AND fetched_at >= ? "
+                "ORDER BY epoch",
+                (naif_code, int(epochs.min()), int(epochs.max()), self._min_fetched_at())
+            ).fetchall()
+
+            if rows:
+                cached = np.array(rows)
+                cached_epochs = cached[:, 0].astype(np.int64)
+                idx = np.clip(np.searchsorted(cached_epochs, epochs), 0, len(cached_epochs) - 1)
+                found = cached_epochs[idx] == epochs
+                distances[found] = cached[idx[found], 1]
+
+            if found.all():
+                self.hits += len(epochs)
+            else:
+                self.misses += len(epochs)
+
+        return distances, found
+
+    def put(self, naif_code: str, date, distance_au: float,
+            raw_row: Optional[str] = None):
+        """
+        Guarda una entrada en la caché (reemplaza si ya existe).
+        """
+        self.put_many(naif_code, [date], [distance_au],
+                      None if raw_row is None else [raw_row])
+
+    def put_many(self, naif_code: str, dates, distances,
+                 raw_rows: Optional[Iterable[str]] = None):
+        """
+        Guarda un conjunto de épocas de un planeta en una sola transacción.
+
+        Args:
+            naif_code: Código NAIF del planeta
+            dates: Array de fechas
+            distances: Distancias en AU (las NaN se ignoran)
+            raw_rows: Filas originales de Horizons (opcional)
+        """
+        epochs = to_cache_key(dates).ravel()
+        distances = np.asarray(distances, dtype=float).ravel()
+        raw_rows = [None] * len(epochs) if raw_rows is None else list(raw_rows)
+        now = time.time()
+
+        records = [
+            (naif_code, int(epoch), float(distance), raw, now)
+            for epoch, distance, raw in zip(epochs, distances, raw_rows)
+            if not np.isnan(distance)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ephemeris "
+                "(naif_code, epoch, distance_au, raw_row, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                records
+            )
+            self._conn.commit()
+
+        if self.max_entries is not None:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Aplica las políticas de expulsión por antigüedad y por tamaño.
+        Por tamaño se eliminan primero las entradas más antiguas.
+
+        Returns:
+            Número de filas eliminadas
+        """
+        removed = 0
+
+        with self._lock:
+            if self.max_age_days is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM ephemeris WHERE fetched_at < ?", (self._min_fetched_at(),)
+                )
+                removed += cursor.rowcount
+
+            if self.max_entries is not None:
+                count = self._conn.execute("SELECT COUNT(*) FROM ephemeris").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    cursor = self._conn.execute(
+                        "DELETE FROM ephemeris WHERE rowid IN ("
+                        "SELECT rowid FROM ephemeris ORDER BY fetched_at LIMIT ?)",
+                        (excess,)
+                    )
+                    removed += cursor.rowcount
+
+            self._conn.commit()
+
+        return removed
+
+    def stats(self) -> Dict:
+        """
+        Devuelve contadores de aciertos/fallos y tamaño de la caché.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM ephemeris").fetchone()[0]
+
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+            'entries': entries
+        }
+
+    def clear(self):
+        """Elimina todas las entradas y reinicia los contadores."""
+        with self._lock:
+            self._conn.execute("DELETE FROM ephemeris")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        """Cierra la conexión con el archivo SQLite."""
+        self._conn.close()
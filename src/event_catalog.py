@@ -0,0 +1,197 @@
+"""
+Catálogo de eventos solares por bloques para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Lee catálogos de eventos (CSV o Parquet) en bloques, sin cargar el
+archivo completo: renombra columnas según un mapeo (ej. x_class_num ->
+magnitude), convierte las fechas una sola vez por bloque, descarta las
+filas que no pasan la validación vectorizada y fuerza los tipos.
+Pensado para alimentar HistoricalValidator con archivos de varios GB
+en máquinas con poca memoria.
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from .utils import EVENT_ERROR_MESSAGES, validate_events
+else:
+    from utils import EVENT_ERROR_MESSAGES, validate_events
+
+
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'historical_events.csv'
+)
+
+# Columna de origen -> columna del validador (solo si la de destino no existe)
+DEFAULT_COLUMN_MAP = {
+    'x_class_num': 'magnitude',
+    'event_date': 'date',
+    'event_name': 'name',
+}
+
+REQUIRED_COLUMNS = ['date', 'name', 'magnitude', 'kp']
+OPTIONAL_COLUMNS = ['x_class']
+
+# Columnas del evento que se conservan junto a los resultados FTRT
+RESULT_EVENT_COLUMNS = ['date', 'magnitude', 'kp', 'x_class']
+
+# Magnitud mínima de una fulguración clase X (en unidades X)
+X_CLASS_MIN_MAGNITUDE = 1.0
+
+# Valores de texto aceptados en la columna x_class
+X_CLASS_TRUE = {'true', 't', 'yes', 'y', 'si', 'sí', '1'}
+X_CLASS_FALSE = {'false', 'f', 'no', 'n', '0'}
+
+
+class EventCatalog:
+    """
+    Catálogo de eventos leído por bloques desde CSV o Parquet
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, chunksize: int = 100000,
+                 column_map: Optional[Dict[str, str]] = None,
+                 extra_columns: Optional[List[str]] = None,
+                 date_format: str = '%Y-%m-%d'):
+        """
+        Args:
+            path: Ruta del catálogo (.csv, .csv.gz o .parquet)
+            chunksize: Filas por bloque
+            column_map: Mapeo origen -> destino (default: DEFAULT_COLUMN_MAP)
+            extra_columns: Columnas adicionales a conservar (por defecto solo
+                se leen las que usa el validador; ej. 'description' se omite)
+            date_format: Formato de la columna de fecha
+        """
+        self.path = path
+        self.chunksize = chunksize
+        self.column_map = DEFAULT_COLUMN_MAP if column_map is None else column_map
+        self.extra_columns = list(extra_columns or [])
+        self.date_format = date_format
+
+        self.rows_read = 0
+        self.rows_skipped = 0
+        self.error_counts = {bit: 0 for bit in EVENT_ERROR_MESSAGES}
+
+        self.format = 'parquet' if path.endswith(('.parquet', '.pq')) else 'csv'
+        self._source_columns = self._read_header()
+        self._rename = {
+            src: dst for src, dst in self.column_map.items()
+            if src in self._source_columns and dst not in self._source_columns
+        }
+
+        wanted = set(REQUIRED_COLUMNS + OPTIONAL_COLUMNS + self.extra_columns)
+        self._usecols = [c for c in self._source_columns
+                         if c in wanted or self._rename.get(c) in wanted]
+
+        missing = [c for c in REQUIRED_COLUMNS
+                   if c not in self._source_columns and c not in self._rename.values()]
+        if missing:
+            raise ValueError(f"Faltan columnas requeridas en {path}: {missing}")
+
+    def _read_header(self) -> List[str]:
+        if self.format == 'parquet':
+            return list(_parquet_file(self.path).schema_arrow.names)
+        return list(pd.read_csv(self.path, nrows=0).columns)
+
+    def _raw_chunks(self) -> Iterator[pd.DataFrame]:
+        if self.format == 'parquet':
+            parquet = _parquet_file(self.path)
+            for batch in parquet.iter_batches(batch_size=self.chunksize, columns=self._usecols):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(self.path, usecols=self._usecols, chunksize=self.chunksize,
+                                   dtype={'name': str})
+
+    def _normalize(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Renombra, valida, convierte fechas y fuerza tipos en un bloque."""
+        chunk = chunk.rename(columns=self._rename)
+
+        # Las fechas se interpretan una sola vez; validate_events reutiliza el resultado
+        dates = pd.to_datetime(chunk['date'], format=self.date_format, errors='coerce')
+        chunk = chunk.assign(date=dates)
+
+        valid, codes = validate_events(chunk)
+        self.rows_skipped += int((~valid).sum())
+        for bit in self.error_counts:
+            self.error_counts[bit] += int(np.count_nonzero(codes & bit))
+
+        out = pd.DataFrame({
+            'date': dates.to_numpy()[valid].astype('datetime64[s]'),
+            'name': chunk['name'].to_numpy()[valid].astype(str),
+            'magnitude': pd.to_numeric(chunk['magnitude'], errors='coerce').to_numpy(float)[valid],
+        })
+
+        out['kp'] = pd.to_numeric(chunk['kp'], errors='coerce').to_numpy(float)[valid].astype(np.int8)
+
+        from_magnitude = out['magnitude'].to_numpy() >= X_CLASS_MIN_MAGNITUDE
+        if 'x_class' in chunk:
+            out['x_class'] = parse_x_class(chunk['x_class'].to_numpy()[valid], from_magnitude)
+        else:
+            out['x_class'] = from_magnitude
+
+        for column in self.extra_columns:
+            if column in chunk:
+                out[column] = chunk[column].to_numpy()[valid]
+
+        return out
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        Itera el catálogo en bloques normalizados.
+
+        Yields:
+            DataFrame con 'date' (datetime64), 'name', 'magnitude',
+            'kp', 'x_class' y las columnas extra pedidas. Las filas que no
+            pasan utils.validate_events se descartan (ver rows_skipped y
+            error_counts).
+        """
+        for chunk in self._raw_chunks():
+            self.rows_read += len(chunk)
+            yield self._normalize(chunk)
+
+    def iter_events(self) -> Iterator[Dict]:
+        """Itera evento a evento como dicts (formato de historical_events)."""
+        for chunk in self.iter_chunks():
+            chunk = chunk.assign(date=chunk['date'].dt.strftime('%Y-%m-%d'))
+            yield from chunk.to_dict('records')
+
+    def to_list(self) -> List[Dict]:
+        """Materializa el catálogo como lista de dicts (solo catálogos pequeños)."""
+        return list(self.iter_events())
+
+
+def parse_x_class(values, default) -> np.ndarray:
+    """
+    Interpreta la columna x_class (bool, 0/1 o texto como 'true'/'no').
+
+    Args:
+        values: Array de valores de x_class
+        default: Array bool usado donde el valor falta o no se reconoce
+            (ej. magnitud >= X_CLASS_MIN_MAGNITUDE)
+
+    Returns:
+        Array bool
+    """
+    values = pd.Series(values, dtype=object)
+    is_text = values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    text = values[is_text].str.strip().str.lower()
+    numeric = pd.to_numeric(values.where(~is_text).astype(float), errors='coerce').to_numpy()
+
+    result = np.array(default, dtype=bool)
+    known = np.isfinite(numeric)
+    result[known] = numeric[known] != 0
+    text_rows = np.flatnonzero(is_text)
+    result[text_rows[text.isin(X_CLASS_TRUE).to_numpy()]] = True
+    result[text_rows[text.isin(X_CLASS_FALSE).to_numpy()]] = False
+    return result
+
+
+def _parquet_file(path: str):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Leer Parquet requiere pyarrow: pip install pyarrow")
+    return pq.ParquetFile(path)
@@ -10,12 +10,22 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import stats
-from sklearn.model_selection import cross_val_score
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
+if __package__:
+    from .online_stats import OnlineStats
+    from .resampling import seed_sequence
+    from .results_store import as_dataframe
+    from .utils import ALERT_LEVELS, alert_level_names, classify_alert_levels
+else:
+    from online_stats import OnlineStats
+    from resampling import seed_sequence
+    from results_store import as_dataframe
+    from utils import ALERT_LEVELS, alert_level_names, classify_alert_levels
+
 class AdvancedFTRTAnalysis:
     """
     Análisis estadístico avanzado del modelo FTRT
@@ -24,14 +34,24 @@ class AdvancedFTRTAnalysis:
     def __init__(self, results_df):
         """
         Args:
-            results_df: DataFrame con columnas 'ftrt', 'magnitude', 'kp', etc.
+            results_df: DataFrame (o ResultsStore) con columnas 'ftrt',
+                'magnitude', 'kp', etc.
         """
-        self.df = results_df
+        self.df = as_dataframe(results_df)
+        # Momentos, correlación y regresión en una sola pasada (reutilizados
+        # por generate_visualizations y generate_report)
+        self.online = OnlineStats().update(self.df['ftrt'], self.df['magnitude'],
+                                           self.df['x_class'] if 'x_class' in self.df else None)
         
-    def bootstrap_correlation(self, n_bootstrap=10000):
+    def bootstrap_correlation(self, n_bootstrap=10000, seed=None, workers=None):
         """
         Calcula intervalo de confianza de la correlación mediante bootstrap
         
+        Args:
+            n_bootstrap: Número de réplicas
+            seed: Semilla (entero, SeedSequence o Generator)
+            workers: Procesos para repartir las réplicas (mismo resultado)
+        
         Returns:
             dict con correlación y intervalos de confianza al 95%
         """
@@ -39,24 +59,20 @@ class AdvancedFTRTAnalysis:
         print("BOOTSTRAP: Intervalo de Confianza de Correlación")
         print("="*70)
         
-        correlations = []
-        n = len(self.df)
-        
-        for i in range(n_bootstrap):
-            # Resample con reemplazo
-            sample = self.df.sample(n=n, replace=True)
-            r, _ = stats.pearsonr(sample['ftrt'], sample['magnitude'])
-            correlations.append(r)
-        
-        correlations = np.array(correlations)
+        if __package__:
+            from .resampling import bootstrap_correlation
+        else:
+            from resampling import bootstrap_correlation
         
-        # Percentiles para CI 95%
-        ci_lower = np.percentile(correlations, 2.5)
-        ci_upper = np.percentile(correlations, 97.5)
-        mean_r = np.mean(correlations)
+        result = bootstrap_correlation(self.df['ftrt'].values, self.df['magnitude'].values,
+                                       n_bootstrap=n_bootstrap, seed=seed, workers=workers)
+        correlations = result['correlations']
+        ci_lower, ci_upper = result['ci_lower'], result['ci_upper']
+        mean_r = result['mean']
         
         print(f"\nCorrelación media (bootstrap): {mean_r:.4f}")
         print(f"IC 95%: [{ci_lower:.4f}, {ci_upper:.4f}]")
+        print(f"IC 95% BCa: [{result['bca_lower']:.4f}, {result['bca_upper']:.4f}]")
         
         if ci_lower > 0:
             print("✓ La correlación es significativamente positiva (IC no incluye 0)")
@@ -69,38 +85,42 @@ class AdvancedFTRTAnalysis:
             'mean': mean_r,
             'ci_lower': ci_lower,
             'ci_upper': ci_upper,
+            'bca_lower': result['bca_lower'],
+            'bca_upper': result['bca_upper'],
             'correlations': correlations
         }
     
-    def permutation_test(self, n_permutations=10000):
+    def permutation_test(self, n_permutations=10000, seed=None, workers=None):
         """
         Test de permutación para p-value
         Más robusto que el p-value paramétrico para muestras pequeñas
+        
+        Exacto si hay pocos eventos; si no, se detiene en cuanto la
+        significancia (p < 0.05 o no) está decidida. seed y workers como
+        en bootstrap_correlation.
         """
         print("\n" + "="*70)
         print("TEST DE PERMUTACIÓN: Validación de Significancia")
         print("="*70)
         
-        # Correlación observada
-        r_observed, _ = stats.pearsonr(self.df['ftrt'], self.df['magnitude'])
-        
-        # Permutaciones
-        r_permuted = []
-        magnitude_orig = self.df['magnitude'].values
-        
-        for i in range(n_permutations):
-            # Permutar magnitudes aleatoriamente
-            magnitude_shuffled = np.random.permutation(magnitude_orig)
-            r_perm, _ = stats.pearsonr(self.df['ftrt'], magnitude_shuffled)
-            r_permuted.append(r_perm)
-        
-        r_permuted = np.array(r_permuted)
+        if __package__:
+            from .resampling import permutation_test
+        else:
+            from resampling import permutation_test
         
-        # p-value: proporción de permutaciones con |r| >= |r_observed|
-        p_value = np.mean(np.abs(r_permuted) >= np.abs(r_observed))
+        result = permutation_test(self.df['ftrt'].values, self.df['magnitude'].values,
+                                  n_permutations=n_permutations, seed=seed, workers=workers)
+        r_observed = result['r_observed']
+        r_permuted = result['r_permuted']
+        p_value = result['p_value']
         
         print(f"\nCorrelación observada: {r_observed:.4f}")
         print(f"p-value (permutación): {p_value:.6f}")
+        if result['exact']:
+            print(f"  (exacto: {result['n_permutations']} permutaciones)")
+        else:
+            print(f"  ({result['n_permutations']} permutaciones; "
+                  f"IC 99%: [{result['p_ci_lower']:.6f}, {result['p_ci_upper']:.6f}])")
         
         if p_value < 0.001:
             print("✓✓✓ Altamente significativo (p < 0.001)")
@@ -114,6 +134,10 @@ class AdvancedFTRTAnalysis:
         return {
             'r_observed': r_observed,
             'p_value': p_value,
+            'p_ci_lower': result['p_ci_lower'],
+            'p_ci_upper': result['p_ci_upper'],
+            'n_permutations': result['n_permutations'],
+            'exact': result['exact'],
             'r_permuted': r_permuted
         }
     
@@ -160,38 +184,100 @@ class AdvancedFTRTAnalysis:
         
         return outliers
     
-    def cross_validation(self):
+    def cross_validation(self, k=5, scheme='blocked', gap=0):
         """
         Validación cruzada del modelo predictivo
+        
+        Los eventos se ordenan por fecha y se parten en bloques contiguos,
+        de modo que eventos vecinos en el tiempo no queden repartidos entre
+        entrenamiento y test; con origen móvil solo se entrena con el
+        pasado. Incluye además el leave-one-out en forma cerrada.
+        
+        Args:
+            k: Número de pliegues
+            scheme: 'blocked' (bloques contiguos) o 'rolling' (origen móvil)
+            gap: Eventos excluidos del entrenamiento junto a cada bloque de test
+        
+        Returns:
+            array de R² por pliegue
         """
+        if __package__:
+            from .cross_validation import blocked_folds, cross_validate, loo_residuals, rolling_origin_folds
+        else:
+            from cross_validation import blocked_folds, cross_validate, loo_residuals, rolling_origin_folds
+        
         print("\n" + "="*70)
         print("VALIDACIÓN CRUZADA: Poder Predictivo")
         print("="*70)
         
-        X = self.df['ftrt'].values.reshape(-1, 1)
-        y = self.df['magnitude'].values
+        ordered = self.df.sort_values('date', kind='stable') if 'date' in self.df else self.df
+        X = ordered['ftrt'].values
+        y = ordered['magnitude'].values
         
-        model = LinearRegression()
-        
-        # 5-fold cross-validation
-        cv_scores = cross_val_score(model, X, y, cv=min(5, len(self.df)), 
-                                    scoring='r2')
+        make_folds = rolling_origin_folds if scheme == 'rolling' else blocked_folds
+        cv = cross_validate(X, y, make_folds(len(ordered), min(k, len(ordered)), gap))
+        cv_scores = cv['fold_r2']
+        loo = loo_residuals(X, y)
         
-        print(f"\nR² por fold:")
+        print(f"\nR² por fold ({'origen móvil' if scheme == 'rolling' else 'bloques temporales'}):")
         for i, score in enumerate(cv_scores, 1):
             print(f"  Fold {i}: {score:.4f}")
         
-        print(f"\nR² promedio: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+        print(f"\nR² promedio: {np.nanmean(cv_scores):.4f} ± {np.nanstd(cv_scores):.4f}")
+        print(f"R² leave-one-out (PRESS): {loo['r2']:.4f}")
         
-        if cv_scores.mean() > 0.5:
+        if np.nanmean(cv_scores) > 0.5:
             print("✓ El modelo tiene buen poder predictivo")
-        elif cv_scores.mean() > 0.3:
+        elif np.nanmean(cv_scores) > 0.3:
             print("⚠ El modelo tiene poder predictivo moderado")
         else:
             print("✗ El modelo tiene bajo poder predictivo")
         
         return cv_scores
     
+    def lagged_cross_correlation(self, ftrt_series, activity_series, max_lag_days=7305,
+                                 step_days=1.0, band='bartlett'):
+        """
+        Correlación cruzada FTRT vs índice de actividad a todos los desfases (FFT)
+        
+        Args:
+            ftrt_series: Serie de FTRT equiespaciada
+            activity_series: Índice de actividad alineado con ftrt_series
+                (ej. número de manchas diario; NaN en los huecos)
+            max_lag_days: Desfase máximo en días (default: ±20 años)
+            step_days: Paso de muestreo de ambas series
+            band: Banda de confianza ('white' o 'bartlett')
+        
+        Returns:
+            dict de cross_correlation.cross_correlation
+        """
+        if __package__:
+            from .cross_correlation import cross_correlation
+        else:
+            from cross_correlation import cross_correlation
+        
+        print("\n" + "="*70)
+        print("CORRELACIÓN CRUZADA CON DESFASE (FFT)")
+        print("="*70)
+        
+        result = cross_correlation(ftrt_series, activity_series,
+                                   max_lag=int(round(max_lag_days / step_days)),
+                                   band=band, step_days=step_days)
+        
+        if result['best_lag'] is None:
+            print("\n✗ Datos insuficientes para la correlación cruzada")
+            return result
+        
+        zero = int(np.searchsorted(result['lags'], 0))
+        best = int(np.searchsorted(result['lags'], result['best_lag']))
+        print(f"\nr a desfase 0: {result['r'][zero]:.4f} (banda ±{result['band'][zero]:.4f})")
+        print(f"Máxima |r|: {result['best_r']:.4f} a {result['best_lag'] * step_days:+.0f} días")
+        print(f"  (positivo: FTRT adelanta a la actividad; banda ±{result['band'][best]:.4f})")
+        print(f"Desfases significativos: {int(np.count_nonzero(result['significant']))} "
+              f"de {len(result['lags'])}")
+        
+        return result
+    
     def generate_visualizations(self, save_path='ftrt_analysis.png'):
         """
         Genera visualizaciones comprehensivas
@@ -210,15 +296,15 @@ class AdvancedFTRTAnalysis:
                    c=self.df['kp'], cmap='YlOrRd', edgecolors='black')
         
         # Línea de regresión
-        z = np.polyfit(self.df['ftrt'], self.df['magnitude'], 1)
-        p = np.poly1d(z)
+        summary = self.online.snapshot()
         x_line = np.linspace(self.df['ftrt'].min(), self.df['ftrt'].max(), 100)
-        ax1.plot(x_line, p(x_line), "r--", alpha=0.8, linewidth=2, label='Regresión')
+        ax1.plot(x_line, summary['intercept'] + summary['slope'] * x_line, "r--", alpha=0.8,
+                 linewidth=2, label='Regresión')
         
         # Umbral crítico
         ax1.axvline(x=2.5, color='orange', linestyle=':', linewidth=2, label='Umbral Crítico')
         
-        r, p_val = stats.pearsonr(self.df['ftrt'], self.df['magnitude'])
+        r, p_val = summary['correlation'], summary['p_value']
         ax1.text(0.05, 0.95, f'r = {r:.3f}\np = {p_val:.4f}', 
                 transform=ax1.transAxes, verticalalignment='top',
                 bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
@@ -284,7 +370,7 @@ class AdvancedFTRTAnalysis:
         
         # 6. Boxplot por nivel de alerta
         ax6 = axes[1, 2]
-        alert_order = ['NORMAL', 'ELEVADO', 'CRÍTICO', 'EXTREMO']
+        alert_order = list(ALERT_LEVELS)
         present_alerts = [a for a in alert_order if a in self.df['alert_level'].values]
         
         data_to_plot = [self.df[self.df['alert_level'] == alert]['magnitude'].values 
@@ -319,15 +405,16 @@ class AdvancedFTRTAnalysis:
             f.write("="*80 + "\n\n")
             
             # Estadísticas descriptivas
+            summary = self.online.snapshot()
             f.write("1. ESTADÍSTICAS DESCRIPTIVAS\n")
             f.write("-"*80 + "\n")
-            f.write(f"Muestra: n = {len(self.df)} eventos\n")
-            f.write(f"FTRT - Media: {self.df['ftrt'].mean():.4f}, Std: {self.df['ftrt'].std():.4f}\n")
+            f.write(f"Muestra: n = {summary['n']} eventos\n")
+            f.write(f"FTRT - Media: {summary['mean_x']:.4f}, Std: {np.sqrt(summary['var_x']):.4f}\n")
             f.write(f"FTRT - Rango: [{self.df['ftrt'].min():.2f}, {self.df['ftrt'].max():.2f}]\n")
-            f.write(f"Magnitud - Media: {self.df['magnitude'].mean():.2f}, Std: {self.df['magnitude'].std():.2f}\n\n")
+            f.write(f"Magnitud - Media: {summary['mean_y']:.2f}, Std: {np.sqrt(summary['var_y']):.2f}\n\n")
             
             # Correlación
-            r, p_val = stats.pearsonr(self.df['ftrt'], self.df['magnitude'])
+            r, p_val = summary['correlation'], summary['p_value']
             f.write("2. ANÁLISIS DE CORRELACIÓN\n")
             f.write("-"*80 + "\n")
             f.write(f"Correlación de Pearson: r = {r:.4f}\n")
@@ -358,9 +445,14 @@ class AdvancedFTRTAnalysis:
         print(f"\n✓ Reporte guardado en: {filename}")
 
 
-def run_complete_analysis(results_df):
+def run_complete_analysis(results_df, seed=None, workers=None):
     """
     Ejecuta análisis estadístico completo
+    
+    Args:
+        results_df: Resultados de la validación histórica
+        seed: Semilla para bootstrap y permutaciones (reproducible)
+        workers: Procesos para el remuestreo
     """
     print("\n" + "="*80)
     print("ANÁLISIS ESTADÍSTICO AVANZADO - MODELO FTRT")
@@ -369,10 +461,14 @@ def run_complete_analysis(results_df):
     analyzer = AdvancedFTRTAnalysis(results_df)
     
     # 1. Bootstrap
-    bootstrap_results = analyzer.bootstrap_correlation(n_bootstrap=10000)
+    # Flujos independientes para bootstrap y permutaciones
+    seeds = seed_sequence(seed).spawn(2)
+    bootstrap_results = analyzer.bootstrap_correlation(n_bootstrap=10000, seed=seeds[0],
+                                                       workers=workers)
     
     # 2. Permutation test
-    perm_results = analyzer.permutation_test(n_permutations=10000)
+    perm_results = analyzer.permutation_test(n_permutations=10000, seed=seeds[1],
+                                             workers=workers)
     
     # 3. Outliers
     outliers = analyzer.analyze_outliers()
@@ -404,8 +500,6 @@ def run_complete_analysis(results_df):
 # Ejemplo de uso con datos simulados
 if __name__ == "__main__":
     # Simular resultados (en producción, usar datos reales del otro script)
-    np.random.seed(42)
-    
     dates = pd.date_range('2000-01-01', periods=13, freq='365D')
     ftrt_values = np.array([3.21, 2.8, 2.3, 3.1, 4.87, 4.65, 2.9, 2.5, 2.7, 2.4, 1.4, 3.2, 1.34])
     magnitudes = np.array([45, 15, 5.7, 20, 17.2, 28, 8.7, 6.5, 6.9, 5.4, 1.4, 9.3, 5.8])
@@ -414,21 +508,15 @@ if __name__ == "__main__":
              'Halloween2', 'Jan2005', 'Dec2006', 'Aug2011', 'Mar2012', 
              'Jul2012', 'Sep2017', 'May2024']
     
-    def get_alert_level(ftrt):
-        if ftrt >= 4.0: return 'EXTREMO'
-        if ftrt >= 2.5: return 'CRÍTICO'
-        if ftrt >= 1.5: return 'ELEVADO'
-        return 'NORMAL'
-    
     results_df = pd.DataFrame({
         'date': dates.strftime('%Y-%m-%d'),
         'name': names,
         'ftrt': ftrt_values,
         'magnitude': magnitudes,
         'kp': kp_values,
-        'alert_level': [get_alert_level(f) for f in ftrt_values],
+        'alert_level': alert_level_names(classify_alert_levels(ftrt_values)),
         'x_class': [True] * len(dates)
     })
     
     # Ejecutar análisis completo
-    analysis_results = run_complete_analysis(results_df)
+    analysis_results = run_complete_analysis(results_df, seed=42)
@@ -6,19 +6,59 @@ Este sistema calcula las Fuerzas de Marea Relativas Totales (FTRT)
 usando posiciones planetarias precisas de NASA JPL Horizons.
 """
 
-import requests
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
-from scipy import stats
 import json
 
+# Importable como paquete (from src.ftrt_calculator import ...) o desde src/
+if __package__:
+    from .horizons_client import HorizonsClient
+    from .horizons_parser import HorizonsParseError, parse_horizons_stream
+    from .kepler_ephemeris import UNIX_EPOCH_JD, KeplerEphemeris
+    from .barycenter import barycenter_offset
+    from .tidal import alignment_ftrt
+    from .conjunctions import ConjunctionSearch
+    from .results_store import ResultsStore, as_dataframe
+    from .event_catalog import RESULT_EVENT_COLUMNS, EventCatalog
+    from .lag_join import lag_correlations, lag_join
+    from .online_stats import OnlineStats
+    from .utils import alert_level_names, as_step, classify_alert_levels, get_alert_level
+else:
+    from horizons_client import HorizonsClient
+    from horizons_parser import HorizonsParseError, parse_horizons_stream
+    from kepler_ephemeris import UNIX_EPOCH_JD, KeplerEphemeris
+    from barycenter import barycenter_offset
+    from tidal import alignment_ftrt
+    from conjunctions import ConjunctionSearch
+    from results_store import ResultsStore, as_dataframe
+    from event_catalog import RESULT_EVENT_COLUMNS, EventCatalog
+    from lag_join import lag_correlations, lag_join
+    from online_stats import OnlineStats
+    from utils import alert_level_names, as_step, classify_alert_levels, get_alert_level
+
+# Épocas por consulta TLIST a Horizons (acota la longitud de la URL)
+TLIST_CHUNK = 200
+
 class FTRTCalculator:
     """
     Calculadora FTRT con datos astronómicos reales
     """
     
-    def __init__(self):
+    def __init__(self, cache=None, client=None, ephemeris=None):
+        """
+        Args:
+            cache: EphemerisCache opcional para evitar consultas repetidas a Horizons
+            client: HorizonsClient opcional (default: cliente con pool y reintentos,
+                creado en la primera consulta online y cerrado con close())
+            ephemeris: Proveedor de efemérides offline (default: KeplerEphemeris)
+        """
+        self.cache = cache
+        self._client = client
+        self._owns_client = client is None
+        self.ephemeris = ephemeris if ephemeris is not None else KeplerEphemeris()
+        
         # Códigos NAIF para planetas (usados por JPL Horizons)
         self.planet_codes = {
             'Mercury': '199',
@@ -49,6 +89,66 @@ class FTRTCalculator:
         # 1 AU en km
         self.au_to_km = 149597870.7
         
+        # Distancias semi-major axis (promedio); sus claves son los planetas
+        # usados por defecto en los cálculos offline
+        self.avg_distances = {
+            'Jupiter': 5.203,
+            'Saturn': 9.537,
+            'Uranus': 19.191,
+            'Neptune': 30.069,
+            'Venus': 0.723,
+            'Earth': 1.000
+        }
+        
+    @property
+    def client(self):
+        """
+        Cliente de Horizons; el propio se crea solo al primer uso online
+        (el cálculo offline y los workers de proceso no abren pool ni sesión)
+        """
+        if self._client is None:
+            self._client = HorizonsClient()
+        return self._client
+    
+    def close(self):
+        """
+        Cierra el cliente de Horizons si lo creó la calculadora
+        """
+        if self._owns_client and self._client is not None:
+            self._client.close()
+            self._client = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _horizons_params(self, planet_code, start_time=None, stop_time=None, step_size='1d',
+                         tlist=None):
+        """
+        Construye los parámetros de consulta para JPL Horizons
+        
+        Con tlist (días julianos) se piden épocas sueltas en lugar de un
+        rango START_TIME/STOP_TIME/STEP_SIZE.
+        """
+        params = {
+            'format': 'text',
+            'COMMAND': planet_code,
+            'OBJ_DATA': 'YES',
+            'MAKE_EPHEM': 'YES',
+            'EPHEM_TYPE': 'OBSERVER',
+            'CENTER': '500@10',  # Sol
+            'QUANTITIES': '1,20'  # Coordenadas y distancias
+        }
+        if tlist is not None:
+            params['TLIST'] = ' '.join(f"'{jd:.6f}'" for jd in tlist)
+            params['TLIST_TYPE'] = 'JD'
+        else:
+            params.update({'START_TIME': start_time, 'STOP_TIME': stop_time,
+                           'STEP_SIZE': step_size})
+        return params
+    
     def get_planet_position(self, planet_code, date_str):
         """
         Obtiene la posición de un planeta desde JPL Horizons
@@ -61,53 +161,110 @@ class FTRTCalculator:
             dict con distancia al Sol (AU) y otras propiedades
         """
         
-        # URL de la API de JPL Horizons
-        url = 'https://ssd.jpl.nasa.gov/api/horizons.api'
+        if self.cache is not None:
+            cached = self.cache.get(planet_code, date_str)
+            if cached is not None:
+                return {'distance_au': cached['distance_au'], 'success': True, 'cached': True}
         
         # Parámetros para la consulta
-        params = {
-            'format': 'text',
-            'COMMAND': planet_code,
-            'OBJ_DATA': 'YES',
-            'MAKE_EPHEM': 'YES',
-            'EPHEM_TYPE': 'OBSERVER',
-            'CENTER': '500@10',  # Sol
-            'START_TIME': date_str,
-            'STOP_TIME': date_str,
-            'STEP_SIZE': '1d',
-            'QUANTITIES': '1,20'  # Coordenadas y distancias
-        }
+        params = self._horizons_params(planet_code, date_str, date_str)
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                # Parsear respuesta (simplificado)
-                text = response.text
+            with self.client.get(params, stream=True) as response:
+                if response.status_code != 200:
+                    return {'distance_au': None, 'success': False, 'error': f'HTTP {response.status_code}'}
                 
-                # Buscar la línea con la distancia
-                lines = text.split('\n')
-                for i, line in enumerate(lines):
-                    if '$$SOE' in line:  # Start of ephemeris
-                        data_line = lines[i + 1]
-                        parts = data_line.split()
-                        
-                        # La distancia suele estar en la columna específica
-                        # Esto es una aproximación - en producción necesitarías
-                        # parsear correctamente el formato de Horizons
-                        try:
-                            distance_au = float(parts[-2])
-                            return {'distance_au': distance_au, 'success': True}
-                        except:
-                            pass
+                # Parsear la tabla localizando la columna de distancia por la cabecera
+                parsed = parse_horizons_stream(response.iter_content(chunk_size=65536), keep_raw=True)
+                distance_au = float(parsed['r'][0]) if len(parsed['r']) else np.nan
                 
-                return {'distance_au': None, 'success': False, 'error': 'Could not parse distance'}
-            else:
-                return {'distance_au': None, 'success': False, 'error': f'HTTP {response.status_code}'}
+                if np.isnan(distance_au):
+                    return {'distance_au': None, 'success': False, 'error': 'Could not parse distance'}
+                
+                raw_row = parsed['raw'][0].decode('ascii', 'replace')
                 
+                if self.cache is not None:
+                    self.cache.put(planet_code, date_str, distance_au, raw_row)
+                
+                return {'distance_au': distance_au, 'success': True, 'raw_row': raw_row}
+                
+        except HorizonsParseError:
+            return {'distance_au': None, 'success': False, 'error': 'Could not parse distance'}
         except Exception as e:
             return {'distance_au': None, 'success': False, 'error': str(e)}
     
+    def get_planet_positions_range(self, planet_code, start_date, stop_date, step_size='1d'):
+        """
+        Obtiene todas las posiciones de un planeta en un rango de fechas
+        con una sola consulta a JPL Horizons
+        
+        Args:
+            planet_code: Código NAIF del planeta
+            start_date: Fecha inicial en formato 'YYYY-MM-DD'
+            stop_date: Fecha final en formato 'YYYY-MM-DD'
+            step_size: Paso de la efeméride en formato Horizons (ej. '1d')
+            
+        Returns:
+            dict con arrays 'dates' (datetime64) y 'distance_au'
+        """
+        
+        params = self._horizons_params(planet_code, start_date, stop_date, step_size)
+        return self._request_ephemeris(planet_code, params)
+    
+    def get_planet_positions_list(self, planet_code, dates):
+        """
+        Obtiene las posiciones de un planeta en épocas sueltas (TLIST)
+        con una sola consulta a JPL Horizons
+        
+        Args:
+            planet_code: Código NAIF del planeta
+            dates: Array datetime64 de épocas (hasta TLIST_CHUNK por consulta)
+            
+        Returns:
+            dict con arrays 'dates' (datetime64) y 'distance_au'
+        """
+        
+        seconds = np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+        params = self._horizons_params(planet_code, tlist=UNIX_EPOCH_JD + seconds / 86400.0)
+        return self._request_ephemeris(planet_code, params)
+    
+    def _request_ephemeris(self, planet_code, params):
+        """
+        Ejecuta una consulta de efeméride y parsea el bloque $$SOE-$$EOE
+        """
+        
+        empty = {'dates': np.array([], dtype='datetime64[s]'), 'distance_au': np.array([])}
+        
+        try:
+            with self.client.get(params, timeout=60, stream=True) as response:
+                if response.status_code != 200:
+                    return {**empty, 'success': False, 'error': f'HTTP {response.status_code}'}
+                
+                # Parseo incremental y vectorizado de todo el bloque $$SOE-$$EOE
+                parsed = parse_horizons_stream(response.iter_content(chunk_size=65536),
+                                               keep_raw=self.cache is not None)
+                valid = ~np.isnan(parsed['r'])
+                
+                if not valid.any():
+                    return {**empty, 'success': False, 'error': 'Could not parse ephemeris rows'}
+                
+                result = {
+                    'dates': parsed['epoch'][valid],
+                    'distance_au': parsed['r'][valid],
+                    'success': True
+                }
+                
+                if self.cache is not None:
+                    raw_rows = np.char.decode(parsed['raw'][valid], 'ascii')
+                    self.cache.put_many(planet_code, result['dates'], result['distance_au'], raw_rows)
+                
+                return result
+                
+        except HorizonsParseError:
+            return {**empty, 'success': False, 'error': 'Could not parse ephemeris rows'}
+        except Exception as e:
+            return {**empty, 'success': False, 'error': str(e)}
+    
     def calculate_ftrt(self, date_str, planets_to_include=None):
         """
         Calcula FTRT para una fecha específica
@@ -132,13 +289,16 @@ class FTRTCalculator:
         print(f"Calculando FTRT para {date_str}")
         print(f"{'='*60}")
         
-        for planet in planets_to_include:
-            if planet not in self.planet_codes:
-                continue
-                
-            print(f"\nConsultando posición de {planet}...")
-            
-            position = self.get_planet_position(self.planet_codes[planet], date_str)
+        planets = [p for p in planets_to_include if p in self.planet_codes]
+        
+        # Consultar todos los planetas en paralelo (concurrencia acotada por el cliente)
+        positions = self.client.map(
+            lambda planet: self.get_planet_position(self.planet_codes[planet], date_str),
+            planets
+        )
+        
+        for planet, position in zip(planets, positions):
+            print(f"\nPosición de {planet}:")
             
             if position['success'] and position['distance_au']:
                 distance_au = position['distance_au']
@@ -163,21 +323,11 @@ class FTRTCalculator:
                 errors.append(f"{planet}: {error_msg}")
                 print(f"  ✗ Error: {error_msg}")
         
-        # Calcular distancia del baricentro (simplificado)
-        # En realidad necesitarías calcular el centro de masa del sistema
-        jupiter_dist = breakdown.get('Jupiter', {}).get('distance_au', 5.2)
-        barycenter_dist = (jupiter_dist - 1.0) * 0.001 * self.planet_masses['Jupiter']
-        barycenter_dist = max(0.01, min(barycenter_dist, 3.0))  # Rango típico: 0-3 R☉
+        # Distancia del baricentro: centro de masa con los vectores de los ocho planetas
+        barycenter_dist = float(self.barycenter_distances([date_str])[0])
         
         # Determinar nivel de alerta
-        if ftrt_total >= 4.0:
-            alert_level = 'EXTREMO'
-        elif ftrt_total >= 2.5:
-            alert_level = 'CRÍTICO'
-        elif ftrt_total >= 1.5:
-            alert_level = 'ELEVADO'
-        else:
-            alert_level = 'NORMAL'
+        alert_level = get_alert_level(ftrt_total)
         
         result = {
             'date': date_str,
@@ -196,7 +346,67 @@ class FTRTCalculator:
         
         return result
     
-    def calculate_ftrt_offline(self, date_str, manual_distances=None):
+    def barycenter_distances(self, dates):
+        """
+        Distancia del centro del Sol al baricentro del sistema solar
+        
+        Usa los vectores heliocéntricos de los ocho planetas de la
+        efeméride offline, ponderados por masa.
+        
+        Args:
+            dates: Array de fechas
+            
+        Returns:
+            Array de distancias en radios solares
+        """
+        planets = list(self.planet_masses)
+        positions = self.ephemeris.positions(planets, dates)
+        masses = np.array([self.planet_masses[p] for p in planets])
+        return np.linalg.norm(barycenter_offset(positions, masses), axis=-1)
+    
+    def alignment_series(self, planets, dates, distances=None, mode='tensor'):
+        """
+        FTRT sensible al alineamiento (ver tidal.alignment_ftrt)
+        
+        Las direcciones salen de la efeméride offline; si se dan
+        distancias (ej. de Horizons), se reescalan los vectores a ellas.
+        
+        Args:
+            planets: Lista de planetas
+            dates: Array de fechas
+            distances: Array opcional (planetas × fechas) en AU
+            mode: 'tensor' o 'vector'
+            
+        Returns:
+            dict de tidal.alignment_ftrt
+        """
+        positions = self.ephemeris.positions(planets, dates)
+        if distances is not None:
+            unit = positions / np.linalg.norm(positions, axis=-1)[..., np.newaxis]
+            positions = unit * np.asarray(distances, dtype=float)[..., np.newaxis]
+        masses = np.array([self.planet_masses[p] for p in planets])
+        return alignment_ftrt(positions, masses, mode=mode)
+    
+    def find_conjunctions(self, planets, start, stop, tolerance_deg=10.0, step_days=None):
+        """
+        Busca configuraciones en las que los planetas quedan alineados en
+        longitud heliocéntrica (ver conjunctions.ConjunctionSearch)
+        
+        Args:
+            planets: Subconjunto de planetas
+            start: Fecha inicial
+            stop: Fecha final
+            tolerance_deg: Arco máximo que debe contener a todos los planetas
+            step_days: Paso del barrido grueso (default: automático)
+            
+        Returns:
+            Array estructurado con 'start', 'end', 'duration_days',
+            'min_spread_deg' y 'peak' por intervalo
+        """
+        return ConjunctionSearch(self.ephemeris).find(planets, start, stop,
+                                                      tolerance_deg, step_days)
+    
+    def calculate_ftrt_offline(self, date_str, manual_distances=None, alignment=None):
         """
         Calcula FTRT usando distancias manuales (para cuando la API falla)
         Usa órbitas keplerianas simplificadas
@@ -204,26 +414,19 @@ class FTRTCalculator:
         Args:
             date_str: Fecha en formato 'YYYY-MM-DD'
             manual_distances: Dict opcional con distancias manuales en AU
+            alignment: None, 'tensor' o 'vector'; si se indica, añade la
+                FTRT sensible al alineamiento y su eje dominante
         """
         
         date = datetime.strptime(date_str, '%Y-%m-%d')
         
-        # Distancias semi-major axis (promedio)
-        avg_distances = {
-            'Jupiter': 5.203,
-            'Saturn': 9.537,
-            'Uranus': 19.191,
-            'Neptune': 30.069,
-            'Venus': 0.723,
-            'Earth': 1.000
-        }
+        # Distancias de la efeméride offline (órbitas elípticas) en la fecha
+        planets = list(self.avg_distances)
+        distances = dict(zip(planets, self.ephemeris.distances(planets, [date])[:, 0]))
         
         # Si se proporcionan distancias manuales, usarlas
         if manual_distances:
-            distances = {**avg_distances, **manual_distances}
-        else:
-            # Usar distancias promedio con pequeña variación
-            distances = avg_distances
+            distances = {**distances, **manual_distances}
         
         ftrt_total = 0
         breakdown = {}
@@ -239,13 +442,12 @@ class FTRTCalculator:
                 'ftrt_contribution': contribution
             }
         
-        # Estimar baricentro (simplificado)
-        jupiter_dist = distances['Jupiter']
-        barycenter_dist = abs(jupiter_dist - 5.2) * 0.5
+        # Baricentro a partir de los vectores de posición de la efeméride
+        barycenter_dist = float(self.barycenter_distances([date])[0])
         
-        alert_level = 'EXTREMO' if ftrt_total >= 4.0 else 'CRÍTICO' if ftrt_total >= 2.5 else 'ELEVADO' if ftrt_total >= 1.5 else 'NORMAL'
+        alert_level = get_alert_level(ftrt_total)
         
-        return {
+        result = {
             'date': date_str,
             'ftrt_total': ftrt_total,
             'alert_level': alert_level,
@@ -253,6 +455,217 @@ class FTRTCalculator:
             'planets': breakdown,
             'method': 'offline_estimation'
         }
+        
+        if alignment is not None:
+            planets = list(distances)
+            aligned = self.alignment_series(planets, [date], [[distances[p]] for p in planets],
+                                            mode=alignment)
+            result['ftrt_aligned'] = float(aligned['ftrt_aligned'][0])
+            result['alignment_axis'] = aligned['axis'][0]
+            result['alignment_index'] = float(aligned['alignment_index'][0])
+        
+        return result
+    
+    def calculate_ftrt_series(self, start=None, stop=None, step=1, dates=None,
+                              planets_to_include=None, distances=None, use_offline=True,
+                              alignment=None):
+        """
+        Calcula FTRT para una serie de fechas de forma vectorizada
+        
+        En lugar de iterar fecha por fecha, construye una matriz
+        planetas × fechas y aplica la fórmula FTRT con broadcasting
+        de NumPy sobre la tabla de masas. No imprime nada por fecha.
+        
+        Args:
+            start: Fecha inicial ('YYYY-MM-DD', datetime o datetime64)
+            stop: Fecha final (inclusive)
+            step: Paso entre fechas; entero en días o np.timedelta64
+            dates: Array de fechas explícito (alternativa a start/stop/step)
+            planets_to_include: Lista de planetas (default: los de avg_distances)
+            distances: Distancias en AU; dict planeta -> escalar/array,
+                o array de forma (n_planetas, n_fechas). Los planetas que
+                falten en el dict usan la efeméride offline (self.ephemeris).
+            use_offline: Si False, obtiene las distancias de JPL Horizons
+                con una sola consulta de rango por planeta (solo fechas
+                a las 00:00 UT)
+            alignment: None, 'tensor' o 'vector'; si se indica, añade
+                'ftrt_aligned', 'alignment_axis' (fechas × 3) y
+                'alignment_index' calculados con los vectores de posición
+            
+        Returns:
+            dict con fechas, contribuciones (planetas × fechas), FTRT total
+            y nivel de alerta por fecha
+        """
+        
+        if dates is None:
+            if start is None or stop is None:
+                raise ValueError("Se requiere 'dates' o bien 'start' y 'stop'")
+            step = as_step(step)
+            start = np.datetime64(start, 's')
+            stop = np.datetime64(stop, 's')
+            dates = np.arange(start, stop + np.timedelta64(1, 's'), step)
+        dates = np.asarray(dates, dtype='datetime64[s]').ravel()
+        
+        if planets_to_include is None:
+            planets_to_include = list(self.avg_distances)
+        planets = [p for p in planets_to_include if p in self.planet_masses]
+        
+        masses = np.array([self.planet_masses[p] for p in planets])
+        errors = []
+        
+        failed_planets = []
+        if not use_offline and distances is None:
+            distances, errors = self._fetch_distances_range(planets, dates)
+            failed_planets = [p for p, row in zip(planets, distances) if np.isnan(row).any()]
+            incomplete = np.isnan(distances).any(axis=0)
+        
+        if distances is None or isinstance(distances, dict):
+            provided = distances or {}
+            missing = [p for p in planets if p not in provided]
+            computed = {}
+            if missing:
+                computed = dict(zip(missing, self.ephemeris.distances(missing, dates)))
+            distances = {**computed, **provided}
+            distances = [np.broadcast_to(np.asarray(distances[p], dtype=float), dates.shape)
+                         for p in planets]
+        distances = np.broadcast_to(np.asarray(distances, dtype=float),
+                                    (len(planets), len(dates)))
+        
+        # Fórmula FTRT: (M_p * R_sol) / d^3, para todos los planetas y fechas
+        # (los planetas sin distancia, NaN, se omiten del total)
+        contributions = (masses[:, np.newaxis] * self.sun_radius) / distances ** 3
+        ftrt_total = np.nansum(contributions, axis=0)
+        if failed_planets:
+            # Un planeta sin datos de Horizons no se omite en silencio:
+            # el total de esas fechas queda indefinido
+            ftrt_total[incomplete] = np.nan
+        
+        # Baricentro con los vectores de los ocho planetas, vectorizado en el tiempo
+        barycenter_dist = self.barycenter_distances(dates)
+        
+        alert_level = alert_level_names(classify_alert_levels(ftrt_total))
+        
+        result = {
+            'dates': dates,
+            'planets': planets,
+            'distances_au': distances,
+            'contributions': contributions,
+            'ftrt_total': ftrt_total,
+            'alert_level': alert_level,
+            'barycenter_distance_rsun': barycenter_dist,
+            'errors': errors,
+            'failed_planets': failed_planets,
+            'method': 'vectorized_series' if use_offline else 'horizons_range'
+        }
+        
+        if alignment is not None:
+            aligned = self.alignment_series(planets, dates, distances, mode=alignment)
+            result['ftrt_aligned'] = aligned['ftrt_aligned']
+            result['alignment_axis'] = aligned['axis']
+            result['alignment_index'] = aligned['alignment_index']
+        
+        return result
+    
+    def _fetch_distances_range(self, planets, dates):
+        """
+        Obtiene distancias de JPL Horizons para una serie de fechas
+        
+        Si las fechas son equiespaciadas en días se hace una consulta de
+        rango por planeta con exactamente ese paso; si no (ej. eventos
+        históricos dispersos entre 1859 y 2024), se piden solo las épocas
+        solicitadas con TLIST, en bloques de TLIST_CHUNK. Las fechas sin
+        fila en la respuesta quedan NaN y se informan en los errores.
+        Si hay caché y contiene todas las fechas de un planeta, no se
+        consulta la red para ese planeta.
+        
+        La consulta online (y la caché) trabaja con resolución diaria: las
+        fechas deben caer a las 00:00 UT, así que un paso subdiario se
+        rechaza en lugar de asignar a cada época la distancia de su día.
+        
+        Returns:
+            Tupla (array planetas × fechas de distancias en AU, lista de errores)
+            
+        Raises:
+            ValueError: Si alguna fecha no está a las 00:00 UT
+        """
+        
+        distances = np.full((len(planets), len(dates)), np.nan)
+        errors = []
+        
+        if len(dates) == 0:
+            return distances, errors
+        
+        days = dates.astype('datetime64[D]')
+        off_day = dates != days
+        if off_day.any():
+            raise ValueError(f"El modo online requiere fechas a las 00:00 UT (resolución diaria); "
+                             f"{int(off_day.sum())} fechas no lo están, ej. {dates[off_day][0]}")
+        start_date, stop_date = str(days.min()), str(days.max())
+        
+        deltas = np.diff(days).astype(int)
+        equispaced = len(deltas) == 0 or (deltas[0] > 0 and np.all(deltas == deltas[0]))
+        step_size = f'{deltas[0]}d' if len(deltas) > 0 and equispaced else '1d'
+        unique_days = np.unique(days)
+        
+        pending = []
+        
+        for i, planet in enumerate(planets):
+            if planet not in self.planet_codes:
+                continue
+            
+            if self.cache is not None:
+                cached, found = self.cache.get_many(self.planet_codes[planet], dates)
+                if found.all():
+                    distances[i] = cached
+                    continue
+            
+            pending.append((i, planet))
+        
+        # Una consulta de rango (o de épocas sueltas) por planeta, en paralelo
+        if equispaced:
+            requests_ = [(i, planet, None) for i, planet in pending]
+        else:
+            requests_ = [(i, planet, unique_days[first:first + TLIST_CHUNK])
+                         for i, planet in pending
+                         for first in range(0, len(unique_days), TLIST_CHUNK)]
+        
+        def fetch(item):
+            _, planet, epochs = item
+            if epochs is None:
+                return self.get_planet_positions_range(self.planet_codes[planet],
+                                                       start_date, stop_date, step_size)
+            return self.get_planet_positions_list(self.planet_codes[planet], epochs)
+        
+        fetched_all = self.client.map(fetch, requests_)
+        
+        by_planet = {}
+        for (i, planet, _), fetched in zip(requests_, fetched_all):
+            by_planet.setdefault((i, planet), []).append(fetched)
+        
+        for (i, planet), parts in by_planet.items():
+            failures = [part for part in parts if not part['success']]
+            if failures:
+                errors.append(f"{planet}: {failures[0].get('error', 'Unknown error')}")
+            parts = [part for part in parts if part['success']]
+            if not parts:
+                continue
+            fetched = {
+                'dates': np.concatenate([part['dates'] for part in parts]),
+                'distance_au': np.concatenate([part['distance_au'] for part in parts])
+            }
+            order = np.argsort(fetched['dates'], kind='stable')
+            fetched = {key: value[order] for key, value in fetched.items()}
+            
+            # Alinear las filas recibidas con las fechas solicitadas
+            fetched_days = fetched['dates'].astype('datetime64[D]')
+            idx = np.clip(np.searchsorted(fetched_days, days), 0, len(fetched_days) - 1)
+            found = fetched_days[idx] == days
+            distances[i, found] = fetched['distance_au'][idx[found]]
+            
+            if not found.all() and not failures:
+                errors.append(f"{planet}: {int((~found).sum())} fechas sin datos")
+        
+        return distances, errors
 
 
 class HistoricalValidator:
@@ -260,10 +673,19 @@ class HistoricalValidator:
     Valida el modelo FTRT contra eventos solares históricos
     """
     
-    def __init__(self):
-        self.calculator = FTRTCalculator()
+    def __init__(self, cache=None, client=None, catalog=None):
+        """
+        Args:
+            cache: EphemerisCache opcional que se pasa a la calculadora
+            client: HorizonsClient opcional que se pasa a la calculadora
+            catalog: EventCatalog o ruta de un catálogo de eventos (ej.
+                event_catalog.DEFAULT_CATALOG_PATH); se lee por bloques en
+                cada cálculo, nunca completo. Si es None se usan los
+                eventos verificados de abajo
+        """
+        self.calculator = FTRTCalculator(cache=cache, client=client)
         
-        # Eventos solares históricos VERIFICADOS
+        # Eventos solares históricos VERIFICADOS (respaldo sin catálogo)
         self.historical_events = [
             {'date': '1859-09-01', 'name': 'Carrington Event', 'magnitude': 45, 'kp': 9, 'x_class': True},
             {'date': '1989-03-13', 'name': 'Quebec Blackout', 'magnitude': 15, 'kp': 9, 'x_class': True},
@@ -279,69 +701,270 @@ class HistoricalValidator:
             {'date': '2017-09-06', 'name': 'September 2017', 'magnitude': 9.3, 'kp': 8, 'x_class': True},
             {'date': '2024-05-10', 'name': 'May 2024', 'magnitude': 5.8, 'kp': 9, 'x_class': True},
         ]
+        
+        if isinstance(catalog, str):
+            catalog = EventCatalog(catalog)
+        self.catalog = catalog
     
-    def calculate_all_historical(self, use_offline=True):
+    def calculate_all_historical(self, use_offline=True, workers=None, chunk_size=None,
+                                 progress=None):
         """
         Calcula FTRT para todos los eventos históricos
         
+        Con catálogo, los eventos se recorren por bloques (ver
+        calculate_catalog) sin cargar el archivo completo; sin catálogo se
+        usan los eventos verificados de historical_events.
+        
         Args:
-            use_offline: Si True, usa cálculo offline (más rápido, menos preciso)
+            use_offline: Si True, usa cálculo offline (más rápido, menos preciso).
+                Si False, consulta JPL Horizons con una petición de rango por planeta
+            workers: Si se indica (offline), reparte los eventos en bloques
+                entre un pool de procesos con ese número de workers
+            chunk_size: Eventos por bloque en modo paralelo
+                (default: ~4 bloques por worker)
+            progress: Función opcional progress(hechos, total), llamada en el
+                proceso principal al terminar cada bloque
+                
+        Returns:
+            ResultsStore con una fila por evento y una columna de
+            contribución por planeta
         """
         
-        results = []
+        if self.catalog is not None:
+            if not use_offline:
+                return ResultsStore.concat([self._calculate_all_historical_online(chunk)
+                                            for chunk in self.catalog.iter_chunks()])
+            return self.calculate_catalog(self.catalog, workers, progress)
+        
+        if not use_offline:
+            return self._calculate_all_historical_online()
+        
+        if workers is not None:
+            return self._calculate_all_historical_parallel(workers, chunk_size, progress)
+        
+        events = self.historical_events
+        planets = list(self.calculator.avg_distances)
         
-        for event in self.historical_events:
+        ftrt = np.empty(len(events))
+        alert_level = []
+        barycenter_dist = np.empty(len(events))
+        contributions = np.full((len(planets), len(events)), np.nan)
+        
+        for i, event in enumerate(events):
             print(f"\nProcesando: {event['name']} ({event['date']})")
             
-            if use_offline:
-                ftrt_result = self.calculator.calculate_ftrt_offline(event['date'])
-            else:
-                ftrt_result = self.calculator.calculate_ftrt(event['date'])
+            ftrt_result = self.calculator.calculate_ftrt_offline(event['date'])
             
-            result = {
-                **event,
-                'ftrt': ftrt_result['ftrt_total'],
-                'alert_level': ftrt_result['alert_level'],
-                'barycenter_dist': ftrt_result['barycenter_distance_rsun']
-            }
+            ftrt[i] = ftrt_result['ftrt_total']
+            alert_level.append(ftrt_result['alert_level'])
+            barycenter_dist[i] = ftrt_result['barycenter_distance_rsun']
+            for j, planet in enumerate(planets):
+                if planet in ftrt_result['planets']:
+                    contributions[j, i] = ftrt_result['planets'][planet]['ftrt_contribution']
+        
+        return ResultsStore.from_events(events, ftrt, alert_level, barycenter_dist,
+                                        contributions, planets)
+    
+    def _calculate_all_historical_parallel(self, workers, chunk_size=None, progress=None):
+        """
+        Cálculo offline repartido en un pool de procesos
+        
+        Cada worker crea una vez su propia calculadora (con la misma
+        efeméride) y procesa bloques de eventos con calculate_ftrt_series.
+        Los bloques se colocan por su posición, así que el resultado
+        conserva el orden de los eventos sea cual sea el orden de llegada.
+        """
+        
+        events = self.historical_events
+        planets = list(self.calculator.avg_distances)
+        dates = np.array([event['date'] for event in events], dtype='datetime64[s]')
+        n = len(events)
+        
+        if chunk_size is None:
+            chunk_size = max(1, min(4096, -(-n // (workers * 4))))
+        
+        ftrt = np.empty(n)
+        alert_codes = np.empty(n, dtype=np.uint8)
+        barycenter_dist = np.empty(n)
+        contributions = np.empty((len(planets), n))
+        done = 0
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_historical_worker,
+                                 initargs=(self.calculator.ephemeris,)) as executor:
+            futures = [
+                executor.submit(_historical_chunk, start, dates[start:start + chunk_size], planets)
+                for start in range(0, n, chunk_size)
+            ]
+            for future in as_completed(futures):
+                start, chunk_ftrt, chunk_alert, chunk_bary, chunk_contrib = future.result()
+                chunk = slice(start, start + len(chunk_ftrt))
+                ftrt[chunk] = chunk_ftrt
+                alert_codes[chunk] = chunk_alert
+                barycenter_dist[chunk] = chunk_bary
+                contributions[:, chunk] = chunk_contrib
+                
+                done += len(chunk_ftrt)
+                if progress is not None:
+                    progress(done, n)
+        
+        return ResultsStore.from_events(events, ftrt, alert_codes, barycenter_dist,
+                                        contributions, planets)
+    
+    def calculate_catalog(self, catalog, workers=None, progress=None):
+        """
+        Calcula FTRT (offline) para un catálogo de eventos leído por bloques
+        
+        Cada bloque del catálogo se calcula de forma vectorizada, en el
+        proceso actual o en un pool de procesos, sin cargar el archivo
+        completo. De cada bloque solo se conservan las columnas de
+        resultados y las del evento que usa el análisis (fecha, magnitud,
+        kp, x_class); nombres y columnas extra se descartan.
+        
+        Args:
+            catalog: EventCatalog (o ruta a un CSV/Parquet)
+            workers: Si se indica, número de procesos del pool
+            progress: Función opcional progress(eventos_hechos, None)
             
-            results.append(result)
+        Returns:
+            ResultsStore con todos los eventos válidos del catálogo
+        """
+        
+        if isinstance(catalog, str):
+            catalog = EventCatalog(catalog)
+        
+        planets = list(self.calculator.avg_distances)
+        stores = []
+        done = 0
+        
+        def collect(chunk, result):
+            nonlocal done
+            _, ftrt, alert_codes, barycenter_dist, contributions = result
+            events = chunk[[c for c in RESULT_EVENT_COLUMNS if c in chunk]]
+            stores.append(ResultsStore.from_events(events, ftrt, alert_codes, barycenter_dist,
+                                                   contributions, planets))
+            done += len(chunk)
+            if progress is not None:
+                progress(done, None)
         
-        return results
+        if workers is None:
+            for chunk in catalog.iter_chunks():
+                collect(chunk, _series_chunk(self.calculator, 0, chunk['date'].to_numpy(), planets))
+            return ResultsStore.concat(stores)
+        
+        # Como máximo 2 bloques por worker en vuelo: la memoria no crece con el archivo
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_historical_worker,
+                                 initargs=(self.calculator.ephemeris,)) as executor:
+            pending = []
+            for chunk in catalog.iter_chunks():
+                pending.append((chunk, executor.submit(_historical_chunk, 0,
+                                                       chunk['date'].to_numpy(), planets)))
+                if len(pending) >= 2 * workers:
+                    chunk, future = pending.pop(0)
+                    collect(chunk, future.result())
+            for chunk, future in pending:
+                collect(chunk, future.result())
+        
+        return ResultsStore.concat(stores)
     
-    def statistical_analysis(self, results):
+    def _calculate_all_historical_online(self, events=None):
         """
-        Realiza análisis estadístico de correlación
+        Calcula FTRT con JPL Horizons para todos los eventos, usando una
+        consulta de rango por planeta en lugar de una por planeta y evento
+        
+        Args:
+            events: Lista de eventos o bloque de EventCatalog
+                (default: historical_events)
         """
         
-        df = pd.DataFrame(results)
+        print("\nConsultando JPL Horizons (una consulta de rango por planeta)...")
         
-        # Correlación de Pearson
-        correlation, p_value = stats.pearsonr(df['ftrt'], df['magnitude'])
+        if events is None:
+            events = self.historical_events
+        if isinstance(events, pd.DataFrame):
+            events = events[[c for c in RESULT_EVENT_COLUMNS if c in events]]
+            dates = events['date'].to_numpy()
+        else:
+            dates = [event['date'] for event in events]
+        planets = ['Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Venus', 'Earth']
+        series = self.calculator.calculate_ftrt_series(
+            dates=dates, planets_to_include=planets, use_offline=False
+        )
         
-        # R²
-        r_squared = correlation ** 2
+        for error in series['errors']:
+            print(f"  ✗ Error: {error}")
         
-        # Regresión lineal
-        slope, intercept, r_value, p_value_reg, std_err = stats.linregress(df['ftrt'], df['magnitude'])
+        return ResultsStore.from_events(
+            events, series['ftrt_total'], series['alert_level'],
+            series['barycenter_distance_rsun'], series['contributions'], series['planets']
+        )
+    
+    def lead_time_analysis(self, results, series, lags_days=range(0, 31), window_days=(-30, 0)):
+        """
+        Evalúa el tiempo de anticipación de la FTRT sobre una serie ya calculada
         
-        # Clasificación (umbral FTRT = 2.5)
-        df['predicted_storm'] = df['ftrt'] > 2.5
-        df['actual_storm'] = df['x_class']
+        Une cada evento con la FTRT de la serie a varios desfases y con
+        agregados de la ventana previa (lag_join), sin recalcular FTRT por
+        evento y desfase, y correlaciona cada desfase con la magnitud.
         
-        tp = ((df['predicted_storm'] == True) & (df['actual_storm'] == True)).sum()
-        fp = ((df['predicted_storm'] == True) & (df['actual_storm'] == False)).sum()
-        tn = ((df['predicted_storm'] == False) & (df['actual_storm'] == False)).sum()
-        fn = ((df['predicted_storm'] == False) & (df['actual_storm'] == True)).sum()
+        Args:
+            results: ResultsStore, DataFrame o lista de dicts (con 'date' y 'magnitude')
+            series: Resultado de calculate_ftrt_series (o dict con 'dates' y 'ftrt_total')
+            lags_days: Desfases en días antes del evento
+            window_days: Ventana (inicio, fin) en días relativa al evento
+            
+        Returns:
+            dict con r por desfase, mejor desfase y correlación del máximo de la ventana
+        """
+        
+        df = as_dataframe(results)
+        event_dates = pd.to_datetime(df['date']).to_numpy()
+        magnitude = df['magnitude'].to_numpy(dtype=float)
+        
+        joined = lag_join(series['dates'], series['ftrt_total'], event_dates,
+                          lags_days=list(lags_days), window_days=window_days)
+        r_by_lag = lag_correlations(joined['lagged'], magnitude)
+        r_window_max = lag_correlations(joined['window_max'][:, np.newaxis], magnitude)[0]
+        
+        best = int(np.nanargmax(np.abs(r_by_lag))) if np.isfinite(r_by_lag).any() else None
+        
+        return {
+            'lags_days': joined['lags_days'],
+            'r_by_lag': r_by_lag,
+            'best_lag_days': float(joined['lags_days'][best]) if best is not None else None,
+            'best_r': float(r_by_lag[best]) if best is not None else None,
+            'r_window_max': r_window_max,
+            'window_argmax_lag_days': joined['window_argmax_lag_days'],
+            'joined': joined
+        }
+    
+    def statistical_analysis(self, results, series=None, accumulator=None):
+        """
+        Realiza análisis estadístico de correlación
+        
+        Args:
+            results: ResultsStore, DataFrame o lista de dicts
+            series: Serie de FTRT opcional (calculate_ftrt_series) para
+                evaluar el tiempo de anticipación (ver lead_time_analysis)
+            accumulator: OnlineStats opcional; los eventos se añaden a él y
+                el análisis refleja todo lo acumulado (lotes sucesivos)
+        """
         
-        precision = tp / (tp + fp) if (tp + fp) > 0 else 0
-        recall = tp / (tp + fn) if (tp + fn) > 0 else 0
-        accuracy = (tp + tn) / len(df)
+        df = as_dataframe(results)
+        
+        # Correlación, regresión y clasificación (umbral FTRT = 2.5) en una pasada
+        if accumulator is None:
+            accumulator = OnlineStats(threshold=2.5)
+        summary = accumulator.update(df['ftrt'], df['magnitude'], df['x_class']).snapshot()
+        correlation, p_value = summary['correlation'], summary['p_value']
+        r_squared = summary['r_squared']
+        slope, intercept, std_err = summary['slope'], summary['intercept'], summary['std_err']
+        precision, recall, accuracy = summary['precision'], summary['recall'], summary['accuracy']
+        tp, fp, tn, fn = (summary['confusion_matrix'][key] for key in ('tp', 'fp', 'tn', 'fn'))
         
         print("\n" + "="*70)
         print("ANÁLISIS ESTADÍSTICO COMPLETO")
         print("="*70)
-        print(f"\nMuestra: n = {len(df)} eventos")
+        print(f"\nMuestra: n = {summary['n']} eventos")
         print(f"\nCORRELACIÓN:")
         print(f"  Pearson r = {correlation:.4f}")
         print(f"  R² = {r_squared:.4f}")
@@ -371,6 +994,14 @@ class HistoricalValidator:
             print("  ✗ Correlación DÉBIL o no significativa")
             print("  ✗ El modelo en su forma actual NO predice tormentas solares")
         
+        lead_time = None
+        if series is not None:
+            lead_time = self.lead_time_analysis(df, series)
+            print(f"\nTIEMPO DE ANTICIPACIÓN (serie de {len(series['dates'])} épocas):")
+            if lead_time['best_lag_days'] is not None:
+                print(f"  Mejor desfase = {lead_time['best_lag_days']:.0f} días (r = {lead_time['best_r']:.4f})")
+            print(f"  r (máximo FTRT en la ventana previa) = {lead_time['r_window_max']:.4f}")
+        
         print("\n" + "="*70)
         
         return {
@@ -382,19 +1013,52 @@ class HistoricalValidator:
             'precision': precision,
             'recall': recall,
             'accuracy': accuracy,
-            'confusion_matrix': {'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn}
+            'confusion_matrix': {'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn},
+            'lead_time': lead_time
         }
     
     def export_results(self, results, filename='ftrt_validation_results.csv'):
         """
         Exporta resultados a CSV
+        
+        Args:
+            results: ResultsStore, DataFrame o lista de dicts
+            filename: Ruta del CSV
         """
-        df = pd.DataFrame(results)
+        df = as_dataframe(results)
         df.to_csv(filename, index=False)
         print(f"\n✓ Resultados exportados a: {filename}")
         return filename
 
 
+# Calculadora de cada proceso del pool (se crea una vez por worker)
+_WORKER_CALCULATOR = None
+
+
+def _init_historical_worker(ephemeris):
+    """Inicializador del pool: crea la calculadora del proceso."""
+    global _WORKER_CALCULATOR
+    _WORKER_CALCULATOR = FTRTCalculator(ephemeris=ephemeris)
+
+
+def _historical_chunk(start, dates, planets):
+    """Calcula un bloque de eventos en un worker (ver _series_chunk)."""
+    return _series_chunk(_WORKER_CALCULATOR, start, dates, planets)
+
+
+def _series_chunk(calculator, start, dates, planets):
+    """
+    Calcula un bloque de eventos con una calculadora
+    
+    Returns:
+        tupla (posición del bloque, FTRT, códigos de alerta, baricentro,
+        contribuciones planetas × eventos)
+    """
+    series = calculator.calculate_ftrt_series(dates=dates, planets_to_include=planets)
+    return (start, series['ftrt_total'], classify_alert_levels(series['ftrt_total']),
+            series['barycenter_distance_rsun'], series['contributions'])
+
+
 def main():
     """
     Función principal - Ejecuta validación completa
@@ -406,6 +1070,7 @@ def main():
     print("="*70)
     
     validator = HistoricalValidator()
+    print(f"\nEventos: {len(validator.historical_events)}")
     
     # Calcular FTRT para todos los eventos históricos
     print("\n[1/3] Calculando FTRT para eventos históricos...")
@@ -0,0 +1,361 @@
+"""
+Monitor incremental de FTRT para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Mantiene en disco una serie temporal de FTRT que solo crece: cada
+ejecución calcula las épocas nuevas desde la última guardada, las añade
+al final de un archivo binario de registros fijos y actualiza un estado
+JSON (nivel de alerta actual, distancia al siguiente umbral) que se
+reemplaza de forma atómica. El refresco diario cuesta O(días nuevos).
+Los eventos observados se asocian a la serie y alimentan un acumulador
+online (OnlineStats) guardado en el mismo estado, de modo que la
+correlación FTRT-magnitud se mantiene al día sin recorrer el histórico.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+if __package__:
+    from .online_stats import OnlineStats
+    from .utils import ALERT_LEVELS, ALERT_THRESHOLDS, classify_alert_levels
+else:
+    from online_stats import OnlineStats
+    from utils import ALERT_LEVELS, ALERT_THRESHOLDS, classify_alert_levels
+
+
+DEFAULT_MONITOR_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'ftrt_monitor'
+)
+
+# Registro fijo de la serie: época Unix, FTRT, baricentro (R☉), nivel de alerta
+RECORD_DTYPE = np.dtype([
+    ('epoch', '<i8'),
+    ('ftrt', '<f8'),
+    ('barycenter', '<f8'),
+    ('alert', 'u1'),
+])
+
+
+class FTRTMonitor:
+    """
+    Serie de FTRT persistente con actualización incremental
+    """
+
+    def __init__(self, path: str = DEFAULT_MONITOR_DIR, calculator=None,
+                 planets: Optional[List[str]] = None, step_days: int = 1,
+                 use_offline: bool = True):
+        """
+        Args:
+            path: Directorio del monitor (series.bin + state.json)
+            calculator: FTRTCalculator (default: uno nuevo, sin caché)
+            planets: Planetas a incluir (default: los de la calculadora)
+            step_days: Paso de la serie en días
+            use_offline: Si False, las épocas nuevas se piden a JPL Horizons
+        """
+        if calculator is None:
+            if __package__:
+                from .ftrt_calculator import FTRTCalculator
+            else:
+                from ftrt_calculator import FTRTCalculator
+            calculator = FTRTCalculator()
+
+        self.path = path
+        self.calculator = calculator
+        self.step_days = step_days
+        self.use_offline = use_offline
+
+        self.series_path = os.path.join(path, 'series.bin')
+        self.state_path = os.path.join(path, 'state.json')
+        os.makedirs(path, exist_ok=True)
+
+        self.state = self._load_state()
+        if planets is None:
+            planets = self.state.get('planets') or list(calculator.avg_distances)
+        if self.state.get('planets') not in (None, list(planets)):
+            raise ValueError(f"El monitor en {path} usa otros planetas: {self.state['planets']}")
+        self.planets = list(planets)
+
+        self._truncate_to_state()
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_state(self, state: Dict):
+        """Escribe el estado en un temporal y lo reemplaza con os.replace."""
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+        self.state = state
+
+    def _truncate_to_state(self):
+        """
+        Descarta registros escritos tras el último estado confirmado
+        (una ejecución interrumpida entre el append y el os.replace).
+        """
+        committed = self.state.get('n_records', 0) * RECORD_DTYPE.itemsize
+        if os.path.exists(self.series_path) and os.path.getsize(self.series_path) > committed:
+            with open(self.series_path, 'r+b') as f:
+                f.truncate(committed)
+
+    def series(self) -> np.ndarray:
+        """Serie completa como array estructurado (RECORD_DTYPE), mapeada en memoria."""
+        n = self.state.get('n_records', 0)
+        if n == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.series_path, dtype=RECORD_DTYPE, mode='r', shape=(n,))
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+
+    def update(self, until=None, start=None) -> Dict:
+        """
+        Calcula y añade las épocas pendientes hasta 'until' (inclusive).
+
+        Args:
+            until: Última fecha a incluir (default: hoy, UTC)
+            start: Primera fecha si el monitor está vacío
+                (default: un año antes de 'until')
+
+        Returns:
+            Estado derivado actualizado (ver status())
+
+        Raises:
+            ValueError: Si step_days no coincide con el del estado guardado,
+                o si el cálculo tuvo errores o valores no finitos (no se
+                añade nada a la serie)
+        """
+        persisted_step = self.state.get('step_days')
+        if persisted_step is not None and persisted_step != self.step_days:
+            raise ValueError(f"El monitor en {self.path} usa step_days={persisted_step}, "
+                             f"no {self.step_days}")
+
+        if until is None:
+            until = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        until = np.datetime64(until, 'D').astype('datetime64[s]')
+        step = np.timedelta64(self.step_days, 'D')
+
+        last_epoch = self.state.get('last_epoch')
+        if last_epoch is not None:
+            first = np.datetime64(last_epoch, 's') + step
+        elif start is not None:
+            first = np.datetime64(start, 'D').astype('datetime64[s]')
+        else:
+            first = until - np.timedelta64(365, 'D')
+
+        dates = np.arange(first, until + np.timedelta64(1, 's'), step)
+        if len(dates) == 0:
+            return self.status()
+
+        result = self.calculator.calculate_ftrt_series(
+            dates=dates, planets_to_include=self.planets, use_offline=self.use_offline
+        )
+
+        # La serie solo crece: un valor incompleto quedaría guardado para siempre
+        if result['errors']:
+            raise ValueError(f"Cálculo FTRT con errores, no se actualiza: {result['errors']}")
+        invalid = ~(np.isfinite(result['ftrt_total'])
+                    & np.isfinite(result['barycenter_distance_rsun']))
+        if invalid.any():
+            raise ValueError(f"{int(invalid.sum())} épocas con FTRT no finito "
+                             f"(primera: {dates[invalid][0]}), no se actualiza")
+
+        records = np.empty(len(dates), dtype=RECORD_DTYPE)
+        records['epoch'] = dates.astype(np.int64)
+        records['ftrt'] = result['ftrt_total']
+        records['barycenter'] = result['barycenter_distance_rsun']
+        records['alert'] = classify_alert_levels(result['ftrt_total'])
+
+        with open(self.series_path, 'ab') as f:
+            records.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        n_records = self.state.get('n_records', 0) + len(records)
+        self._write_state({
+            'planets': self.planets,
+            'step_days': self.step_days,
+            'n_records': n_records,
+            'first_epoch': self.state.get('first_epoch', str(dates[0])),
+            'last_epoch': str(dates[-1]),
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'event_stats': self.state.get('event_stats'),
+            **self._derived_state(records)
+        })
+        return self.status()
+
+    def _derived_state(self, new_records: np.ndarray) -> Dict:
+        """Nivel actual y distancia a los umbrales vecinos a partir del último registro."""
+        last = new_records[-1]
+        ftrt = float(last['ftrt'])
+        level = int(last['alert'])
+
+        # Tendencia diaria con los dos últimos registros de la serie
+        if len(new_records) >= 2:
+            previous = float(new_records[-2]['ftrt'])
+        else:
+            previous = self.state.get('ftrt')
+        trend = (ftrt - previous) / self.step_days if previous is not None else 0.0
+
+        above = ALERT_THRESHOLDS[level] if level < len(ALERT_THRESHOLDS) else None
+        below = ALERT_THRESHOLDS[level - 1] if level > 0 else None
+
+        days_to_crossing = None
+        if trend > 0 and above is not None:
+            days_to_crossing = (above - ftrt) / trend
+        elif trend < 0 and below is not None:
+            days_to_crossing = (below - ftrt) / trend
+
+        return {
+            'ftrt': ftrt,
+            'barycenter_distance_rsun': float(last['barycenter']),
+            'alert_level': ALERT_LEVELS[level],
+            'threshold_above': above,
+            'distance_above': above - ftrt if above is not None else None,
+            'threshold_below': below,
+            'distance_below': ftrt - below if below is not None else None,
+            'trend_per_day': trend,
+            'days_to_crossing': days_to_crossing
+        }
+
+    def add_events(self, events) -> Dict:
+        """
+        Añade eventos observados al acumulador de correlación FTRT-magnitud.
+
+        Cada evento toma el FTRT vigente en su fecha (búsqueda binaria en la
+        serie); los eventos fuera del rango cubierto se ignoran. El coste es
+        O(log n) por evento y no depende del número de eventos previos.
+
+        El estado guarda una marca con la fecha del último evento añadido
+        y los nombres de esa fecha: los eventos anteriores a la marca, o de
+        su misma fecha y nombre, ya se contaron y se omiten, de modo que
+        volver a pasar el mismo catálogo (en orden cronológico) no los
+        duplica. Los eventos posteriores al final de la serie no mueven la
+        marca y se añaden cuando la serie los alcance.
+
+        Args:
+            events: DataFrame, ResultsStore o lista de dicts con 'date',
+                'magnitude' y opcionalmente 'name' y 'x_class'
+
+        Returns:
+            Estadísticos actualizados (ver OnlineStats.snapshot)
+        """
+        if __package__:
+            from .lag_join import asof_values
+            from .results_store import as_dataframe
+        else:
+            from lag_join import asof_values
+            from results_store import as_dataframe
+
+        events = as_dataframe(events)
+        event_stats = self.state.get('event_stats') or {}
+        accumulator = OnlineStats.from_dict(event_stats)
+        series = self.series()
+        if len(events) == 0 or len(series) == 0:
+            return accumulator.snapshot()
+
+        dates = np.asarray(events['date'], dtype='datetime64[s]')
+        names = (np.asarray(events['name'], dtype=str) if 'name' in events
+                 else np.full(len(events), '', dtype=str))
+
+        # Marca de agua: eventos ya añadidos en ejecuciones anteriores
+        new = np.ones(len(events), dtype=bool)
+        if event_stats.get('last_event_date') is not None:
+            mark = np.datetime64(event_stats['last_event_date'], 's')
+            seen = np.isin(names, event_stats.get('last_event_names', []))
+            new = (dates > mark) | ((dates == mark) & ~seen)
+
+        epochs = series['epoch'].astype('datetime64[s]')
+        ftrt = asof_values(epochs, series['ftrt'], dates, tolerance_days=self.step_days)
+        # Antes del inicio de la serie no se cubrirán nunca; tras el final, aún no
+        pending = new & (dates >= epochs[-1] + np.timedelta64(self.step_days, 'D'))
+        consumed = new & ~pending
+        covered = consumed & np.isfinite(ftrt)
+
+        actual = np.asarray(events['x_class'], dtype=bool)[covered] if 'x_class' in events else None
+        accumulator.update(ftrt[covered], np.asarray(events['magnitude'], dtype=float)[covered], actual)
+
+        state = accumulator.to_dict()
+        state['last_event_date'] = event_stats.get('last_event_date')
+        state['last_event_names'] = list(event_stats.get('last_event_names', []))
+        if consumed.any():
+            # Los eventos nuevos nunca son anteriores a la marca: solo avanza
+            last = dates[consumed].max()
+            at_last = set(names[consumed & (dates == last)])
+            if state['last_event_date'] == str(last):
+                at_last |= set(state['last_event_names'])
+            state['last_event_date'] = str(last)
+            state['last_event_names'] = sorted(at_last)
+
+        self._write_state({**self.state, 'event_stats': state})
+        return accumulator.snapshot()
+
+    def event_summary(self) -> Dict:
+        """Correlación, regresión y matriz de confusión de los eventos acumulados."""
+        return OnlineStats.from_dict(self.state.get('event_stats')).snapshot()
+
+    def status(self) -> Dict:
+        """Estado derivado guardado (vacío si el monitor nunca se actualizó)."""
+        return dict(self.state)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monitor incremental de FTRT')
+    parser.add_argument('--path', default=DEFAULT_MONITOR_DIR)
+    parser.add_argument('--start', default=None, help='Primera fecha si el monitor está vacío')
+    parser.add_argument('--until', default=None, help='Última fecha (default: hoy)')
+    parser.add_argument('--online', action='store_true', help='Usar JPL Horizons')
+    parser.add_argument('--events', default=None,
+                        help='Catálogo (CSV/Parquet) de eventos para el acumulador '
+                             '(los ya añadidos se omiten)')
+    args = parser.parse_args()
+
+    monitor = FTRTMonitor(args.path, use_offline=not args.online)
+    n_before = monitor.state.get('n_records', 0)
+    status = monitor.update(until=args.until, start=args.start)
+
+    if args.events:
+        if __package__:
+            from .event_catalog import EventCatalog
+        else:
+            from event_catalog import EventCatalog
+        for chunk in EventCatalog(args.events).iter_chunks():
+            monitor.add_events(chunk)
+        status = monitor.status()
+    monitor.calculator.close()
+
+    print("\n" + "="*60)
+    print("MONITOR FTRT")
+    print("="*60)
+    print(f"Registros: {status.get('n_records', 0)} (+{status.get('n_records', 0) - n_before})")
+    if status.get('last_epoch'):
+        print(f"Última época: {status['last_epoch']}")
+        print(f"FTRT: {status['ftrt']:.4f}")
+        print(f"NIVEL: {status['alert_level']}")
+        if status['distance_above'] is not None:
+            print(f"Hasta {status['threshold_above']}: {status['distance_above']:.4f}")
+        if status['distance_below'] is not None:
+            print(f"Sobre {status['threshold_below']}: {status['distance_below']:.4f}")
+        if status['days_to_crossing'] is not None:
+            print(f"Cruce estimado en {status['days_to_crossing']:.1f} días")
+    summary = monitor.event_summary()
+    if summary['n'] > 2:
+        print(f"Eventos: {summary['n']} | r = {summary['correlation']:.4f} "
+              f"(p = {summary['p_value']:.4f})")
+    print("="*60 + "\n")
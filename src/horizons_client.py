@@ -0,0 +1,167 @@
+"""
+Cliente HTTP para JPL Horizons del Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Mantiene una sesión con conexiones persistentes (keep-alive), permite
+lanzar varias consultas en paralelo con un límite de concurrencia y
+reintenta errores transitorios con backoff exponencial con jitter.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+
+HORIZONS_URL = 'https://ssd.jpl.nasa.gov/api/horizons.api'
+
+# Códigos HTTP que se consideran transitorios y se reintentan
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HorizonsClient:
+    """
+    Cliente con pool de conexiones, concurrencia acotada y reintentos
+    """
+
+    def __init__(self, url: str = HORIZONS_URL, max_workers: int = 4,
+                 max_retries: int = 4, backoff_base: float = 0.5,
+                 backoff_max: float = 30.0, timeout: float = 10,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            url: URL de la API de Horizons
+            max_workers: Máximo de consultas simultáneas (y tamaño del pool)
+            max_retries: Reintentos tras el primer intento fallido
+            backoff_base: Espera base en segundos del backoff exponencial
+            backoff_max: Espera máxima en segundos entre reintentos
+            timeout: Timeout por defecto de cada petición en segundos
+            seed: Semilla opcional para el jitter (reproducibilidad)
+        """
+        self.url = url
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        # Estadísticas de latencia (últimas 10,000 peticiones)
+        self._latencies = deque(maxlen=10000)
+        self.requests_sent = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera con 'full jitter': uniforme en [0, min(max, base * 2^n)]."""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        with self._lock:
+            return self._rng.uniform(0, cap)
+
+    def get(self, params: Dict, timeout: Optional[float] = None,
+            stream: bool = False) -> requests.Response:
+        """
+        Realiza una consulta GET con reintentos.
+
+        Se reintentan timeouts, errores de conexión y códigos 429/5xx.
+        Si se agotan los reintentos por código HTTP, se devuelve la última
+        respuesta; si fue por excepción, se relanza.
+
+        Args:
+            params: Parámetros de la consulta Horizons
+            timeout: Timeout en segundos (default: self.timeout)
+            stream: Si True, el cuerpo se lee bajo demanda (iter_content)
+
+        Returns:
+            requests.Response
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.get(self.url, params=params, timeout=timeout,
+                                            stream=stream)
+                error = None
+            except (requests.Timeout, requests.ConnectionError) as e:
+                response = None
+                error = e
+            latency = time.perf_counter() - start
+
+            with self._lock:
+                self.requests_sent += 1
+                self._latencies.append(latency)
+
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            if not retryable:
+                return response
+
+            if attempt == self.max_retries:
+                with self._lock:
+                    self.failures += 1
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.close()
+            with self._lock:
+                self.retries += 1
+            time.sleep(self._backoff(attempt))
+
+    def map(self, func: Callable, items: Iterable) -> List:
+        """
+        Aplica func a cada elemento en paralelo (máx. max_workers a la vez).
+
+        Returns:
+            Lista de resultados en el mismo orden que items
+        """
+        return list(self._executor.map(func, items))
+
+    def latency_stats(self) -> Dict:
+        """
+        Devuelve estadísticas de latencia por petición (en segundos).
+        """
+        with self._lock:
+            latencies = np.array(self._latencies)
+            stats = {
+                'requests': self.requests_sent,
+                'retries': self.retries,
+                'failures': self.failures
+            }
+
+        if len(latencies) == 0:
+            return {**stats, 'mean': None, 'p50': None, 'p95': None, 'max': None}
+
+        return {
+            **stats,
+            'mean': float(latencies.mean()),
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'max': float(latencies.max())
+        }
+
+    def close(self):
+        """Cierra el pool de hilos y la sesión HTTP."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
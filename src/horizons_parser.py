@@ -0,0 +1,305 @@
+"""
+Parser de respuestas de JPL Horizons para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Lee la respuesta de forma incremental (por bloques de bytes), localiza
+las columnas a partir de la cabecera de la tabla y convierte todo el
+bloque $$SOE-$$EOE a arrays de NumPy de una sola vez, sin construir
+listas de Python por línea.
+"""
+
+import io
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+SOE = b'$$SOE'
+EOE = b'$$EOE'
+
+MONTHS = [b'Jan', b'Feb', b'Mar', b'Apr', b'May', b'Jun',
+          b'Jul', b'Aug', b'Sep', b'Oct', b'Nov', b'Dec']
+
+# Nombres de columna de Horizons -> nombre de salida
+COLUMN_ALIASES = {
+    'delta': 'r',        # Distancia observador-objetivo (observador = Sol)
+    'deldot': 'rdot',
+    'RG': 'r',           # Tablas de vectores
+    'RR': 'rdot',
+    'X': 'x',
+    'Y': 'y',
+    'Z': 'z',
+    'VX': 'vx',
+    'VY': 'vy',
+    'VZ': 'vz',
+}
+
+UNIX_EPOCH_JD = 2440587.5
+
+
+class HorizonsParseError(ValueError):
+    """La respuesta no contiene una tabla de efemérides reconocible."""
+
+
+def _read_block(chunks: Iterable[Union[bytes, str]]) -> Tuple[bytes, bytes]:
+    """
+    Consume la respuesta por bloques y devuelve (cabecera, bloque SOE-EOE).
+
+    Antes de $$SOE solo se conserva la última línea de cabecera; después
+    se acumulan únicamente los bytes de la tabla.
+    """
+    header = b''
+    pending = b''
+    block = bytearray()
+    in_block = False
+    search_from = 0
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+
+        if in_block:
+            block += chunk
+        else:
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop()
+            for i, line in enumerate(lines):
+                line = line.rstrip(b'\r')
+                if line.startswith(SOE):
+                    in_block = True
+                    block += b'\n'.join(lines[i + 1:])
+                    if i + 1 < len(lines):
+                        block += b'\n'
+                    block += pending
+                    pending = b''
+                    break
+                stripped = line.strip()
+                if stripped and not stripped.startswith(b'*'):
+                    header = line
+
+        if in_block:
+            end = block.find(EOE, search_from)
+            if end >= 0:
+                del block[end:]
+                return header, bytes(block)
+            search_from = max(0, len(block) - len(EOE))
+
+    if not in_block:
+        raise HorizonsParseError("No se encontró el marcador $$SOE")
+    raise HorizonsParseError("No se encontró el marcador $$EOE")
+
+
+def _line_matrix(block: bytes) -> np.ndarray:
+    """
+    Convierte el bloque de texto en una matriz (n_filas, ancho) de bytes,
+    rellenando con espacios las líneas más cortas.
+    """
+    buf = np.frombuffer(block.replace(b'\r', b''), dtype=np.uint8)
+    if len(buf) == 0 or buf[-1] != ord('\n'):
+        buf = np.append(buf, np.uint8(ord('\n')))
+
+    ends = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts
+
+    keep = lengths > 0
+    starts, lengths = starts[keep], lengths[keep]
+    if len(starts) == 0:
+        return np.empty((0, 0), dtype=np.uint8)
+
+    width = int(lengths.max())
+
+    # Caso habitual: todas las filas con el mismo ancho y contiguas
+    if np.all(lengths == width) and np.all(np.diff(starts) == width + 1):
+        block_rows = buf[starts[0]:starts[0] + len(starts) * (width + 1)]
+        return block_rows.reshape(len(starts), width + 1)[:, :width]
+
+    cols = np.arange(width)
+    idx = starts[:, np.newaxis] + cols[np.newaxis, :]
+    valid = cols[np.newaxis, :] < lengths[:, np.newaxis]
+
+    matrix = np.full((len(starts), width), ord(' '), dtype=np.uint8)
+    matrix[valid] = buf[idx[valid]]
+    return matrix
+
+
+def _token_spans(line: bytes) -> List[Tuple[int, int]]:
+    """Posiciones (inicio, fin) de los tokens separados por espacios."""
+    spans = []
+    start = None
+    for i, c in enumerate(line + b' '):
+        if c != 32 and start is None:
+            start = i
+        elif c == 32 and start is not None:
+            spans.append((start, i))
+            start = None
+    return spans
+
+
+def _column_slices(header: bytes, first_row: bytes) -> Dict[str, Tuple[int, int]]:
+    """
+    Localiza las columnas de la tabla a partir de la cabecera.
+
+    Cada token de la primera fila se asigna al nombre de cabecera con el
+    que más se solapa (o al más cercano). Los límites de cada columna van
+    desde el final de la columna anterior hasta el inicio de la siguiente,
+    para tolerar valores de ancho variable entre filas.
+    """
+    names = [(header[s:e].decode('ascii', 'replace'), s, e) for s, e in _token_spans(header)]
+    if not names:
+        raise HorizonsParseError("Cabecera de tabla vacía")
+
+    assigned = {}
+    for s, e in _token_spans(first_row):
+        overlaps = [min(e, he) - max(s, hs) for _, hs, he in names]
+        best = int(np.argmax(overlaps))
+        if overlaps[best] <= 0:
+            distances = [min(abs(s - he), abs(e - hs)) for _, hs, he in names]
+            best = int(np.argmin(distances))
+        lo, hi = assigned.get(best, (s, e))
+        assigned[best] = (min(lo, s), max(hi, e))
+
+    order = sorted(assigned)
+    slices = {}
+    for k, col in enumerate(order):
+        lo = assigned[order[k - 1]][1] if k > 0 else 0
+        hi = assigned[order[k + 1]][0] if k + 1 < len(order) else None
+        slices[names[col][0]] = (lo, hi)
+    slices['__first_start__'] = (assigned[order[0]][0], None)
+    return slices
+
+
+def _to_float(column: np.ndarray) -> np.ndarray:
+    """Convierte una columna de bytes a float (NaN si no es numérica)."""
+    try:
+        return column.astype(float)
+    except ValueError:
+        values = pd.Series(np.char.strip(column).astype(str))
+        return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+
+def _as_strings(matrix: np.ndarray, lo: int, hi: Optional[int]) -> np.ndarray:
+    """Vista de un rango de columnas de la matriz como array de bytes 'S'."""
+    sub = np.ascontiguousarray(matrix[:, lo:hi])
+    return sub.view(f'S{sub.shape[1]}').ravel()
+
+
+def _parse_calendar(matrix: np.ndarray, start: int) -> np.ndarray:
+    """
+    Convierte fechas 'YYYY-Mon-DD HH:MM[:SS]' a datetime64[s] de forma vectorizada.
+    """
+    def digits(lo, hi):
+        # Dígitos ASCII -> entero, sin pasar por cadenas
+        values = matrix[:, start + lo:start + hi].astype(np.int64) - ord('0')
+        return values @ (10 ** np.arange(hi - lo - 1, -1, -1))
+
+    year = digits(0, 4)
+    month_bytes = matrix[:, start + 5:start + 8].astype(np.int64)
+    month_code = (month_bytes[:, 0] << 16) | (month_bytes[:, 1] << 8) | month_bytes[:, 2]
+    codes = np.array([(m[0] << 16) | (m[1] << 8) | m[2] for m in MONTHS])
+    order = np.argsort(codes)
+    month = order[np.searchsorted(codes[order], month_code)]
+    day = digits(9, 11)
+    hour = digits(12, 14)
+    minute = digits(15, 17)
+
+    has_seconds = matrix.shape[1] > start + 19 and np.all(matrix[:, start + 17] == ord(':'))
+    second = digits(18, 20) if has_seconds else 0
+
+    months = (year - 1970) * 12 + month
+    dates = months.astype('datetime64[M]').astype('datetime64[D]') + (day - 1)
+    return dates.astype('datetime64[s]') + (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+
+
+def _jd_to_datetime(jd: np.ndarray) -> np.ndarray:
+    """Convierte días julianos a datetime64[s]."""
+    seconds = np.round((jd - UNIX_EPOCH_JD) * 86400.0).astype(np.int64)
+    return seconds.astype('datetime64[s]')
+
+
+def _parse_csv(header: bytes, block: bytes, keep_raw: bool) -> Dict[str, np.ndarray]:
+    """Parsea tablas con CSV_FORMAT=YES localizando columnas por nombre."""
+    names = [name.strip() for name in header.decode('ascii', 'replace').split(',')]
+
+    wanted = {i: COLUMN_ALIASES[n] for i, n in enumerate(names) if n in COLUMN_ALIASES}
+    jd_col = next((i for i, n in enumerate(names) if n.startswith('JD')), None)
+    if jd_col is not None:
+        wanted[jd_col] = 'jd'
+
+    result = {}
+    if wanted and block.strip():
+        cols = sorted(wanted)
+        data = np.loadtxt(io.BytesIO(block), delimiter=',', usecols=cols,
+                          dtype=float, ndmin=2)
+        for k, col in enumerate(cols):
+            result[wanted[col]] = data[:, k]
+
+    if 'jd' in result:
+        result['epoch'] = _jd_to_datetime(result['jd'])
+    if keep_raw:
+        result['raw'] = _as_strings(_line_matrix(block), 0, None)
+    return result
+
+
+def _parse_fixed_width(header: bytes, block: bytes, keep_raw: bool) -> Dict[str, np.ndarray]:
+    """Parsea tablas de ancho fijo localizando columnas por la cabecera."""
+    matrix = _line_matrix(block)
+    if len(matrix) == 0:
+        return {'epoch': np.array([], dtype='datetime64[s]'), 'r': np.array([])}
+
+    first_row = bytes(matrix[0])
+    slices = _column_slices(header, first_row)
+    first_start = slices.pop('__first_start__')[0]
+
+    result = {}
+    for name, (lo, hi) in slices.items():
+        if name in COLUMN_ALIASES:
+            result[COLUMN_ALIASES[name]] = _to_float(_as_strings(matrix, lo, hi))
+        elif name.startswith('Date') and 'JD' in name:
+            result['jd'] = _to_float(_as_strings(matrix, lo, hi))
+            result['epoch'] = _jd_to_datetime(result['jd'])
+        elif name.startswith('Date'):
+            result['epoch'] = _parse_calendar(matrix, first_start)
+
+    if keep_raw:
+        result['raw'] = np.char.rstrip(_as_strings(matrix, 0, None))
+    return result
+
+
+def parse_horizons_stream(chunks: Iterable[Union[bytes, str]],
+                          keep_raw: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Parsea una respuesta de Horizons consumida por bloques.
+
+    Args:
+        chunks: Iterable de bloques de bytes o texto (ej. response.iter_content())
+        keep_raw: Si True, incluye las filas originales en 'raw'
+
+    Returns:
+        Dict de arrays: 'epoch' (datetime64[s]), 'r' (AU) y, según la tabla,
+        'rdot', 'x', 'y', 'z', 'vx', 'vy', 'vz', 'jd'. Si la tabla trae
+        vectores pero no distancia, 'r' se calcula a partir de x/y/z.
+    """
+    header, block = _read_block(chunks)
+
+    if b',' in header:
+        result = _parse_csv(header, block, keep_raw)
+    else:
+        result = _parse_fixed_width(header, block, keep_raw)
+
+    if 'r' not in result and all(k in result for k in ('x', 'y', 'z')):
+        result['r'] = np.sqrt(result['x'] ** 2 + result['y'] ** 2 + result['z'] ** 2)
+
+    if 'epoch' not in result or 'r' not in result:
+        raise HorizonsParseError("La tabla no contiene columnas de fecha y distancia")
+
+    return result
+
+
+def parse_horizons_text(text: Union[bytes, str], keep_raw: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Parsea una respuesta de Horizons completa ya en memoria.
+    """
+    return parse_horizons_stream([text], keep_raw=keep_raw)
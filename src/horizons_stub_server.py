@@ -0,0 +1,240 @@
+"""
+Servidor local que imita la API de JPL Horizons
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Sirve respuestas en formato texto de Horizons (bloques $$SOE/$$EOE)
+generadas con la efeméride offline, con latencia, tasa de errores y
+tamaño de respuesta configurables. Permite probar y medir el camino
+online de FTRTCalculator sin acceso a ssd.jpl.nasa.gov.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+if __package__:
+    from .kepler_ephemeris import PLANET_ELEMENTS, UNIX_EPOCH_JD, heliocentric_positions
+    from .utils import NAIF_CODES
+else:
+    from kepler_ephemeris import PLANET_ELEMENTS, UNIX_EPOCH_JD, heliocentric_positions
+    from utils import NAIF_CODES
+
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+NAIF_TO_PLANET = {code: planet for planet, code in NAIF_CODES.items()}
+
+SEPARATOR = '*' * 79
+
+
+def _parse_time(value: str) -> np.datetime64:
+    """Parsea START_TIME/STOP_TIME ('YYYY-MM-DD' o 'YYYY-MM-DD HH:MM')."""
+    value = value.strip().strip("'")
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return np.datetime64(datetime.strptime(value, fmt), 'm')
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha inválida: {value}")
+
+
+def _parse_step(value: str) -> np.timedelta64:
+    """Parsea STEP_SIZE ('1d', '6h', '30m')."""
+    value = value.strip().strip("'").lower()
+    units = {'d': 'D', 'h': 'h', 'm': 'm'}
+    number = value.rstrip('dhm') or '1'
+    unit = value[len(number):][:1] or 'd'
+    return np.timedelta64(int(number), units[unit]).astype('timedelta64[m]')
+
+
+def _parse_tlist(value: str) -> np.ndarray:
+    """Parsea TLIST (días julianos separados por espacios o comas)."""
+    jd = np.array([float(item.strip("'")) for item in value.replace(',', ' ').split()])
+    if len(jd) == 0:
+        raise ValueError("TLIST vacía")
+    minutes = np.round((jd - UNIX_EPOCH_JD) * 1440.0).astype(np.int64)
+    return minutes.astype('datetime64[m]')
+
+
+def ephemeris_rows(planet: str, dates: np.ndarray) -> list:
+    """
+    Genera filas de efeméride con formato Horizons (cantidades 1,20).
+
+    Args:
+        planet: Nombre del planeta
+        dates: Array datetime64 de épocas
+
+    Returns:
+        Lista de líneas de texto
+    """
+    position = heliocentric_positions(dates, [planet])
+    angle = position['longitude_deg'][0]
+    distance = position['distance_au'][0]
+
+    rows = []
+    for date, ang, dist in zip(dates.astype(datetime), angle, distance):
+        ra_h = ang / 15.0
+        rows.append(
+            f" {date.year:04d}-{MONTHS[date.month - 1]}-{date.day:02d} {date.hour:02d}:{date.minute:02d}"
+            f"     {int(ra_h):02d} {int(ra_h * 60) % 60:02d} {ra_h * 3600 % 60:05.2f}"
+            f" +00 00 00.0  {dist:14.11f}  {0.0:10.7f}"
+        )
+    return rows
+
+
+class HorizonsStubServer:
+    """
+    Servidor HTTP local con formato de respuesta de JPL Horizons
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, latency_jitter: float = 0.0,
+                 error_rate: float = 0.0, payload_padding: int = 0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            host: Interfaz de escucha
+            port: Puerto (0 = elegir uno libre)
+            latency: Latencia fija añadida a cada respuesta (segundos)
+            latency_jitter: Latencia aleatoria adicional, uniforme en [0, jitter]
+            error_rate: Fracción de peticiones que responden HTTP 503
+            payload_padding: Bytes de cabecera de relleno por respuesta
+            seed: Semilla para latencia y errores aleatorios
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.payload_padding = payload_padding
+
+        self.requests_served = 0
+        self.errors_served = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, body = stub.handle(parse_qs(urlparse(self.path).query))
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """URL equivalente a la de la API de Horizons."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/api/horizons.api'
+
+    def handle(self, query: Dict) -> tuple:
+        """
+        Genera la respuesta (código HTTP, cuerpo) para una consulta.
+        """
+        with self._lock:
+            self.requests_served += 1
+            delay = self.latency + self._rng.uniform(0, self.latency_jitter)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors_served += 1
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if fail:
+            return 503, 'Service Unavailable\n'
+
+        params = {key: values[0] for key, values in query.items()}
+
+        try:
+            planet = NAIF_TO_PLANET[params['COMMAND'].strip("'")]
+            if 'TLIST' in params:
+                dates = _parse_tlist(params['TLIST'])
+            else:
+                start = _parse_time(params['START_TIME'])
+                stop = _parse_time(params['STOP_TIME'])
+                step = _parse_step(params.get('STEP_SIZE', '1d'))
+                dates = np.arange(start, stop + np.timedelta64(1, 'm'), step)
+        except (KeyError, ValueError) as e:
+            return 400, f'Bad request: {e}\n'
+
+        if planet not in PLANET_ELEMENTS:
+            return 400, f'Bad request: sin efeméride offline para {planet}\n'
+
+        lines = [
+            SEPARATOR,
+            'Ephemeris / API_USER  (servidor local FTRT, efeméride offline)',
+            f'Target body name: {planet} ({params["COMMAND"]})  Center: Sun (10)',
+            SEPARATOR,
+        ]
+        if self.payload_padding > 0:
+            lines.append('x' * self.payload_padding)
+        lines += [
+            ' Date__(UT)__HR:MN     R.A._____(ICRF)_____DEC          delta      deldot',
+            SEPARATOR,
+            '$$SOE',
+            *ephemeris_rows(planet, dates),
+            '$$EOE',
+            SEPARATOR,
+        ]
+
+        return 200, '\n'.join(lines) + '\n'
+
+    def start(self):
+        """Arranca el servidor en un hilo en segundo plano."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el servidor."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor local tipo JPL Horizons')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--padding', type=int, default=0)
+    args = parser.parse_args()
+
+    server = HorizonsStubServer(port=args.port, latency=args.latency,
+                                error_rate=args.error_rate, payload_padding=args.padding)
+    print(f"Servidor Horizons local en {server.url}")
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,196 @@
+"""
+Efeméride kepleriana para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Calcula posiciones heliocéntricas de los ocho planetas a partir de
+elementos orbitales J2000 con tasas seculares (Standish, JPL,
+"Keplerian Elements for Approximate Positions of the Major Planets",
+tabla 1, válida 1800-2050). La ecuación de Kepler se resuelve de forma
+vectorizada para todos los planetas y todas las épocas a la vez.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# Día juliano de J2000.0 y de la época Unix
+J2000_JD = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+# Elementos orbitales J2000 (eclíptica y equinoccio J2000) y tasas por siglo:
+# (a [AU], e, I [deg], L [deg], long. perihelio [deg], long. nodo [deg])
+PLANET_ELEMENTS = {
+    'Mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'Venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'Earth': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+              (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'Mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'Jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'Saturn': ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+    'Uranus': ((19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+               (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589)),
+    'Neptune': ((30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+                (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664)),
+}
+
+PLANETS = list(PLANET_ELEMENTS)
+
+# Épocas por bloque en el cálculo vectorizado
+CHUNK_SIZE = 8192
+
+
+def dates_to_jd(dates) -> np.ndarray:
+    """
+    Convierte fechas ('YYYY-MM-DD', datetime o datetime64) a días julianos.
+
+    Args:
+        dates: Fecha o array de fechas
+
+    Returns:
+        Array float64 de días julianos
+    """
+    seconds = np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+    return seconds / 86400.0 + UNIX_EPOCH_JD
+
+
+def _solve_kepler_sincos(M: np.ndarray, e: np.ndarray, tol: float, max_iter: int):
+    """
+    Newton-Raphson para la ecuación de Kepler que devuelve también sin(E)
+    y cos(E), corregidos a primer orden tras el último paso para no
+    recalcular las funciones trigonométricas.
+    """
+    E = M + e * np.sin(M)
+    for _ in range(max_iter):
+        sin_E, cos_E = np.sin(E), np.cos(E)
+        delta = (E - e * sin_E - M) / (1.0 - e * cos_E)
+        E -= delta
+        if np.max(np.abs(delta), initial=0.0) < tol:
+            break
+    # sin(E - δ) ≈ sin(E) - δ·cos(E); error O(δ²), despreciable con δ < tol
+    return E, sin_E - delta * cos_E, cos_E + delta * sin_E
+
+
+def solve_kepler(mean_anomaly: np.ndarray, eccentricity: np.ndarray,
+                 tol: float = 1e-12, max_iter: int = 20) -> np.ndarray:
+    """
+    Resuelve la ecuación de Kepler E - e·sin(E) = M por Newton-Raphson,
+    vectorizado sobre arrays de cualquier forma (broadcasting).
+
+    Args:
+        mean_anomaly: Anomalía media en radianes
+        eccentricity: Excentricidad (e < 1)
+        tol: Tolerancia en radianes
+        max_iter: Máximo de iteraciones
+
+    Returns:
+        Anomalía excéntrica en radianes
+    """
+    M = np.asarray(mean_anomaly, dtype=float)
+    e = np.asarray(eccentricity, dtype=float)
+    return _solve_kepler_sincos(M, e, tol, max_iter)[0]
+
+
+def _elements(planets: List[str], jd: np.ndarray) -> Dict[str, np.ndarray]:
+    """Elementos orbitales (planetas × épocas) en la fecha dada."""
+    base = np.array([PLANET_ELEMENTS[p][0] for p in planets])
+    rates = np.array([PLANET_ELEMENTS[p][1] for p in planets])
+    T = (jd - J2000_JD) / 36525.0
+
+    # (planetas, épocas) para cada elemento
+    el = base[:, :, np.newaxis] + rates[:, :, np.newaxis] * T[np.newaxis, np.newaxis, :]
+    a, e, inc, L, varpi, node = el.transpose(1, 0, 2)
+
+    return {
+        'a': a,
+        'e': e,
+        'inc': np.radians(inc),
+        'node': np.radians(node),
+        'arg_peri': np.radians(varpi - node),
+        'mean_anomaly': np.radians((L - varpi + 180.0) % 360.0 - 180.0),
+    }
+
+
+def heliocentric_positions(dates=None, planets: Optional[List[str]] = None,
+                           jd: Optional[np.ndarray] = None) -> Dict:
+    """
+    Calcula posiciones heliocéntricas eclípticas J2000 para muchas épocas.
+
+    Args:
+        dates: Array de fechas (o usar jd)
+        planets: Lista de planetas (default: los ocho)
+        jd: Array de días julianos (alternativa a dates)
+
+    Returns:
+        Dict con 'planets', 'jd', 'xyz' (planetas × épocas × 3, AU),
+        'distance_au' (planetas × épocas) y 'longitude_deg' (planetas × épocas)
+    """
+    if planets is None:
+        planets = PLANETS
+    unknown = [p for p in planets if p not in PLANET_ELEMENTS]
+    if unknown:
+        raise ValueError(f"Planeta desconocido: {unknown[0]}")
+
+    jd = dates_to_jd(dates) if jd is None else np.asarray(jd, dtype=float)
+    jd = np.atleast_1d(jd).ravel()
+
+    xyz = np.empty((len(planets), len(jd), 3))
+    distance = np.empty((len(planets), len(jd)))
+
+    # Procesar por bloques de épocas para que los temporales quepan en caché
+    for start in range(0, len(jd), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        xyz[:, chunk], distance[:, chunk] = _positions_chunk(planets, jd[chunk])
+
+    return {
+        'planets': list(planets),
+        'jd': jd,
+        'xyz': xyz,
+        'distance_au': distance,
+        'longitude_deg': np.degrees(np.arctan2(xyz[..., 1], xyz[..., 0])) % 360.0
+    }
+
+
+def _positions_chunk(planets: List[str], jd: np.ndarray):
+    """Posiciones (planetas × épocas × 3) y distancias para un bloque de épocas."""
+    el = _elements(planets, jd)
+    a, e = el['a'], el['e']
+
+    _, sin_E, cos_E = _solve_kepler_sincos(el['mean_anomaly'], e, tol=1e-12, max_iter=20)
+
+    # Coordenadas en el plano orbital
+    xp = a * (cos_E - e)
+    yp = a * np.sqrt(1.0 - e * e) * sin_E
+
+    cos_w, sin_w = np.cos(el['arg_peri']), np.sin(el['arg_peri'])
+    cos_n, sin_n = np.cos(el['node']), np.sin(el['node'])
+    cos_i, sin_i = np.cos(el['inc']), np.sin(el['inc'])
+
+    # Rotación al sistema eclíptico J2000
+    xyz = np.empty(a.shape + (3,))
+    xyz[..., 0] = (cos_w * cos_n - sin_w * sin_n * cos_i) * xp + (-sin_w * cos_n - cos_w * sin_n * cos_i) * yp
+    xyz[..., 1] = (cos_w * sin_n + sin_w * cos_n * cos_i) * xp + (-sin_w * sin_n + cos_w * cos_n * cos_i) * yp
+    xyz[..., 2] = (sin_w * sin_i) * xp + (cos_w * sin_i) * yp
+
+    return xyz, a * (1.0 - e * cos_E)
+
+
+class KeplerEphemeris:
+    """
+    Proveedor de efemérides offline basado en elementos keplerianos
+    """
+
+    method = 'keplerian_elliptical'
+
+    def positions(self, planets: List[str], dates) -> np.ndarray:
+        """Posiciones heliocéntricas (planetas × épocas × 3) en AU."""
+        return heliocentric_positions(dates, planets)['xyz']
+
+    def distances(self, planets: List[str], dates) -> np.ndarray:
+        """Distancias heliocéntricas (planetas × épocas) en AU."""
+        return heliocentric_positions(dates, planets)['distance_au']
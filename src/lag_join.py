@@ -0,0 +1,171 @@
+"""
+Unión evento-serie con desfases para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Asocia a cada evento de un catálogo valores de una serie de FTRT ya
+calculada: el valor vigente a distintos desfases antes del evento
+(unión "as-of") y agregados sobre una ventana (máximo, media y desfase
+del máximo). Todo se resuelve con búsqueda binaria sobre la serie
+ordenada y sumas acumuladas, en una sola pasada vectorizada.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+# Elementos (eventos × ancho de ventana) por bloque al recoger las ventanas
+GATHER_BUDGET = 1 << 22
+
+
+def _as_seconds(dates) -> np.ndarray:
+    return np.asarray(dates, dtype='datetime64[s]').astype(np.int64).ravel()
+
+
+def _asof(t: np.ndarray, values: np.ndarray, query: np.ndarray,
+          tolerance_days: Optional[float]) -> np.ndarray:
+    """
+    Unión as-of sobre segundos ya convertidos. Una consulta sin muestra
+    previa, o cuya muestra vigente tiene tolerance_days o más de
+    antigüedad, da NaN. Sin tolerancia explícita se usa el último paso de
+    la serie solo al final: las consultas desde t[-1] + paso son NaN.
+    """
+    if len(t) == 0:
+        return np.full(query.shape, np.nan)
+    idx = np.searchsorted(t, query, side='right') - 1
+    valid = idx >= 0
+    if tolerance_days is not None:
+        age = query - t[np.clip(idx, 0, None)]
+        valid &= age < tolerance_days * 86400.0
+    else:
+        last_step = t[-1] - t[-2] if len(t) > 1 else 0
+        valid &= (query < t[-1] + last_step) | (query == t[-1])
+    return np.where(valid, values[np.clip(idx, 0, None)], np.nan)
+
+
+def asof_values(series_dates, series_values, query_dates,
+                tolerance_days: Optional[float] = None) -> np.ndarray:
+    """
+    Valor de la serie vigente en cada fecha de consulta (última muestra <= fecha).
+
+    Args:
+        series_dates: Fechas de la serie, ordenadas
+        series_values: Valores de la serie
+        query_dates: Fechas de consulta (cualquier forma)
+        tolerance_days: Antigüedad máxima (exclusiva) de la muestra vigente;
+            None solo descarta las consultas desde la última fecha más un
+            paso de la serie
+
+    Returns:
+        Array con la forma de query_dates; NaN antes del inicio de la serie
+        y donde la muestra vigente es demasiado antigua
+    """
+    t = _as_seconds(series_dates)
+    values = np.asarray(series_values, dtype=float).ravel()
+    query = np.asarray(query_dates, dtype='datetime64[s]')
+    result = _asof(t, values, query.astype(np.int64).ravel(), tolerance_days)
+    return result.reshape(query.shape)
+
+
+def lag_join(series_dates, series_values, event_dates,
+             lags_days: Sequence[float] = (0,), window_days=(-30, 0),
+             tolerance_days: Optional[float] = None) -> Dict:
+    """
+    Valores desfasados y agregados de ventana de la serie para cada evento.
+
+    Args:
+        series_dates: Fechas de la serie de FTRT, ordenadas
+        series_values: Valores de FTRT
+        event_dates: Fechas de los eventos
+        lags_days: Desfases (días antes del evento) para la unión as-of
+        window_days: Ventana (inicio, fin) en días relativa al evento;
+            (-30, 0) son los 30 días previos incluyendo el día del evento
+        tolerance_days: Antigüedad máxima de la muestra en la unión as-of
+            (ver asof_values); fuera de la serie el valor es NaN
+
+    Returns:
+        Dict con 'lags_days', 'lagged' (eventos × desfases),
+        'window_max', 'window_mean', 'window_count' y
+        'window_argmax_lag_days' (días entre el máximo y el evento;
+        positivo si el máximo fue antes)
+    """
+    t = _as_seconds(series_dates)
+    values = np.asarray(series_values, dtype=float).ravel()
+    events = _as_seconds(event_dates)
+    lags = np.asarray(lags_days, dtype=float)
+
+    # Unión as-of para todos los desfases a la vez (eventos × desfases)
+    query = events[:, np.newaxis] - np.round(lags * 86400.0).astype(np.int64)[np.newaxis, :]
+    lagged = _asof(t, values, query, tolerance_days)
+
+    # Límites de la ventana [lo, hi) en índices de la serie
+    start = events + int(round(window_days[0] * 86400))
+    stop = events + int(round(window_days[1] * 86400))
+    lo = np.searchsorted(t, start, side='left')
+    hi = np.searchsorted(t, stop, side='right')
+    count = np.maximum(hi - lo, 0)
+
+    # Media con sumas acumuladas (NaN excluidos)
+    finite = np.isfinite(values)
+    csum = np.r_[0.0, np.cumsum(np.where(finite, values, 0.0))]
+    cnum = np.r_[0, np.cumsum(finite)]
+    n_valid = cnum[hi] - cnum[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        window_mean = np.where(n_valid > 0, (csum[hi] - csum[lo]) / n_valid, np.nan)
+
+    # Máximo y su posición recogiendo las ventanas por bloques de eventos
+    window_max = np.full(len(events), np.nan)
+    argmax_lag = np.full(len(events), np.nan)
+    width = int(count.max(initial=0))
+    if width > 0:
+        offsets = np.arange(width)
+        block_size = max(1, GATHER_BUDGET // width)
+        for first in range(0, len(events), block_size):
+            block = slice(first, first + block_size)
+            gather = lo[block, np.newaxis] + offsets
+            inside = offsets < count[block, np.newaxis]
+            window = np.where(inside, values[np.clip(gather, 0, len(values) - 1)], -np.inf)
+            window = np.where(np.isnan(window), -np.inf, window)
+
+            best = np.argmax(window, axis=1)
+            has_value = np.isfinite(window[np.arange(len(best)), best])
+            best_idx = lo[block] + best
+            window_max[block] = np.where(has_value, values[np.clip(best_idx, 0, len(values) - 1)], np.nan)
+            argmax_lag[block] = np.where(
+                has_value, (events[block] - t[np.clip(best_idx, 0, len(t) - 1)]) / 86400.0, np.nan
+            )
+
+    return {
+        'lags_days': lags,
+        'lagged': lagged,
+        'window_max': window_max,
+        'window_mean': window_mean,
+        'window_count': count,
+        'window_argmax_lag_days': argmax_lag
+    }
+
+
+def lag_correlations(lagged: np.ndarray, target) -> np.ndarray:
+    """
+    Correlación de Pearson entre cada columna de valores desfasados y el objetivo.
+
+    Args:
+        lagged: Array (eventos × desfases)
+        target: Array (eventos,) (ej. magnitud)
+
+    Returns:
+        Array (desfases,) de r (NaN si no hay al menos 3 pares válidos)
+    """
+    x = np.asarray(lagged, dtype=float)
+    y = np.broadcast_to(np.asarray(target, dtype=float)[:, np.newaxis], x.shape)
+    valid = np.isfinite(x) & np.isfinite(y)
+    n = valid.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(valid, x, 0.0).sum(axis=0) / n
+        y_mean = np.where(valid, y, 0.0).sum(axis=0) / n
+        dx = np.where(valid, x - x_mean, 0.0)
+        dy = np.where(valid, y - y_mean, 0.0)
+        r = (dx * dy).sum(axis=0) / np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+
+    return np.where(n >= 3, r, np.nan)
@@ -0,0 +1,199 @@
+"""
+Estadísticas online de FTRT vs actividad solar
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Acumulador de momentos bivariados (Welford / co-momentos) que se
+actualiza observación a observación o por lotes en O(1) por dato y se
+combina con otros acumuladores (fórmula de Chan) para procesar
+fragmentos en paralelo. De él se derivan, sin volver a recorrer los
+datos, la correlación de Pearson y su p-value, la recta de regresión y
+la matriz de confusión de la regla "tormenta si FTRT > umbral".
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+# Umbral de FTRT para la clasificación de statistical_analysis
+DEFAULT_STORM_THRESHOLD = 2.5
+
+
+class OnlineStats:
+    """
+    Acumulador online de correlación, regresión y matriz de confusión
+    """
+
+    FIELDS = ('n', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy', 'tp', 'fp', 'tn', 'fn')
+
+    def __init__(self, threshold: float = DEFAULT_STORM_THRESHOLD):
+        """
+        Args:
+            threshold: Umbral de FTRT por encima del cual se predice tormenta
+        """
+        self.threshold = threshold
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0       # Σ (x - x̄)²
+        self.m2_y = 0.0       # Σ (y - ȳ)²
+        self.c_xy = 0.0       # Σ (x - x̄)(y - ȳ)
+        self.tp = self.fp = self.tn = self.fn = 0
+
+    def update(self, x, y, actual=None) -> 'OnlineStats':
+        """
+        Añade una observación o un lote. Los pares con x o y no finitos
+        se descartan (no entran en los momentos ni en la matriz de
+        confusión).
+
+        Args:
+            x: FTRT (escalar o array)
+            y: Magnitud / índice de actividad (escalar o array)
+            actual: Tormenta observada (bool o array; ej. x_class). Si es
+                None no se actualiza la matriz de confusión
+
+        Returns:
+            self (para encadenar)
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        finite = np.isfinite(x) & np.isfinite(y)
+        if actual is not None:
+            actual = np.broadcast_to(np.atleast_1d(np.asarray(actual, dtype=bool)), x.shape)[finite]
+        x, y = x[finite], y[finite]
+        if len(x) == 0:
+            return self
+
+        if len(x) == 1:
+            # Welford: O(1) por observación
+            self.n += 1
+            dx = x[0] - self.mean_x
+            self.mean_x += dx / self.n
+            dy = y[0] - self.mean_y
+            self.mean_y += dy / self.n
+            self.m2_x += dx * (x[0] - self.mean_x)
+            self.m2_y += dy * (y[0] - self.mean_y)
+            self.c_xy += dx * (y[0] - self.mean_y)
+        else:
+            batch = OnlineStats(self.threshold)
+            batch.n = len(x)
+            batch.mean_x, batch.mean_y = float(x.mean()), float(y.mean())
+            dx, dy = x - batch.mean_x, y - batch.mean_y
+            batch.m2_x, batch.m2_y = float(dx @ dx), float(dy @ dy)
+            batch.c_xy = float(dx @ dy)
+            self._merge_moments(batch)
+
+        if actual is not None:
+            predicted = x > self.threshold
+            self.tp += int(np.count_nonzero(predicted & actual))
+            self.fp += int(np.count_nonzero(predicted & ~actual))
+            self.tn += int(np.count_nonzero(~predicted & ~actual))
+            self.fn += int(np.count_nonzero(~predicted & actual))
+
+        return self
+
+    def _merge_moments(self, other: 'OnlineStats'):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.m2_x += other.m2_x + dx * dx * weight
+        self.m2_y += other.m2_y + dy * dy * weight
+        self.c_xy += other.c_xy + dx * dy * weight
+        self.n = n
+
+    def merge(self, other: 'OnlineStats') -> 'OnlineStats':
+        """
+        Incorpora otro acumulador (ej. de un fragmento procesado en paralelo).
+
+        Returns:
+            self (para encadenar)
+        """
+        if other.threshold != self.threshold:
+            raise ValueError("No se pueden combinar acumuladores con distinto umbral")
+        self._merge_moments(other)
+        self.tp += other.tp
+        self.fp += other.fp
+        self.tn += other.tn
+        self.fn += other.fn
+        return self
+
+    def snapshot(self) -> Dict:
+        """
+        Estadísticos derivados del estado actual.
+
+        Returns:
+            Dict con 'n', medias, varianzas (ddof=1), 'covariance',
+            'correlation', 'r_squared', 'p_value' (bilateral, t de Student),
+            'slope', 'intercept', 'std_err' (de la pendiente, como
+            scipy.stats.linregress), 'precision', 'recall', 'accuracy' y
+            'confusion_matrix'
+        """
+        from scipy import stats
+
+        n = self.n
+        result = {
+            'n': n,
+            'mean_x': self.mean_x if n else np.nan,
+            'mean_y': self.mean_y if n else np.nan,
+            'var_x': self.m2_x / (n - 1) if n > 1 else np.nan,
+            'var_y': self.m2_y / (n - 1) if n > 1 else np.nan,
+            'covariance': self.c_xy / (n - 1) if n > 1 else np.nan,
+            'correlation': np.nan,
+            'r_squared': np.nan,
+            'p_value': np.nan,
+            'slope': np.nan,
+            'intercept': np.nan,
+            'std_err': np.nan
+        }
+
+        if n > 1 and self.m2_x > 0:
+            slope = self.c_xy / self.m2_x
+            result['slope'] = slope
+            result['intercept'] = self.mean_y - slope * self.mean_x
+
+        if n > 1 and self.m2_x > 0 and self.m2_y > 0:
+            r = float(np.clip(self.c_xy / np.sqrt(self.m2_x * self.m2_y), -1.0, 1.0))
+            result['correlation'] = r
+            result['r_squared'] = r ** 2
+            if n > 2:
+                dof = n - 2
+                if abs(r) < 1.0:
+                    t = r * np.sqrt(dof / (1.0 - r ** 2))
+                    result['p_value'] = float(2.0 * stats.t.sf(abs(t), dof))
+                else:
+                    result['p_value'] = 0.0
+                result['std_err'] = float(np.sqrt((1.0 - r ** 2) * self.m2_y / self.m2_x / dof))
+
+        tp, fp, tn, fn = self.tp, self.fp, self.tn, self.fn
+        classified = tp + fp + tn + fn
+        result.update({
+            'precision': tp / (tp + fp) if (tp + fp) > 0 else 0,
+            'recall': tp / (tp + fn) if (tp + fn) > 0 else 0,
+            'accuracy': (tp + tn) / classified if classified > 0 else 0,
+            'confusion_matrix': {'tp': tp, 'fp': fp, 'tn': tn, 'fn': fn}
+        })
+        return result
+
+    def to_dict(self) -> Dict:
+        """Estado serializable (JSON) del acumulador."""
+        state = {field: getattr(self, field) for field in self.FIELDS}
+        state['threshold'] = self.threshold
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Optional[Dict]) -> 'OnlineStats':
+        """Reconstruye un acumulador guardado con to_dict() (vacío si state es None)."""
+        if not state:
+            return cls()
+        accumulator = cls(state.get('threshold', DEFAULT_STORM_THRESHOLD))
+        for field in cls.FIELDS:
+            setattr(accumulator, field, type(getattr(accumulator, field))(state[field]))
+        return accumulator
+
+    def __len__(self) -> int:
+        return self.n
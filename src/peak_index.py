@@ -0,0 +1,268 @@
+"""
+Índice de picos y extremos de FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Detecta máximos y mínimos locales de una serie de FTRT con control de
+prominencia y separación mínima (scipy.signal.find_peaks). Las series
+largas se procesan por bloques con un margen de solapamiento, de modo
+que los picos en la frontera entre bloques se detectan igual que sobre
+la serie completa, sin materializar siglos de datos diarios. El
+resultado es un índice ordenado por fecha que se guarda en disco y se
+consulta con búsqueda binaria.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+if __package__:
+    from .utils import as_step
+else:
+    from utils import as_step
+
+
+PEAK_DTYPE = np.dtype([
+    ('epoch', 'datetime64[s]'),
+    ('ftrt', 'f8'),
+    ('kind', 'i1'),          # +1 máximo, -1 mínimo
+    ('prominence', 'f8'),
+])
+
+MAXIMUM = 1
+MINIMUM = -1
+
+
+def find_extrema(values: np.ndarray, prominence: Optional[float] = None,
+                 distance: Optional[int] = None, wlen: Optional[int] = None) -> Dict:
+    """
+    Máximos y mínimos locales de una serie en memoria.
+
+    Args:
+        values: Serie de FTRT
+        prominence: Prominencia mínima (mismas unidades que values)
+        distance: Separación mínima entre picos del mismo tipo (muestras)
+        wlen: Ventana (muestras) para calcular la prominencia
+
+    Returns:
+        Dict con 'maxima' y 'minima' (índices) y sus prominencias
+    """
+    from scipy.signal import find_peaks
+
+    values = np.asarray(values, dtype=float)
+    kwargs = {'prominence': prominence if prominence is not None else 0.0,
+              'distance': distance, 'wlen': wlen}
+
+    maxima, max_props = find_peaks(values, **kwargs)
+    minima, min_props = find_peaks(-values, **kwargs)
+
+    return {
+        'maxima': maxima,
+        'maxima_prominence': max_props['prominences'],
+        'minima': minima,
+        'minima_prominence': min_props['prominences']
+    }
+
+
+def _peak_records(dates, values, extrema: Dict) -> np.ndarray:
+    n_max, n_min = len(extrema['maxima']), len(extrema['minima'])
+    records = np.empty(n_max + n_min, dtype=PEAK_DTYPE)
+    idx = np.r_[extrema['maxima'], extrema['minima']].astype(np.int64)
+    records['epoch'] = dates[idx]
+    records['ftrt'] = values[idx]
+    records['kind'] = np.r_[np.full(n_max, MAXIMUM), np.full(n_min, MINIMUM)]
+    records['prominence'] = np.r_[extrema['maxima_prominence'], extrema['minima_prominence']]
+    return records
+
+
+def find_extrema_chunked(series_func: Callable, start, stop, step=1,
+                         chunk_size: int = 36525, prominence: Optional[float] = None,
+                         distance: Optional[int] = None, wlen: Optional[int] = None,
+                         margin: Optional[int] = None) -> np.ndarray:
+    """
+    Detecta extremos sobre una serie generada por bloques.
+
+    Cada bloque se calcula con 'margin' épocas extra a cada lado y solo
+    se conservan los picos del tramo central. La prominencia de un pico
+    depende de bases arbitrariamente lejanas salvo que se acote con wlen,
+    por eso con 'prominence' es obligatorio un wlen finito; con
+    margin > wlen/2 y margin >= distance, el resultado coincide con el de
+    find_extrema(..., wlen=wlen) sobre la serie completa. Sin prominence
+    ni wlen, la prominencia guardada se mide dentro de cada bloque.
+
+    Args:
+        series_func: Función dates -> array de FTRT (ej. la calculadora)
+        start: Fecha inicial
+        stop: Fecha final (inclusive)
+        step: Paso en días (entero), np.timedelta64 o datetime.timedelta
+        chunk_size: Épocas por bloque (sin contar el margen)
+        prominence: Prominencia mínima
+        distance: Separación mínima entre picos (muestras)
+        wlen: Ventana de prominencia (muestras); obligatoria con prominence,
+            acota el margen necesario
+        margin: Épocas de solapamiento (default: max(wlen // 2 + 1, distance, 1))
+
+    Returns:
+        Array estructurado PEAK_DTYPE ordenado por fecha
+
+    Raises:
+        ValueError: Si se pide prominence sin wlen finito, o el margen
+            no cubre la ventana
+    """
+    if prominence is not None and (wlen is None or not np.isfinite(wlen)):
+        raise ValueError("Por bloques, prominence requiere un wlen finito "
+                         "(la prominencia depende de bases fuera del bloque)")
+    step = as_step(step)
+    start = np.datetime64(start, 's')
+    stop = np.datetime64(stop, 's')
+
+    if margin is None:
+        margin = max((wlen or 0) // 2 + 1, distance or 0, 1)
+    elif wlen is not None and margin <= wlen // 2:
+        raise ValueError(f"margin={margin} no cubre la ventana wlen={wlen}")
+
+    n_total = int((stop - start) // step) + 1
+    parts = []
+
+    for core_start in range(0, n_total, chunk_size):
+        core_stop = min(core_start + chunk_size, n_total)
+        first = max(core_start - margin, 0)
+        last = min(core_stop + margin, n_total)
+
+        dates = start + step * np.arange(first, last)
+        values = np.asarray(series_func(dates), dtype=float)
+        records = _peak_records(dates, values,
+                                find_extrema(values, prominence, distance, wlen))
+
+        # Conservar solo los picos del tramo central del bloque
+        offset = ((records['epoch'] - start) // step).astype(np.int64)
+        parts.append(records[(offset >= core_start) & (offset < core_stop)])
+
+    peaks = np.concatenate(parts) if parts else np.empty(0, dtype=PEAK_DTYPE)
+    return np.sort(peaks, order='epoch')
+
+
+class PeakIndex:
+    """
+    Índice ordenado de extremos de FTRT
+    """
+
+    def __init__(self, peaks: np.ndarray):
+        """
+        Args:
+            peaks: Array estructurado PEAK_DTYPE
+        """
+        peaks = np.asarray(peaks, dtype=PEAK_DTYPE)
+        if np.any(peaks['epoch'][1:] < peaks['epoch'][:-1]):
+            peaks = np.sort(peaks, order='epoch')
+        self.peaks = peaks
+
+    @classmethod
+    def from_series(cls, dates, ftrt, prominence: Optional[float] = None,
+                    distance: Optional[int] = None,
+                    wlen: Optional[int] = None) -> 'PeakIndex':
+        """Índice a partir de una serie ya calculada en memoria."""
+        dates = np.asarray(dates, dtype='datetime64[s]')
+        ftrt = np.asarray(ftrt, dtype=float)
+        return cls(_peak_records(dates, ftrt, find_extrema(ftrt, prominence, distance, wlen)))
+
+    @classmethod
+    def from_calculator(cls, calculator, start, stop, step=1, planets=None,
+                        **kwargs) -> 'PeakIndex':
+        """
+        Índice por bloques usando calculate_ftrt_series de la calculadora.
+
+        Args:
+            calculator: FTRTCalculator
+            start, stop, step: Rango de fechas (stop inclusive)
+            planets: Planetas a incluir (default: los de la calculadora)
+            **kwargs: chunk_size, prominence, distance, wlen (obligatorio
+                con prominence), margin
+        """
+        def series_func(dates):
+            return calculator.calculate_ftrt_series(dates=dates,
+                                                    planets_to_include=planets)['ftrt_total']
+
+        return cls(find_extrema_chunked(series_func, start, stop, step, **kwargs))
+
+    def _kind_view(self, kind: Optional[int]) -> np.ndarray:
+        if kind is None:
+            return self.peaks
+        return self.peaks[self.peaks['kind'] == kind]
+
+    def in_range(self, start, end, kind: Optional[int] = None) -> np.ndarray:
+        """Extremos con fecha en [start, end]."""
+        peaks = self._kind_view(kind)
+        lo = np.searchsorted(peaks['epoch'], np.datetime64(start, 's'), side='left')
+        hi = np.searchsorted(peaks['epoch'], np.datetime64(end, 's'), side='right')
+        return peaks[lo:hi]
+
+    def top(self, n: int = 10, kind: int = MAXIMUM) -> np.ndarray:
+        """Los n extremos más prominentes del tipo dado."""
+        peaks = self._kind_view(kind)
+        order = np.argsort(peaks['prominence'])[::-1][:n]
+        return peaks[order]
+
+    def match_events(self, event_dates, kind: int = MAXIMUM,
+                     window_days: Optional[float] = None) -> Dict:
+        """
+        Extremo más cercano a cada evento (vectorizado).
+
+        Args:
+            event_dates: Fechas de los eventos (ej. historical_events)
+            kind: MAXIMUM o MINIMUM
+            window_days: Si se indica, los eventos sin extremo a menos de
+                esa distancia quedan sin pareja (índice -1)
+
+        Returns:
+            Dict con 'peak_index', 'peak_epoch', 'peak_ftrt' y 'lag_days'
+            (evento - pico; positivo si el pico fue antes)
+        """
+        peaks = self._kind_view(kind)
+        events = np.atleast_1d(np.asarray(event_dates, dtype='datetime64[s]'))
+        n = len(peaks)
+        if n == 0:
+            missing = np.full(len(events), -1)
+            return {'peak_index': missing, 'peak_epoch': np.full(len(events), np.datetime64('NaT', 's')),
+                    'peak_ftrt': np.full(len(events), np.nan), 'lag_days': np.full(len(events), np.nan)}
+
+        right = np.clip(np.searchsorted(peaks['epoch'], events), 0, n - 1)
+        left = np.clip(right - 1, 0, n - 1)
+        lag_left = (events - peaks['epoch'][left]).astype(np.int64) / 86400.0
+        lag_right = (events - peaks['epoch'][right]).astype(np.int64) / 86400.0
+        nearest = np.where(np.abs(lag_left) <= np.abs(lag_right), left, right)
+        lag = np.where(nearest == left, lag_left, lag_right)
+
+        if window_days is not None:
+            nearest = np.where(np.abs(lag) <= window_days, nearest, -1)
+
+        matched = nearest >= 0
+        return {
+            'peak_index': nearest,
+            'peak_epoch': np.where(matched, peaks['epoch'][nearest], np.datetime64('NaT', 's')),
+            'peak_ftrt': np.where(matched, peaks['ftrt'][nearest], np.nan),
+            'lag_days': np.where(matched, lag, np.nan)
+        }
+
+    def to_records(self) -> List[Dict]:
+        """Extremos como lista de dicts."""
+        return [
+            {
+                'epoch': str(p['epoch']),
+                'ftrt': float(p['ftrt']),
+                'kind': 'max' if p['kind'] == MAXIMUM else 'min',
+                'prominence': float(p['prominence'])
+            }
+            for p in self.peaks
+        ]
+
+    def save(self, path: str):
+        """Guarda el índice en un archivo .npy."""
+        np.save(path, self.peaks)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'PeakIndex':
+        """Carga un índice guardado con save() (mapeado en memoria por defecto)."""
+        return cls(np.load(path, mmap_mode='r' if mmap else None))
+
+    def __len__(self) -> int:
+        return len(self.peaks)
@@ -0,0 +1,410 @@
+"""
+Remuestreo vectorizado para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Bootstrap de la correlación de Pearson sin bucles por réplica: los
+índices de remuestreo se generan como una matriz (réplicas × eventos)
+por bloques de memoria acotada y todas las correlaciones de un bloque
+se obtienen con sumas de momentos por fila. Además del intervalo por
+percentiles se calcula el intervalo BCa (sesgo corregido y acelerado),
+con la aceleración estimada por jackknife en forma cerrada.
+
+El test de permutación usa la misma idea: con n pequeño enumera todas
+las permutaciones; si no, evalúa lotes de permutaciones con un producto
+matricial y se detiene en cuanto la decisión frente a alpha está
+garantizada por el intervalo de Clopper-Pearson del p-value.
+
+Las réplicas se agrupan en bloques fijos (STREAM_BLOCK por defecto),
+cada uno con su propio generador derivado de un SeedSequence. Los
+bloques pueden repartirse entre procesos y el resultado es idéntico bit
+a bit para cualquier número de workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+
+# Elementos (réplicas × eventos) por bloque de índices de remuestreo
+RESAMPLE_BUDGET = 1 << 22
+
+# Réplicas por flujo aleatorio independiente (unidad de reparto entre procesos)
+STREAM_BLOCK = 256
+
+
+def _block_rows(n: int) -> int:
+    return max(1, RESAMPLE_BUDGET // max(n, 1))
+
+
+def seed_sequence(seed=None) -> np.random.SeedSequence:
+    """
+    SeedSequence raíz a partir de una semilla.
+
+    Args:
+        seed: None (entropía del sistema), entero, SeedSequence o
+            Generator (se consume una extracción para derivar la semilla)
+
+    Returns:
+        np.random.SeedSequence
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(0, 2 ** 63, size=4).tolist())
+    return np.random.SeedSequence(seed)
+
+
+def _stream_tasks(root: np.random.SeedSequence, total: int, block: int) -> list:
+    """Bloques fijos (semilla hija, réplicas) que cubren 'total' réplicas."""
+    counts = [min(block, total - first) for first in range(0, total, block)]
+    return list(zip(root.spawn(len(counts)), counts))
+
+
+_WORKER_DATA = None
+
+
+def _init_resampling_worker(x, y):
+    """Inicializador del pool: deja las series en el proceso."""
+    global _WORKER_DATA
+    _WORKER_DATA = (x, y)
+
+
+def _worker_block(func, seed, count):
+    x, y = _WORKER_DATA
+    return func(x, y, seed, count)
+
+
+@contextmanager
+def _block_runner(x: np.ndarray, y: np.ndarray, workers: Optional[int]):
+    """
+    Ejecutor de bloques: run(func, tasks) -> lista de resultados en el
+    orden de tasks, en serie o repartidos en un pool de procesos.
+    """
+    if not workers or workers <= 1:
+        yield lambda func, tasks: [func(x, y, seed, count) for seed, count in tasks]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_resampling_worker,
+                             initargs=(x, y)) as executor:
+        def run(func, tasks):
+            if not tasks:
+                return []
+            seeds, counts = zip(*tasks)
+            return list(executor.map(_worker_block, [func] * len(tasks), seeds, counts))
+        yield run
+
+
+def pearson_rows(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Correlación de Pearson de cada fila de x con la fila correspondiente de y.
+
+    Args:
+        x: Array (réplicas × n)
+        y: Array (réplicas × n)
+
+    Returns:
+        Array (réplicas,) de r (NaN si alguna fila tiene varianza nula)
+    """
+    dx = x - x.mean(axis=-1, keepdims=True)
+    dy = y - y.mean(axis=-1, keepdims=True)
+    sxy = np.einsum('ij,ij->i', dx, dy)
+    sxx = np.einsum('ij,ij->i', dx, dx)
+    syy = np.einsum('ij,ij->i', dy, dy)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sxy / np.sqrt(sxx * syy)
+
+
+def jackknife_correlations(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Correlaciones "dejando uno fuera" para todas las observaciones, en O(n).
+
+    Args:
+        x: Array (n,)
+        y: Array (n,)
+
+    Returns:
+        Array (n,) con r calculada sin la observación i
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    # Centrar primero evita la cancelación en las sumas de cuadrados
+    x = x - x.mean()
+    y = y - y.mean()
+    m = n - 1
+    sx, sy = x.sum() - x, y.sum() - y
+    sxx, syy, sxy = (x ** 2).sum() - x ** 2, (y ** 2).sum() - y ** 2, (x * y).sum() - x * y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / m
+        return cov / np.sqrt((sxx - sx ** 2 / m) * (syy - sy ** 2 / m))
+
+
+def bca_interval(replicates: np.ndarray, observed: float, jackknife: np.ndarray,
+                 confidence: float = 0.95) -> tuple:
+    """
+    Intervalo BCa (bias-corrected and accelerated) a partir de las réplicas.
+
+    Args:
+        replicates: Estadístico en cada réplica bootstrap (NaN se ignoran)
+        observed: Estadístico sobre la muestra original
+        jackknife: Estadístico "dejando uno fuera" (aceleración)
+        confidence: Nivel de confianza
+
+    Returns:
+        (lower, upper); NaN si el intervalo no está definido
+    """
+    from scipy import stats
+
+    replicates = replicates[np.isfinite(replicates)]
+    jackknife = jackknife[np.isfinite(jackknife)]
+    if len(replicates) == 0:
+        return np.nan, np.nan
+
+    # Corrección de sesgo (los empates cuentan a medias)
+    below = np.mean(replicates < observed) + 0.5 * np.mean(replicates == observed)
+    if below <= 0.0 or below >= 1.0:
+        return np.nan, np.nan
+    z0 = stats.norm.ppf(below)
+
+    # Aceleración por jackknife
+    d = jackknife.mean() - jackknife
+    denom = 6.0 * np.sum(d ** 2) ** 1.5
+    a = np.sum(d ** 3) / denom if denom > 0 else 0.0
+
+    alpha = (1.0 - confidence) / 2.0
+    z = stats.norm.ppf([alpha, 1.0 - alpha])
+    adjusted = stats.norm.cdf(z0 + (z0 + z) / (1.0 - a * (z0 + z)))
+    lower, upper = np.percentile(replicates, 100.0 * adjusted)
+    return float(lower), float(upper)
+
+
+def _bootstrap_block(x: np.ndarray, y: np.ndarray, seed, count: int) -> np.ndarray:
+    """Correlaciones de 'count' réplicas bootstrap con un flujo propio."""
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    rows = _block_rows(n)
+    correlations = np.empty(count)
+    for first in range(0, count, rows):
+        size = min(rows, count - first)
+        idx = rng.integers(0, n, size=(size, n))
+        correlations[first:first + size] = pearson_rows(x[idx], y[idx])
+    return correlations
+
+
+def bootstrap_correlation(x, y, n_bootstrap: int = 10000, confidence: float = 0.95,
+                          chunk_size: Optional[int] = None, seed=None,
+                          workers: Optional[int] = None) -> Dict:
+    """
+    Bootstrap de la correlación de Pearson, vectorizado por bloques.
+
+    Args:
+        x: Array (n,) (ej. FTRT)
+        y: Array (n,) (ej. magnitud)
+        n_bootstrap: Número de réplicas
+        confidence: Nivel de confianza de los intervalos
+        chunk_size: Réplicas por bloque con flujo aleatorio propio
+            (default: STREAM_BLOCK); con la misma semilla, el resultado
+            depende de él pero no de workers
+        seed: Semilla (entero, SeedSequence o Generator) para reproducir
+        workers: Procesos del pool (None o 1: en serie); no cambia el resultado
+
+    Returns:
+        Dict con 'r', 'correlations', 'mean', 'std', 'ci_lower',
+        'ci_upper' (percentiles), 'bca_lower' y 'bca_upper'
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 3:
+        raise ValueError("Se requieren al menos 3 observaciones")
+
+    r_observed = float(pearson_rows(x[np.newaxis, :], y[np.newaxis, :])[0])
+
+    block = max(1, int(chunk_size)) if chunk_size is not None else STREAM_BLOCK
+    tasks = _stream_tasks(seed_sequence(seed), n_bootstrap, block)
+    with _block_runner(x, y, workers) as run:
+        correlations = np.concatenate(run(_bootstrap_block, tasks) or [np.empty(0)])
+
+    # Réplicas degeneradas (varianza nula) no entran en los intervalos
+    valid = correlations[np.isfinite(correlations)]
+    alpha = (1.0 - confidence) / 2.0
+    if len(valid):
+        ci_lower, ci_upper = np.percentile(valid, [100.0 * alpha, 100.0 * (1.0 - alpha)])
+    else:
+        ci_lower = ci_upper = np.nan
+    bca_lower, bca_upper = bca_interval(correlations, r_observed,
+                                        jackknife_correlations(x, y), confidence)
+
+    return {
+        'r': r_observed,
+        'correlations': correlations,
+        'mean': float(np.mean(valid)) if len(valid) else np.nan,
+        'std': float(np.std(valid, ddof=1)) if len(valid) > 1 else np.nan,
+        'ci_lower': float(ci_lower),
+        'ci_upper': float(ci_upper),
+        'bca_lower': bca_lower,
+        'bca_upper': bca_upper
+    }
+
+
+def _permutation_stat(x: np.ndarray, y: np.ndarray):
+    """
+    Bajo permutación de y, medias y varianzas no cambian: r es el producto
+    escalar de las series estandarizadas.
+    """
+    xs = x - x.mean()
+    ys = y - y.mean()
+    norm = np.sqrt(np.dot(xs, xs) * np.dot(ys, ys))
+    return xs / norm, ys
+
+
+def _exceeds(r: np.ndarray, r_observed: float, alternative: str) -> np.ndarray:
+    # Tolerancia para que la propia permutación identidad cuente como empate
+    tol = 1e-12
+    if alternative == 'two-sided':
+        return np.abs(r) >= abs(r_observed) - tol
+    if alternative == 'greater':
+        return r >= r_observed - tol
+    if alternative == 'less':
+        return r <= r_observed + tol
+    raise ValueError(f"Alternativa desconocida: {alternative}")
+
+
+def clopper_pearson(k: int, n: int, confidence: float = 0.99) -> tuple:
+    """
+    Intervalo exacto (Clopper-Pearson) para una proporción binomial k/n.
+
+    Returns:
+        (lower, upper)
+    """
+    from scipy import stats
+
+    alpha = 1.0 - confidence
+    lower = stats.beta.ppf(alpha / 2.0, k, n - k + 1) if k > 0 else 0.0
+    upper = stats.beta.ppf(1.0 - alpha / 2.0, k + 1, n - k) if k < n else 1.0
+    return float(lower), float(upper)
+
+
+def _exact_permutations(n: int, rows: int):
+    """Todas las permutaciones de range(n), en bloques (filas × n)."""
+    from itertools import chain, islice, permutations
+
+    source = permutations(range(n))
+    while True:
+        block = np.fromiter(chain.from_iterable(islice(source, rows)), dtype=np.intp)
+        if len(block) == 0:
+            return
+        yield block.reshape(-1, n)
+
+
+def _permutation_block(xs: np.ndarray, ys: np.ndarray, seed, count: int) -> np.ndarray:
+    """r de 'count' permutaciones aleatorias de ys con un flujo propio."""
+    rng = np.random.default_rng(seed)
+    n = len(xs)
+    rows = _block_rows(n)
+    parts = []
+    for first in range(0, count, rows):
+        size = min(rows, count - first)
+        perms = np.argsort(rng.random((size, n)), axis=1)
+        parts.append(ys[perms] @ xs)
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def permutation_test(x, y, n_permutations: int = 10000, alternative: str = 'two-sided',
+                     alpha: float = 0.05, confidence: float = 0.99,
+                     adaptive: bool = True, max_exact: int = 10,
+                     batch_size: int = STREAM_BLOCK, seed=None,
+                     workers: Optional[int] = None) -> Dict:
+    """
+    Test de permutación de la correlación de Pearson.
+
+    Con n <= max_exact se enumeran las n! permutaciones (p exacto). En otro
+    caso se permutan lotes vectorizados de tamaño creciente (batch_size,
+    2·batch_size, 4·batch_size, ...) y, con adaptive=True, se detiene en cuanto el
+    intervalo de Clopper-Pearson de p queda por completo a un lado de
+    alpha. La confianza de cada revisión se corrige por Bonferroni sobre
+    el número máximo de revisiones, de modo que la probabilidad de
+    decidir mal es como mucho 1 - confidence.
+
+    Args:
+        x: Array (n,) (ej. FTRT)
+        y: Array (n,) (ej. magnitud); es la serie que se permuta
+        n_permutations: Máximo de permutaciones Monte Carlo
+        alternative: 'two-sided', 'greater' o 'less'
+        alpha: Nivel de significancia para la parada temprana
+        confidence: Confianza global de la decisión
+        adaptive: Parar en cuanto la decisión esté garantizada
+        max_exact: Mayor n para el que se enumeran todas las permutaciones
+        batch_size: Tamaño del primer lote Monte Carlo y de cada bloque
+            con flujo aleatorio propio
+        seed: Semilla (entero, SeedSequence o Generator) para reproducir
+        workers: Procesos del pool (None o 1: en serie); no cambia el resultado
+
+    Returns:
+        Dict con 'r_observed', 'p_value', 'p_ci_lower', 'p_ci_upper',
+        'n_permutations' (realizadas), 'exact', 'stopped_early' y
+        'r_permuted'
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 3:
+        raise ValueError("Se requieren al menos 3 observaciones")
+
+    xs, ys = _permutation_stat(x, y)
+    r_observed = float(np.dot(xs, ys))
+    rows = _block_rows(n)
+
+    if n <= max_exact:
+        r_permuted = np.concatenate([ys[perms] @ xs for perms in _exact_permutations(n, rows)])
+        p_value = float(np.mean(_exceeds(r_permuted, r_observed, alternative)))
+        return {
+            'r_observed': r_observed,
+            'p_value': p_value,
+            'p_ci_lower': p_value,
+            'p_ci_upper': p_value,
+            'n_permutations': len(r_permuted),
+            'exact': True,
+            'stopped_early': False,
+            'r_permuted': r_permuted
+        }
+
+    # Revisiones tras 1, 2, 4, ... bloques, hasta n_permutations
+    tasks = _stream_tasks(seed_sequence(seed), n_permutations, max(1, int(batch_size)))
+    looks = []
+    while sum(len(look) for look in looks) < len(tasks):
+        first = sum(len(look) for look in looks)
+        looks.append(tasks[first:first + (1 << len(looks))])
+    look_confidence = 1.0 - (1.0 - confidence) / max(len(looks), 1)
+
+    parts = []
+    hits = done = 0
+    stopped_early = False
+    with _block_runner(xs, ys, workers) as run:
+        for i, look in enumerate(looks):
+            for r_block in run(_permutation_block, look):
+                hits += int(np.count_nonzero(_exceeds(r_block, r_observed, alternative)))
+                done += len(r_block)
+                parts.append(r_block)
+
+            if adaptive and i < len(looks) - 1:
+                lower, upper = clopper_pearson(hits, done, look_confidence)
+                if upper < alpha or lower > alpha:
+                    stopped_early = True
+                    break
+
+    p_ci_lower, p_ci_upper = clopper_pearson(hits, done, confidence)
+
+    return {
+        'r_observed': r_observed,
+        # (k + 1) / (m + 1): nunca 0 y válido como p-value Monte Carlo
+        'p_value': (hits + 1) / (done + 1),
+        'p_ci_lower': p_ci_lower,
+        'p_ci_upper': p_ci_upper,
+        'n_permutations': done,
+        'exact': False,
+        'stopped_early': stopped_early,
+        'r_permuted': np.concatenate(parts) if parts else np.empty(0)
+    }
@@ -0,0 +1,167 @@
+"""
+Almacén columnar de resultados de validación del Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Guarda los resultados por columnas (un array NumPy por campo) en lugar
+de una lista de diccionarios: fechas como datetime64, una columna float64
+de contribución por planeta y el nivel de alerta como categoría de un
+byte. La vista DataFrame se construye sin copiar los arrays numéricos.
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+if __package__:
+    from .utils import ALERT_LEVELS
+else:
+    from utils import ALERT_LEVELS
+
+
+CONTRIBUTION_PREFIX = 'contrib_'
+
+
+def encode_alert_levels(levels) -> np.ndarray:
+    """Convierte nombres de nivel de alerta a códigos uint8."""
+    lookup = {name: code for code, name in enumerate(ALERT_LEVELS)}
+    return np.array([lookup[str(level)] for level in levels], dtype=np.uint8)
+
+
+class ResultsStore:
+    """
+    Resultados de validación en formato columnar
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], planets: Sequence[str] = ()):
+        """
+        Args:
+            columns: Dict nombre -> array 1D (todas de la misma longitud).
+                'alert_level' se guarda como códigos uint8 (ver ALERT_LEVELS)
+            planets: Planetas con columna de contribución 'contrib_<planeta>'
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columnas de distinta longitud: {sorted(lengths)}")
+
+        self.columns = dict(columns)
+        self.planets = list(planets)
+
+    @classmethod
+    def from_events(cls, events: List[Dict], ftrt, alert_level, barycenter_dist,
+                    contributions: Optional[np.ndarray] = None,
+                    planets: Sequence[str] = ()) -> 'ResultsStore':
+        """
+        Construye el almacén a partir de los eventos y los arrays de resultados.
+
+        Args:
+            events: Lista de eventos (dicts con 'date', 'name', 'magnitude', ...)
+                o DataFrame con esas columnas (ej. un bloque de EventCatalog)
+            ftrt: FTRT total por evento
+            alert_level: Nivel de alerta por evento (nombres o códigos uint8)
+            barycenter_dist: Distancia del baricentro por evento (R☉)
+            contributions: Array (planetas × eventos) de contribuciones FTRT
+            planets: Nombres de las filas de contributions
+
+        Returns:
+            ResultsStore
+        """
+        columns = {}
+        if isinstance(events, pd.DataFrame):
+            for key in events.columns:
+                columns[key] = events[key].to_numpy()
+        else:
+            for key in (events[0] if events else {}):
+                columns[key] = np.asarray([event.get(key) for event in events])
+        if 'date' in columns:
+            columns['date'] = columns['date'].astype('datetime64[s]')
+
+        alert_level = np.asarray(alert_level)
+        if alert_level.dtype != np.uint8:
+            alert_level = encode_alert_levels(alert_level)
+
+        columns['ftrt'] = np.asarray(ftrt, dtype=float)
+        columns['alert_level'] = alert_level
+        columns['barycenter_dist'] = np.asarray(barycenter_dist, dtype=float)
+
+        if contributions is not None:
+            contributions = np.asarray(contributions, dtype=float)
+            for i, planet in enumerate(planets):
+                columns[CONTRIBUTION_PREFIX + planet] = contributions[i]
+
+        return cls(columns, planets if contributions is not None else ())
+
+    @classmethod
+    def concat(cls, stores: List['ResultsStore']) -> 'ResultsStore':
+        """Une varios almacenes con las mismas columnas (ej. uno por bloque)."""
+        if not stores:
+            return cls({})
+        names = list(stores[0].columns)
+        return cls({name: np.concatenate([s.columns[name] for s in stores]) for name in names},
+                   stores[0].planets)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'ResultsStore':
+        """Convierte una lista de dicts (formato anterior) al almacén columnar."""
+        base = ('ftrt', 'alert_level', 'barycenter_dist')
+        events = [{k: v for k, v in r.items() if k not in base} for r in records]
+        return cls.from_events(
+            events,
+            [r['ftrt'] for r in records],
+            [r['alert_level'] for r in records],
+            [r.get('barycenter_dist', np.nan) for r in records]
+        )
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Columna por nombre; 'alert_level' se devuelve con los nombres."""
+        if name == 'alert_level':
+            return np.asarray(ALERT_LEVELS, dtype=object)[self.columns[name]]
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Itera fila a fila como dicts (compatibilidad con la lista anterior)."""
+        names = list(self.columns)
+        values = [self[name] for name in names]
+        for i in range(len(self)):
+            row = {name: column[i] for name, column in zip(names, values)}
+            if 'date' in row:
+                row['date'] = str(row['date'].astype('datetime64[D]'))
+            yield row
+
+    def contributions(self) -> np.ndarray:
+        """Array (planetas × eventos) de contribuciones FTRT."""
+        return np.array([self.columns[CONTRIBUTION_PREFIX + p] for p in self.planets])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Vista DataFrame de los resultados.
+
+        Las columnas numéricas comparten memoria con el almacén; el nivel
+        de alerta es un Categorical sobre los mismos códigos uint8.
+        """
+        data = {}
+        for name, values in self.columns.items():
+            if name == 'alert_level':
+                values = pd.Categorical.from_codes(values, categories=list(ALERT_LEVELS),
+                                                   ordered=True)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arrays de columnas (bytes)."""
+        return sum(values.nbytes for values in self.columns.values())
+
+
+def as_dataframe(results) -> pd.DataFrame:
+    """DataFrame a partir de un ResultsStore, un DataFrame o una lista de dicts."""
+    if isinstance(results, ResultsStore):
+        return results.to_dataframe()
+    if isinstance(results, pd.DataFrame):
+        return results
+    return pd.DataFrame(results)
@@ -0,0 +1,289 @@
+"""
+Lector de kernels binarios SPK de JPL (DE4xx) para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+Lee archivos .bsp locales mediante mmap, sin cargarlos en memoria,
+localiza los segmentos de Chebyshev (tipos 2 y 3) por código NAIF y
+evalúa posiciones para lotes de épocas de forma vectorizada. Permite
+calcular FTRT con precisión de efeméride JPL sin acceso a la red.
+Las posiciones se devuelven en el marco eclíptico J2000, como las de
+KeplerEphemeris (los kernels DE guardan el ecuatorial J2000/ICRF).
+"""
+
+import mmap
+import struct
+import traceback
+from typing import Dict, List, Optional
+
+import numpy as np
+
+if __package__:
+    from .utils import AU_TO_KM, NAIF_CODES
+else:
+    from utils import AU_TO_KM, NAIF_CODES
+
+
+RECORD_BYTES = 1024
+J2000_JD = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+SSB = 0          # Baricentro del sistema solar
+SUN = 10
+
+# Marcos de referencia SPICE de los segmentos
+FRAME_J2000 = 1          # Ecuatorial J2000 (ICRF)
+FRAME_ECLIPJ2000 = 17    # Eclíptico J2000
+
+# Oblicuidad de la eclíptica en J2000 (grados)
+J2000_OBLIQUITY_DEG = 23.4392911
+
+
+def _rotation_x(degrees: float) -> np.ndarray:
+    """Matriz de rotación de ejes alrededor de x."""
+    c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+    return np.array([[1.0, 0.0, 0.0], [0.0, c, s], [0.0, -s, c]])
+
+
+# Ecuatorial J2000 → eclíptico J2000
+EQUATORIAL_TO_ECLIPTIC = _rotation_x(J2000_OBLIQUITY_DEG)
+
+
+class SPKError(ValueError):
+    """El archivo no es un kernel SPK válido o no contiene el cuerpo pedido."""
+
+
+def dates_to_et(dates) -> np.ndarray:
+    """
+    Convierte fechas a segundos TDB desde J2000 (ET).
+
+    La diferencia entre UT y TDB (~1 minuto en la época actual) se
+    ignora: es despreciable para distancias heliocéntricas.
+    """
+    seconds = np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+    return (seconds / 86400.0 + UNIX_EPOCH_JD - J2000_JD) * 86400.0
+
+
+class SPKEphemeris:
+    """
+    Proveedor de efemérides offline basado en un kernel SPK local
+    """
+
+    method = 'jpl_spk'
+
+    def __init__(self, path: str, chunk_size: int = 65536):
+        """
+        Args:
+            path: Ruta del archivo .bsp (ej. de440s.bsp)
+            chunk_size: Épocas evaluadas por bloque (limita la memoria)
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SPKError(f"Archivo vacío: {path}")
+
+        try:
+            self._read_file_record()
+            self._doubles = np.frombuffer(self._mmap, dtype=f'{self._endian}f8')
+            self.segments = self._read_summaries()
+        except Exception as e:
+            # No dejar abiertos el archivo ni el mmap si la cabecera o los
+            # resúmenes no son válidos (las vistas en los frames del error
+            # impedirían cerrar el mmap)
+            self._doubles = None
+            traceback.clear_frames(e.__traceback__)
+            self._mmap.close()
+            self._file.close()
+            raise
+
+    # ------------------------------------------------------------------
+    # Estructura DAF
+    # ------------------------------------------------------------------
+
+    def _read_file_record(self):
+        header = self._mmap[:RECORD_BYTES]
+        if not header[:7] == b'DAF/SPK':
+            raise SPKError(f"No es un archivo DAF/SPK: {self.path}")
+
+        fmt = header[88:96]
+        if fmt == b'LTL-IEEE':
+            self._endian = '<'
+        elif fmt == b'BIG-IEEE':
+            self._endian = '>'
+        else:
+            raise SPKError(f"Formato binario no soportado: {fmt!r}")
+
+        self._nd, self._ni = struct.unpack(f'{self._endian}ii', header[8:16])
+        self._fward = struct.unpack(f'{self._endian}i', header[76:80])[0]
+
+    def _read_summaries(self) -> List[Dict]:
+        """Recorre la lista enlazada de registros de resumen DAF."""
+        segments = []
+        summary_doubles = self._nd + (self._ni + 1) // 2
+        record = self._fward
+
+        while record > 0:
+            offset = (record - 1) * RECORD_BYTES
+            control = np.frombuffer(self._mmap, dtype=f'{self._endian}f8', count=3, offset=offset)
+            next_record, n_summaries = int(control[0]), int(control[2])
+
+            for k in range(n_summaries):
+                start = offset + 24 + k * summary_doubles * 8
+                dbl = struct.unpack(f'{self._endian}{self._nd}d', self._mmap[start:start + 8 * self._nd])
+                ints = struct.unpack(f'{self._endian}{self._ni}i',
+                                     self._mmap[start + 8 * self._nd:start + 8 * self._nd + 4 * self._ni])
+                target, center, frame, data_type, begin, end = ints[:6]
+                segments.append({
+                    'target': target,
+                    'center': center,
+                    'frame': frame,
+                    'data_type': data_type,
+                    'start_et': dbl[0],
+                    'end_et': dbl[1],
+                    'begin': begin,
+                    'end': end,
+                })
+            record = next_record
+
+        for segment in segments:
+            if segment['data_type'] in (2, 3):
+                self._attach_chebyshev(segment)
+
+        return segments
+
+    def _attach_chebyshev(self, segment: Dict):
+        """Vista (sin copia) de los registros de Chebyshev de un segmento."""
+        init, intlen, rsize, n = self._doubles[segment['end'] - 4:segment['end']]
+        rsize, n = int(rsize), int(n)
+        data = self._doubles[segment['begin'] - 1:segment['begin'] - 1 + rsize * n]
+
+        n_components = 3 if segment['data_type'] == 2 else 6
+        segment['init'] = init
+        segment['intlen'] = intlen
+        segment['n_records'] = n
+        segment['n_coef'] = (rsize - 2) // n_components
+        segment['records'] = data.reshape(n, rsize)
+
+    # ------------------------------------------------------------------
+    # Evaluación
+    # ------------------------------------------------------------------
+
+    def _segments_for(self, target: int) -> List[Dict]:
+        return [s for s in self.segments if s['target'] == target and 'records' in s]
+
+    def _resolve_target(self, target: int) -> int:
+        """Si el kernel no tiene el planeta (ej. 599), usa su baricentro (5)."""
+        if self._segments_for(target):
+            return target
+        if target > 100 and self._segments_for(target // 100):
+            return target // 100
+        raise SPKError(f"El kernel no contiene el cuerpo NAIF {target}")
+
+    def _evaluate_segment(self, segment: Dict, et: np.ndarray) -> np.ndarray:
+        """Posición (épocas × 3, km) del segmento respecto a su centro."""
+        idx = np.floor((et - segment['init']) / segment['intlen']).astype(np.int64)
+        idx = np.clip(idx, 0, segment['n_records'] - 1)
+
+        records = segment['records'][idx]
+        mid, radius = records[:, 0], records[:, 1]
+        n_coef = segment['n_coef']
+        coef = records[:, 2:2 + 3 * n_coef].reshape(len(et), 3, n_coef)
+
+        # Clenshaw sobre los coeficientes de Chebyshev (x, y, z a la vez)
+        s = ((et - mid) / radius)[:, np.newaxis]
+        b1 = np.zeros((len(et), 3))
+        b2 = np.zeros((len(et), 3))
+        for k in range(n_coef - 1, 0, -1):
+            b1, b2 = 2.0 * s * b1 - b2 + coef[:, :, k], b1
+        return s * b1 - b2 + coef[:, :, 0]
+
+    def _position_wrt_center(self, target: int, et: np.ndarray):
+        """Posición del cuerpo respecto al centro de su segmento (eclíptica J2000)."""
+        segments = self._segments_for(target)
+        position = np.full((len(et), 3), np.nan)
+        for segment in segments:
+            mask = (et >= segment['start_et']) & (et <= segment['end_et']) & np.isnan(position[:, 0])
+            if mask.any():
+                relative = self._evaluate_segment(segment, et[mask])
+                if segment['frame'] == FRAME_J2000:
+                    relative = relative @ EQUATORIAL_TO_ECLIPTIC.T
+                elif segment['frame'] != FRAME_ECLIPJ2000:
+                    raise SPKError(f"Marco SPK no soportado: {segment['frame']}")
+                position[mask] = relative
+        if np.isnan(position[:, 0]).any():
+            raise SPKError(f"Épocas fuera de la cobertura del kernel para NAIF {target}")
+        return position, segments[0]['center']
+
+    def position_ssb_km(self, target: int, et: np.ndarray) -> np.ndarray:
+        """
+        Posición respecto al baricentro del sistema solar (km, eclíptica
+        J2000), encadenando segmentos (ej. 399 → 3 → 0).
+        """
+        et = np.atleast_1d(np.asarray(et, dtype=float))
+        position = np.zeros((len(et), 3))
+        body = self._resolve_target(target)
+        while body != SSB:
+            relative, center = self._position_wrt_center(body, et)
+            position += relative
+            body = center
+        return position
+
+    def positions(self, planets: List[str], dates) -> np.ndarray:
+        """
+        Posiciones heliocéntricas (planetas × épocas × 3) en AU, en el
+        marco eclíptico J2000 (el mismo que KeplerEphemeris.positions).
+
+        Args:
+            planets: Nombres de planetas (códigos en utils.NAIF_CODES)
+            dates: Array de fechas
+        """
+        et = np.atleast_1d(dates_to_et(dates)).ravel()
+        result = np.empty((len(planets), len(et), 3))
+
+        for start in range(0, len(et), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            sun = self.position_ssb_km(SUN, et[chunk])
+            for i, planet in enumerate(planets):
+                target = int(NAIF_CODES[planet])
+                result[i, chunk] = (self.position_ssb_km(target, et[chunk]) - sun) / AU_TO_KM
+
+        return result
+
+    def distances(self, planets: List[str], dates) -> np.ndarray:
+        """Distancias heliocéntricas (planetas × épocas) en AU."""
+        return np.linalg.norm(self.positions(planets, dates), axis=-1)
+
+    def coverage(self, planet: Optional[str] = None) -> Dict:
+        """
+        Rango de épocas cubierto (ET en segundos) por cuerpo NAIF.
+        """
+        targets = {s['target'] for s in self.segments}
+        if planet is not None:
+            targets = {self._resolve_target(int(NAIF_CODES[planet]))}
+        return {
+            t: (min(s['start_et'] for s in self.segments if s['target'] == t),
+                max(s['end_et'] for s in self.segments if s['target'] == t))
+            for t in targets
+        }
+
+    def close(self):
+        """Libera el mmap y cierra el archivo."""
+        self._doubles = None
+        for segment in self.segments:
+            segment.pop('records', None)
+        self._mmap.close()
+        self._file.close()
+
+    def __reduce__(self):
+        # El mmap no se puede serializar: en otro proceso se reabre el archivo
+        return (self.__class__, (self.path, self.chunk_size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,109 @@
+"""
+Suma de mareas con dirección para el Sistema FTRT
+En honor a Alexander Leonidovich Chizhevsky (1897-1964)
+
+La FTRT escalar suma M/d³ sin mirar dónde está cada planeta. Aquí se
+suman las mareas como tensores (o como vectores alineados) a partir de
+las posiciones heliocéntricas, de modo que las configuraciones alineadas
+refuerzan la marea y las cruzadas la debilitan. Todo está vectorizado
+sobre planetas y épocas.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+if __package__:
+    from .utils import SUN_RADIUS_KM
+else:
+    from utils import SUN_RADIUS_KM
+
+
+def _unit_and_strength(positions: np.ndarray, masses: np.ndarray):
+    """
+    Vectores unitarios y fuerza escalar M·R☉/d³ (planetas × épocas).
+
+    Los planetas sin posición (NaN) no contribuyen, igual que en la suma
+    escalar con np.nansum.
+    """
+    positions = np.asarray(positions, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    distance = np.linalg.norm(positions, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        unit = positions / distance[..., np.newaxis]
+        strength = masses[:, np.newaxis] * SUN_RADIUS_KM / distance ** 3
+    valid = np.isfinite(strength)
+    return np.where(valid[..., np.newaxis], unit, 0.0), np.where(valid, strength, 0.0)
+
+
+def tidal_tensor(positions: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    """
+    Tensor de marea total T = Σ (M_p·R☉/d_p³) (3 r̂r̂ᵀ − I) por época.
+
+    Args:
+        positions: Posiciones heliocéntricas (planetas × épocas × 3) en AU
+        masses: Masas planetarias (planetas,) en masas de Júpiter
+
+    Returns:
+        Array (épocas × 3 × 3)
+    """
+    unit, strength = _unit_and_strength(positions, masses)
+    outer = np.einsum('pn,pni,pnj->nij', strength, unit, unit)
+    trace = strength.sum(axis=0)
+    return 3.0 * outer - trace[:, np.newaxis, np.newaxis] * np.eye(3)
+
+
+def aligned_tidal_vector(positions: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    """
+    Suma vectorial Σ (M_p·R☉/d_p³) r̂_p por época.
+
+    A diferencia del tensor, aquí los planetas en lados opuestos del Sol
+    se cancelan: mide conjunción, no alineamiento axial.
+
+    Returns:
+        Array (épocas × 3)
+    """
+    unit, strength = _unit_and_strength(positions, masses)
+    return np.einsum('pn,pnk->nk', strength, unit)
+
+
+def alignment_ftrt(positions: np.ndarray, masses: np.ndarray, mode: str = 'tensor') -> Dict:
+    """
+    FTRT sensible al alineamiento, con magnitud y eje dominante.
+
+    En modo 'tensor' la magnitud es λ_max/2 del tensor de marea: coincide
+    con la FTRT escalar cuando todos los planetas están sobre el mismo eje
+    (conjunción u oposición) y es menor cuando están dispersos. En modo
+    'vector' la magnitud es |Σ (M·R☉/d³) r̂|, que solo alcanza la FTRT
+    escalar en conjunción.
+
+    Args:
+        positions: Posiciones heliocéntricas (planetas × épocas × 3) en AU
+        masses: Masas planetarias (planetas,) en masas de Júpiter
+        mode: 'tensor' o 'vector'
+
+    Returns:
+        Dict con 'ftrt_aligned' (épocas,), 'axis' (épocas × 3, unitario),
+        'ftrt_scalar' (épocas,) y 'alignment_index' = aligned / scalar
+    """
+    _, strength = _unit_and_strength(positions, masses)
+    scalar = strength.sum(axis=0)
+
+    if mode == 'tensor':
+        eigenvalues, eigenvectors = np.linalg.eigh(tidal_tensor(positions, masses))
+        magnitude = eigenvalues[:, -1] / 2.0
+        axis = eigenvectors[:, :, -1]
+    elif mode == 'vector':
+        vector = aligned_tidal_vector(positions, masses)
+        magnitude = np.linalg.norm(vector, axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            axis = vector / magnitude[:, np.newaxis]
+    else:
+        raise ValueError(f"Modo desconocido: {mode} (usar 'tensor' o 'vector')")
+
+    return {
+        'ftrt_aligned': magnitude,
+        'axis': axis,
+        'ftrt_scalar': scalar,
+        'alignment_index': magnitude / scalar
+    }
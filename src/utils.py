@@ -8,6 +8,11 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import pandas as pd
 
+if __package__:
+    from .kepler_ephemeris import heliocentric_positions
+else:
+    from kepler_ephemeris import heliocentric_positions
+
 
 # ============================================================================
 # CONSTANTES ASTRONÓMICAS
@@ -68,6 +73,10 @@ NAIF_CODES = {
     'Neptune': '899'
 }
 
+# Niveles de alerta en orden creciente y umbrales FTRT entre ellos
+ALERT_LEVELS = ('NORMAL', 'ELEVADO', 'CRÍTICO', 'EXTREMO')
+ALERT_THRESHOLDS = (1.5, 2.5, 4.0)
+
 
 # ============================================================================
 # CÁLCULOS ORBITALES
@@ -81,7 +90,8 @@ def calculate_planet_position(planet: str, date: datetime,
     Args:
         planet: Nombre del planeta
         date: Fecha de cálculo
-        use_simple: Si True, usa órbitas circulares (más rápido, menos preciso)
+        use_simple: Si True, usa órbitas circulares (más rápido, menos preciso);
+            si False, usa órbitas elípticas con elementos J2000 (kepler_ephemeris)
         
     Returns:
         Dict con 'distance_au', 'angle_deg', y otros parámetros
@@ -114,15 +124,27 @@ def calculate_planet_position(planet: str, date: datetime,
             'method': 'simple_circular'
         }
     else:
-        # Método más preciso requeriría elementos orbitales completos
-        # y cálculo de anomalía verdadera
-        # Por ahora, usar método simple
-        return calculate_planet_position(planet, date, use_simple=True)
+        # Órbita elíptica: elementos J2000 con tasas seculares y
+        # ecuación de Kepler resuelta numéricamente
+        position = heliocentric_positions([date], [planet])
+        
+        return {
+            'distance_au': float(position['distance_au'][0, 0]),
+            'angle_deg': float(position['longitude_deg'][0, 0]),
+            'position_au': position['xyz'][0, 0],
+            'semi_major_axis': PLANET_ORBITS[planet],
+            'period_years': PLANET_PERIODS[planet],
+            'method': 'keplerian_elliptical'
+        }
 
 
 def calculate_barycenter_distance(planet_positions: Dict[str, Dict]) -> float:
     """
-    Calcula distancia aproximada del baricentro solar.
+    Calcula distancia del baricentro solar.
+    
+    Si todas las posiciones incluyen el vector 'position_au' (por ejemplo,
+    de calculate_planet_position con use_simple=False), calcula el centro
+    de masa real; si no, usa la aproximación basada en Júpiter y Saturno.
     
     Args:
         planet_positions: Dict con posiciones de planetas
@@ -130,6 +152,17 @@ def calculate_barycenter_distance(planet_positions: Dict[str, Dict]) -> float:
     Returns:
         Distancia del baricentro en radios solares
     """
+    if planet_positions and all('position_au' in p for p in planet_positions.values()):
+        if __package__:
+            from .barycenter import barycenter_offset
+        else:
+            from barycenter import barycenter_offset
+        
+        planets = [p for p in planet_positions if p in PLANET_MASSES]
+        positions = np.array([planet_positions[p]['position_au'] for p in planets])[:, np.newaxis, :]
+        masses = np.array([PLANET_MASSES[p] for p in planets])
+        return float(np.linalg.norm(barycenter_offset(positions, masses)[0]))
+    
     # Simplificación: el baricentro está dominado por Júpiter y Saturno
     jupiter_dist = planet_positions.get('Jupiter', {}).get('distance_au', 5.2)
     saturn_dist = planet_positions.get('Saturn', {}).get('distance_au', 9.5)
@@ -174,13 +207,16 @@ def calculate_ftrt_single_planet(mass_jupiter: float, distance_au: float) -> flo
 
 
 def calculate_ftrt_total(planet_positions: Dict[str, Dict], 
-                        planets_included: Optional[List[str]] = None) -> float:
+                        planets_included: Optional[List[str]] = None,
+                        mode: str = 'scalar') -> float:
     """
     Calcula FTRT total para un conjunto de planetas.
     
     Args:
         planet_positions: Dict con posiciones de planetas
         planets_included: Lista de planetas a incluir (None = todos)
+        mode: 'scalar' (suma de M/d³), o 'tensor'/'vector' para la suma
+            sensible al alineamiento (requiere 'position_au' en cada planeta)
         
     Returns:
         FTRT total
@@ -188,6 +224,21 @@ def calculate_ftrt_total(planet_positions: Dict[str, Dict],
     if planets_included is None:
         planets_included = ['Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Venus', 'Earth']
     
+    if mode != 'scalar':
+        if __package__:
+            from .tidal import alignment_ftrt
+        else:
+            from tidal import alignment_ftrt
+        
+        planets = [p for p in planets_included
+                   if p in planet_positions and p in PLANET_MASSES]
+        missing = [p for p in planets if 'position_au' not in planet_positions[p]]
+        if missing:
+            raise ValueError(f"Falta 'position_au' para {missing[0]} (modo {mode})")
+        positions = np.array([planet_positions[p]['position_au'] for p in planets])[:, np.newaxis, :]
+        masses = np.array([PLANET_MASSES[p] for p in planets])
+        return float(alignment_ftrt(positions, masses, mode=mode)['ftrt_aligned'][0])
+    
     ftrt_total = 0.0
     
     for planet in planets_included:
@@ -199,24 +250,50 @@ def calculate_ftrt_total(planet_positions: Dict[str, Dict],
     return ftrt_total
 
 
-def get_alert_level(ftrt: float) -> str:
+def classify_alert_levels(ftrt, thresholds=ALERT_THRESHOLDS) -> np.ndarray:
+    """
+    Clasifica un array de valores FTRT en códigos de nivel de alerta.
+    
+    El código es el número de umbrales alcanzados (ftrt >= umbral), es
+    decir, el índice en ALERT_LEVELS. Vectorizado con np.searchsorted.
+    Un FTRT NaN no alcanza ningún umbral y queda en NORMAL (código 0).
+    
+    Args:
+        ftrt: Valor o array de valores FTRT
+        thresholds: Umbrales crecientes, uno menos que niveles
+            (default: ALERT_THRESHOLDS)
+        
+    Returns:
+        Array uint8 de códigos (misma forma que ftrt)
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    if thresholds.shape != (len(ALERT_LEVELS) - 1,):
+        raise ValueError(f"Se esperan {len(ALERT_LEVELS) - 1} umbrales, uno por cambio de nivel")
+    if np.any(np.diff(thresholds) <= 0):
+        raise ValueError("Los umbrales deben ser estrictamente crecientes")
+    ftrt = np.asarray(ftrt, dtype=float)
+    # searchsorted ordena NaN al final (EXTREMO); se fija a NORMAL explícitamente
+    codes = np.searchsorted(thresholds, ftrt, side='right').astype(np.uint8)
+    return np.where(np.isnan(ftrt), np.uint8(0), codes).astype(np.uint8)
+
+
+def alert_level_names(codes, levels=ALERT_LEVELS) -> np.ndarray:
+    """Convierte códigos de nivel de alerta a sus nombres."""
+    return np.asarray(levels, dtype=object)[np.asarray(codes)]
+
+
+def get_alert_level(ftrt: float, thresholds=ALERT_THRESHOLDS) -> str:
     """
     Determina nivel de alerta basado en valor FTRT.
     
     Args:
         ftrt: Valor FTRT calculado
+        thresholds: Umbrales crecientes (default: ALERT_THRESHOLDS)
         
     Returns:
         Nivel de alerta ('NORMAL', 'ELEVADO', 'CRÍTICO', 'EXTREMO')
     """
-    if ftrt >= 4.0:
-        return 'EXTREMO'
-    elif ftrt >= 2.5:
-        return 'CRÍTICO'
-    elif ftrt >= 1.5:
-        return 'ELEVADO'
-    else:
-        return 'NORMAL'
+    return ALERT_LEVELS[int(classify_alert_levels(ftrt, thresholds))]
 
 
 # ============================================================================
@@ -224,7 +301,8 @@ def get_alert_level(ftrt: float) -> str:
 # ============================================================================
 
 def calculate_correlation_with_ci(x: np.ndarray, y: np.ndarray, 
-                                  n_bootstrap: int = 1000) -> Dict:
+                                  n_bootstrap: int = 1000, seed=None,
+                                  workers: Optional[int] = None) -> Dict:
     """
     Calcula correlación con intervalo de confianza por bootstrap.
     
@@ -232,75 +310,68 @@ def calculate_correlation_with_ci(x: np.ndarray, y: np.ndarray,
         x: Array de valores X
         y: Array de valores Y
         n_bootstrap: Número de iteraciones bootstrap
+        seed: Semilla (entero, SeedSequence o Generator)
+        workers: Procesos para repartir las réplicas (mismo resultado)
         
     Returns:
-        Dict con 'r', 'p_value', 'ci_lower', 'ci_upper'
+        Dict con 'r', 'p_value', 'ci_lower', 'ci_upper' (percentiles),
+        'bca_lower', 'bca_upper' y 'mean_bootstrap'
     """
     from scipy import stats
     
     # Correlación observada
     r_observed, p_value = stats.pearsonr(x, y)
     
-    # Bootstrap
-    correlations = []
-    n = len(x)
-    
-    for _ in range(n_bootstrap):
-        indices = np.random.choice(n, n, replace=True)
-        x_sample = x[indices]
-        y_sample = y[indices]
-        r_boot, _ = stats.pearsonr(x_sample, y_sample)
-        correlations.append(r_boot)
-    
-    correlations = np.array(correlations)
-    
-    # Intervalos de confianza al 95%
-    ci_lower = np.percentile(correlations, 2.5)
-    ci_upper = np.percentile(correlations, 97.5)
+    # Bootstrap vectorizado (percentiles y BCa)
+    if __package__:
+        from .resampling import bootstrap_correlation
+    else:
+        from resampling import bootstrap_correlation
+    boot = bootstrap_correlation(x, y, n_bootstrap=n_bootstrap, seed=seed, workers=workers)
     
     return {
         'r': r_observed,
         'p_value': p_value,
-        'ci_lower': ci_lower,
-        'ci_upper': ci_upper,
-        'mean_bootstrap': np.mean(correlations)
+        'ci_lower': boot['ci_lower'],
+        'ci_upper': boot['ci_upper'],
+        'bca_lower': boot['bca_lower'],
+        'bca_upper': boot['bca_upper'],
+        'mean_bootstrap': boot['mean']
     }
 
 
 def permutation_test(x: np.ndarray, y: np.ndarray, 
-                    n_permutations: int = 10000) -> Dict:
+                    n_permutations: int = 10000, seed=None,
+                    workers: Optional[int] = None) -> Dict:
     """
     Test de permutación para correlación.
     
     Args:
         x: Array de valores X
         y: Array de valores Y
-        n_permutations: Número de permutaciones
+        n_permutations: Número máximo de permutaciones (exacto si n <= 10;
+            si no, parada temprana en cuanto p < 0.05 está decidido)
+        seed: Semilla (entero, SeedSequence o Generator)
+        workers: Procesos para repartir las permutaciones (mismo resultado)
         
     Returns:
-        Dict con 'r_observed', 'p_value', 'r_permuted'
+        Dict con 'r_observed', 'p_value', 'r_permuted', 'n_permutations'
+        (realizadas) y 'exact'
     """
-    from scipy import stats
-    
-    # Correlación observada
-    r_observed, _ = stats.pearsonr(x, y)
-    
-    # Permutaciones
-    r_permuted = []
-    for _ in range(n_permutations):
-        y_shuffled = np.random.permutation(y)
-        r_perm, _ = stats.pearsonr(x, y_shuffled)
-        r_permuted.append(r_perm)
-    
-    r_permuted = np.array(r_permuted)
+    if __package__:
+        from .resampling import permutation_test as run_permutation_test
+    else:
+        from resampling import permutation_test as run_permutation_test
     
-    # p-value: proporción de permutaciones con |r| >= |r_observed|
-    p_value = np.mean(np.abs(r_permuted) >= np.abs(r_observed))
+    result = run_permutation_test(x, y, n_permutations=n_permutations, seed=seed,
+                                  workers=workers)
     
     return {
-        'r_observed': r_observed,
-        'p_value': p_value,
-        'r_permuted': r_permuted
+        'r_observed': result['r_observed'],
+        'p_value': result['p_value'],
+        'r_permuted': result['r_permuted'],
+        'n_permutations': result['n_permutations'],
+        'exact': result['exact']
     }
 
 
@@ -318,6 +389,30 @@ def parse_date(date_str: str, format: str = '%Y-%m-%d') -> datetime:
     return datetime.strptime(date_str, format)
 
 
+def as_step(step) -> np.timedelta64:
+    """
+    Normaliza el paso de una serie de fechas a np.timedelta64 en segundos.
+    
+    Solo los enteros se leen como días; np.timedelta64 (que NumPy trata
+    como entero con signo) y datetime.timedelta conservan su unidad.
+    
+    Args:
+        step: Entero (días), np.timedelta64 o datetime.timedelta
+        
+    Returns:
+        np.timedelta64 en segundos (positivo)
+    """
+    if isinstance(step, (np.timedelta64, timedelta)):
+        step = np.timedelta64(step, 's')
+    elif isinstance(step, (int, np.integer)):
+        step = np.timedelta64(int(step), 'D').astype('timedelta64[s]')
+    else:
+        step = np.timedelta64(step, 's')
+    if step <= np.timedelta64(0, 's'):
+        raise ValueError(f"El paso debe ser positivo: {step}")
+    return step
+
+
 def validate_ftrt_value(ftrt: float) -> bool:
     """
     Valida si un valor FTRT es razonable.
@@ -400,6 +495,72 @@ def validate_historical_event(event: Dict) -> Tuple[bool, List[str]]:
     return len(errors) == 0, errors
 
 
+# Códigos de error por fila de validate_events (bits combinables)
+EVENT_ERROR_MISSING = 1
+EVENT_ERROR_MAGNITUDE = 2
+EVENT_ERROR_KP = 4
+EVENT_ERROR_DATE = 8
+
+EVENT_ERROR_MESSAGES = {
+    EVENT_ERROR_MISSING: "Falta campo requerido",
+    EVENT_ERROR_MAGNITUDE: "Magnitud debe ser número positivo",
+    EVENT_ERROR_KP: "Kp debe ser entero entre 0 y 9",
+    EVENT_ERROR_DATE: "Fecha en formato inválido (usar YYYY-MM-DD)",
+}
+
+
+def validate_events(events: pd.DataFrame, 
+                    date_format: str = '%Y-%m-%d') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Valida un catálogo completo de eventos de forma vectorizada.
+    
+    Aplica las reglas de validate_historical_event a todas las filas a la
+    vez: campos requeridos, magnitud numérica no negativa, Kp entero entre
+    0 y 9 (se aceptan floats con valor entero) y fecha válida.
+    
+    Args:
+        events: DataFrame con columnas 'date', 'name', 'magnitude', 'kp'
+        date_format: Formato de fecha si la columna es texto
+        
+    Returns:
+        Tupla (máscara de filas válidas, códigos de error uint8 por fila;
+        ver EVENT_ERROR_*)
+    """
+    n = len(events)
+    codes = np.zeros(n, dtype=np.uint8)
+    
+    for field in ['date', 'name', 'magnitude', 'kp']:
+        if field not in events.columns:
+            codes |= EVENT_ERROR_MISSING
+        elif field == 'name':
+            codes[events[field].isna().to_numpy()] |= EVENT_ERROR_MISSING
+    
+    if 'magnitude' in events.columns:
+        magnitude = pd.to_numeric(events['magnitude'], errors='coerce').to_numpy(dtype=float)
+        codes[~(magnitude >= 0)] |= EVENT_ERROR_MAGNITUDE
+    
+    if 'kp' in events.columns:
+        kp = events['kp']
+        if pd.api.types.is_bool_dtype(kp):
+            codes |= EVENT_ERROR_KP
+        else:
+            kp = pd.to_numeric(kp, errors='coerce').to_numpy(dtype=float)
+            codes[~((kp >= 0) & (kp <= 9) & (kp == np.round(kp)))] |= EVENT_ERROR_KP
+    
+    if 'date' in events.columns:
+        dates = events['date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, format=date_format, errors='coerce')
+        codes[dates.isna().to_numpy()] |= EVENT_ERROR_DATE
+    
+    return codes == 0, codes
+
+
+def event_error_messages(code: int) -> List[str]:
+    """Mensajes de error correspondientes a un código de validate_events."""
+    return [message for bit, message in EVENT_ERROR_MESSAGES.items() if int(code) & bit]
+
+
 # ============================================================================
 # EXPORTACIÓN
 # ============================================================================
@@ -466,6 +627,8 @@ def run_self_test():
     assert get_alert_level(2.0) == 'ELEVADO'
     assert get_alert_level(3.0) == 'CRÍTICO'
     assert get_alert_level(5.0) == 'EXTREMO'
+    assert get_alert_level(2.5) == 'CRÍTICO'
+    assert list(classify_alert_levels([1.0, 2.0, 3.0, 5.0])) == [0, 1, 2, 3]
     print("✓ Test 3: Niveles de alerta")
     
     # Test 4: Validación
@@ -479,6 +642,18 @@ def run_self_test():
     assert is_valid, f"Evento válido marcado como inválido: {errors}"
     print("✓ Test 4: Validación de eventos")
     
+    # Test 5: Validación vectorizada
+    catalog = pd.DataFrame({
+        'date': ['2024-05-10', '2024-13-01', '2003-10-28'],
+        'name': ['A', 'B', 'C'],
+        'magnitude': [5.8, -1.0, 17.2],
+        'kp': [9, 12, 9]
+    })
+    valid, codes = validate_events(catalog)
+    assert list(valid) == [True, False, True]
+    assert codes[1] == EVENT_ERROR_MAGNITUDE | EVENT_ERROR_KP | EVENT_ERROR_DATE
+    print("✓ Test 5: Validación vectorizada de catálogos")
+    
     print("\n✓ Todos los tests pasados correctamente")
 
 